@@ -12,6 +12,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from middleware.auth import AuthMiddleware
 from routes import agent, auth, conversation, files, health
 
+from panda_agi.client.http_pool import close_shared_http_clients
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -49,6 +51,12 @@ app.include_router(conversation.router)
 app.include_router(files.router)
 app.include_router(health.router)
 
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Close the connections shared by the agents"""
+    await close_shared_http_clients()
+
 if __name__ == "__main__":
     import uvicorn
 
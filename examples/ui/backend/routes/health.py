@@ -6,6 +6,8 @@ import os
 from pathlib import Path
 from fastapi import APIRouter
 
+from panda_agi.client.http_pool import get_http_pool_metrics
+
 router = APIRouter(tags=["health"])
 
 
@@ -20,6 +22,17 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@router.get("/health/http-pool")
+async def http_pool_metrics():
+    """
+    Connection reuse metrics of the PandaAGI API clients.
+
+    Returns:
+        dict: Metrics per API base URL
+    """
+    return get_http_pool_metrics()
+
+
 @router.get("/")
 async def root():
     """
@@ -39,6 +52,7 @@ async def root():
             "GET /{conversation_id}/files/download": "Download a file from the workspace",
             "GET /files/test-download": "Test download endpoint",
             "GET /health": "Health check",
+            "GET /health/http-pool": "Connection reuse metrics",
             "GET /": "This endpoint",
         },
     }
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import logging
 import os
 from datetime import datetime
@@ -16,9 +18,11 @@ import httpx
 from dotenv import load_dotenv
 
 from ..envs import BaseEnv
+from ..envs.workspace_snapshot import diff_snapshots
 from ..handlers.base_handler import BaseHandler
 from ..tools import ToolRegistry
-from ..tools.base import ToolHandler
+from ..tools.base import ToolHandler, ToolResult
+from ..tools.result_cache import CacheKey, ToolResultCache, shared_tool_result_cache
 from ..tools.file_system_ops import file_explore_directory
 from .models import (
     AgentRequestModel,
@@ -26,11 +30,25 @@ from .models import (
     BaseStreamEvent,
     Message,
     Skill,
+    ToolInfo,
     ToolsConfig,
 )
+from .http_pool import HttpPoolConfig
 from .panda_agi_client import PandaAgiClient, PandaAgiConnectionError
+from .prefetch import ToolPrefetchCache
+from .retry import (
+    ExecutedToolCall,
+    StreamRetryPolicy,
+    ToolResultReplay,
+    is_retryable_error,
+)
 from .state import AgentState
 from .token_processor import TokenProcessor
+from .tool_scheduler import (
+    StreamingToolScheduler,
+    conflicts_with_any,
+    plan_tool_batches,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -68,6 +86,12 @@ class Agent:
         tools: Optional[List[Callable]] = None,
         base_url: str = None,
         api_key: str = None,
+        max_concurrent_tools: int = 1,
+        send_file_system_diff: bool = False,
+        http_pool_config: Optional[HttpPoolConfig] = None,
+        stream_retry: Optional[StreamRetryPolicy] = None,
+        prefetch_read_only_tools: bool = False,
+        cache_tool_results: bool = False,
     ):
         load_dotenv()
         self.api_key = api_key or os.getenv("PANDA_AGI_KEY")
@@ -84,6 +108,23 @@ class Agent:
                 f"Model {model} is not available. Available models: {AVAILABLE_MODELS}"
             )
         self.environment = environment
+        # Maximum number of independent tool calls executed at the same time,
+        # at the end of the stream or as they arrive in immediate mode
+        # (1 = sequential)
+        self.max_concurrent_tools = max(1, max_concurrent_tools)
+        # Send the workspace listing as changes against the previously sent one
+        self.send_file_system_diff = send_file_system_diff
+        self._last_sent_file_system: Optional[Dict[str, Any]] = None
+        # Backoff for retrying a turn whose stream failed (max_retries=0 disables)
+        self.stream_retry = stream_retry or StreamRetryPolicy()
+        # Start read-only tools as soon as their opening tag is streamed
+        self.prefetch_read_only_tools = prefetch_read_only_tools
+        self.prefetch_cache = ToolPrefetchCache()
+        # Results of tools declaring a cache_ttl, shared with the other agents
+        # (opt-in: results may be stale if files change outside the agent)
+        self.tool_result_cache: Optional[ToolResultCache] = (
+            shared_tool_result_cache if cache_tool_results else None
+        )
         self.base_url = base_url or os.getenv(
             "PANDA_AGI_BASE_URL",
             "https://agi-api.pandas-ai.com",
@@ -114,9 +155,10 @@ class Agent:
             api_key=self.api_key,
             conversation_id=self.conversation_id,
             state=self.state,
+            pool_config=http_pool_config,
         )
         self.token_processor = TokenProcessor(
-            tool_registry=self.tool_registry, collect_mode=False
+            tool_registry=self.tool_registry, collect_mode=False, memory_lean=True
         )
 
         # Process tools if provided
@@ -268,6 +310,15 @@ class Agent:
                 )
                 # Continue with other callbacks even if one fails
 
+    def _tool_infos(self) -> Optional[List[ToolInfo]]:
+        """
+        Describe the skills and custom tools, and the built-in tools that only
+        the client knows about (e.g. file_batch), for the request.
+        """
+        tool_infos = [tool.to_tool_info() for tool in self.tools]
+        tool_infos += self.tool_registry.get_client_tool_infos()
+        return tool_infos or None
+
     def add_tool(self, tool_function: Callable):
         """Add tool to the agent (supports both skills and custom tools)"""
         if len(self.tools) >= MAX_TOOLS_LENGTH:
@@ -313,12 +364,9 @@ class Agent:
             messages=[input_message],
             model=self.model,
             tools_config=self.state.tools_config,
-            tools=[tool.to_tool_info() for tool in self.tools] if self.tools else None,
+            tools=self._tool_infos(),
         )
 
-        # Initialize storage for immediate tool execution results
-        immediate_tool_results = []
-
         try:
             # Agentic loop - continue until a breaking tool is executed
             breaking_tool_executed = False
@@ -328,90 +376,48 @@ class Agent:
                 loop_iteration += 1
                 logger.info(f"Starting agentic loop iteration {loop_iteration}")
 
-                # Reset token processor for new request
-                self.token_processor.reset()
-
-                # Set execution modes based on parameters
-                if execute_tools_immediately:
-                    # Enable both collection and immediate execution
-                    self.token_processor.set_execution_modes(
-                        collect_mode=True, immediate_execution_mode=True
+                # Tool calls run by this turn, replayed if its stream is retried
+                executed_calls: List[ExecutedToolCall] = []
+                replay = ToolResultReplay()
+                attempt = 0
+                while True:
+                    # Prefetches of a previous turn or attempt may be stale
+                    self.prefetch_cache.clear()
+                    self._reset_token_processor(
+                        execute_tools_immediately, execute_tools_at_end
                     )
-                elif execute_tools_at_end:
-                    # Enable only collection for end-of-stream execution
-                    self.token_processor.set_execution_modes(
-                        collect_mode=True, immediate_execution_mode=False
-                    )
-                else:
-                    # Legacy immediate execution mode (no collection)
-                    self.token_processor.set_execution_modes(
-                        collect_mode=False, immediate_execution_mode=False
-                    )
-
-                # Send streaming request and process tokens
-                token_stream = self.client.send_streaming_request(current_request)
-
-                # Process tokens through the token processor
-                async for processed_event in self.token_processor.process_token_stream(
-                    token_stream
-                ):
-                    if processed_event.get("type") == "conversation_id":
-                        logger.debug(
-                            f"Received conversation_id: {processed_event.get('conversation_id')}"
+                    try:
+                        async for tool_event in self._stream_turn(
+                            current_request,
+                            replay,
+                            executed_calls,
+                            execute_tools_immediately,
+                            execute_tools_at_end,
+                        ):
+                            yield tool_event
+                        break
+                    except Exception as e:
+                        attempt += 1
+                        if (
+                            not is_retryable_error(e)
+                            or attempt > self.stream_retry.max_retries
+                        ):
+                            raise
+                        for function_name, arguments, record in executed_calls:
+                            replay.record(function_name, arguments, record)
+                        executed_calls.clear()
+                        delay = self.stream_retry.delay(attempt)
+                        logger.warning(
+                            f"Stream of request {current_request.request_id} failed "
+                            f"({e}), retry {attempt}/{self.stream_retry.max_retries} "
+                            f"in {delay:.2f}s with {len(replay)} tool results to replay"
                         )
-                        self.conversation_id = processed_event.get("conversation_id")
-                    elif processed_event.get("type") == "tool_detected":
-                        if execute_tools_immediately:
-                            logger.info(
-                                "Executing tool immediately: "
-                                + processed_event.get("function_name")
-                            )
-                            # Execute the tool immediately and yield tool events
-                            async for tool_event in self._handle_tool_execution(
-                                processed_event
-                            ):
-                                yield tool_event
-
-                                # Store the result if it's a completion or error event
-                                if tool_event.get("event_type") == "tool_end":
-                                    immediate_tool_results.append(
-                                        {
-                                            "tool_call_id": processed_event.get(
-                                                "tool_call_id"
-                                            ),
-                                            "function_name": processed_event.get(
-                                                "function_name"
-                                            ),
-                                            "status": "completed",
-                                            "result": tool_event["data"].get(
-                                                "output_params"
-                                            ),
-                                        }
-                                    )
-                                elif tool_event.get("event_type") == "error":
-                                    immediate_tool_results.append(
-                                        {
-                                            "tool_call_id": processed_event.get(
-                                                "tool_call_id"
-                                            ),
-                                            "function_name": processed_event.get(
-                                                "function_name"
-                                            ),
-                                            "status": "failed",
-                                            "error": tool_event["data"].get("error"),
-                                        }
-                                    )
-                        elif not execute_tools_at_end:
-                            # Original immediate execution mode (legacy)
-                            async for tool_event in self._handle_tool_execution(
-                                processed_event
-                            ):
-                                yield tool_event
-                    # Skip other event types - only yield tool events
+                        await asyncio.sleep(delay)
 
                 # After the stream ends, handle tool execution based on mode
                 if execute_tools_immediately:
                     # Use the immediately executed tool results
+                    immediate_tool_results = [record for *_, record in executed_calls]
                     if immediate_tool_results:
                         logger.debug(
                             f"Stream ended. Used {len(immediate_tool_results)} immediately executed tool results..."
@@ -428,8 +434,6 @@ class Agent:
                             current_request = await self._send_tool_results_to_endpoint_and_get_next_request(
                                 immediate_tool_results
                             )
-                            # Clear the immediate results for the next iteration
-                            immediate_tool_results = []
                         else:
                             # Breaking tool executed, exit loop
                             break
@@ -445,17 +449,20 @@ class Agent:
                             f"Stream ended. Executing {len(collected_tools)} collected tools..."
                         )
 
-                        # Execute all collected tools and yield their events
+                        # Execute all collected tools once, yielding their events
+                        # and gathering their results in the same pass
+                        tool_results = []
                         async for (
                             tool_event
-                        ) in self._execute_collected_tools_and_yield_events():
+                        ) in self._execute_collected_tools_and_yield_events(
+                            tool_results
+                        ):
                             yield tool_event
 
-                        # Check for breaking tools and get results
-                        (
-                            tool_results,
-                            breaking_tool_executed,
-                        ) = await self._execute_collected_tools_with_breaking_check()
+                        # Check for breaking tools in the results
+                        breaking_tool_executed = self._check_breaking_tools_in_results(
+                            tool_results
+                        )
 
                         # Clear collected tools
                         self.token_processor.clear_collected_tools()
@@ -486,6 +493,283 @@ class Agent:
             logger.error(f"Error in run_stream: {e}")
             raise e
 
+        finally:
+            self.prefetch_cache.clear()
+
+    def _reset_token_processor(
+        self, execute_tools_immediately: bool, execute_tools_at_end: bool
+    ):
+        """Reset the token processor for a new stream"""
+        self.token_processor.reset()
+        self.token_processor.set_prefetch_mode(self.prefetch_read_only_tools)
+
+        # Set execution modes based on parameters
+        if execute_tools_immediately:
+            # Enable both collection and immediate execution
+            self.token_processor.set_execution_modes(
+                collect_mode=True, immediate_execution_mode=True
+            )
+        elif execute_tools_at_end:
+            # Enable only collection for end-of-stream execution
+            self.token_processor.set_execution_modes(
+                collect_mode=True, immediate_execution_mode=False
+            )
+        else:
+            # Legacy immediate execution mode (no collection)
+            self.token_processor.set_execution_modes(
+                collect_mode=False, immediate_execution_mode=False
+            )
+
+    async def _stream_turn(
+        self,
+        request: AgentRequestModel,
+        replay: ToolResultReplay,
+        executed_calls: List[ExecutedToolCall],
+        execute_tools_immediately: bool,
+        execute_tools_at_end: bool,
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream one request and execute the tools detected while streaming.
+
+        Args:
+            request: Request to send
+            replay: Results of tool calls executed by failed attempts of the request
+            executed_calls: Receives (function name, arguments, result) of every
+                tool call executed or replayed while streaming
+            execute_tools_immediately: Whether tools start in the background when
+                detected, they are joined in detection order when the stream ends
+            execute_tools_at_end: Whether tools are executed after the stream
+
+        Yields:
+            Tool events of the executed tools
+        """
+        # Tools detected while streaming run in the background so that reading
+        # the stream does not wait for them
+        scheduler = None
+        if execute_tools_immediately:
+            scheduler = StreamingToolScheduler(
+                self.tool_registry,
+                self.environment._resolve_path,
+                self.max_concurrent_tools,
+            )
+        # Calls recorded by each scheduled tool, in detection order
+        scheduled_calls: List[List[ExecutedToolCall]] = []
+
+        stream_error = None
+        try:
+            try:
+                # Send streaming request and process tokens
+                token_stream = self.client.send_streaming_request(request)
+
+                # Process tokens through the token processor
+                processed_events = self.token_processor.process_token_stream(
+                    token_stream
+                )
+                async for processed_event in processed_events:
+                    if processed_event.get("type") == "conversation_id":
+                        logger.debug(
+                            f"Received conversation_id: {processed_event.get('conversation_id')}"
+                        )
+                        self.conversation_id = processed_event.get("conversation_id")
+                    elif processed_event.get("type") == "tool_opened":
+                        self._start_prefetch(processed_event)
+                    elif processed_event.get("type") == "tool_detected":
+                        if execute_tools_immediately:
+                            logger.info(
+                                "Scheduling tool immediately: "
+                                + processed_event.get("function_name")
+                            )
+                            calls: List[ExecutedToolCall] = []
+                            scheduled_calls.append(calls)
+                            scheduler.submit(
+                                processed_event,
+                                functools.partial(
+                                    self._execute_or_replay_tool,
+                                    processed_event,
+                                    replay,
+                                    calls,
+                                ),
+                            )
+                        elif not execute_tools_at_end:
+                            # Legacy immediate execution mode (no collection)
+                            async for tool_event in self._execute_or_replay_tool(
+                                processed_event, replay, executed_calls
+                            ):
+                                yield tool_event
+                    # Skip other event types - only yield tool events
+
+                    if scheduler:
+                        for tool_event in scheduler.pending_events():
+                            yield tool_event
+            except Exception as e:
+                # Tools already started still finish, a retry replays them
+                stream_error = e
+
+            if scheduler:
+                async for tool_event in scheduler.join():
+                    yield tool_event
+                for calls in scheduled_calls:
+                    executed_calls.extend(calls)
+        finally:
+            if scheduler:
+                scheduler.cancel()
+
+        if stream_error:
+            raise stream_error
+
+    async def _execute_or_replay_tool(
+        self,
+        tool_event: Dict[str, Any],
+        replay: ToolResultReplay,
+        executed_calls: List[ExecutedToolCall],
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """Execute a detected tool call unless a failed attempt already did"""
+        function_name = tool_event["function_name"]
+        arguments = tool_event["arguments"]
+        tool_call_id = tool_event["tool_call_id"]
+
+        # Its events were already yielded by the failed attempt
+        record = replay.take(function_name, arguments, tool_call_id)
+        if record is not None:
+            logger.info(f"Replaying result of {function_name} from a failed attempt")
+
+        else:
+            async for event in self._handle_tool_execution(tool_event):
+                yield event
+
+                # Store the result if it's a completion or error event
+                if event.get("event_type") == "tool_end":
+                    record = {
+                        "tool_call_id": tool_call_id,
+                        "function_name": function_name,
+                        "status": "completed",
+                        "result": event["data"].get("output_params"),
+                    }
+                elif event.get("event_type") == "error":
+                    record = {
+                        "tool_call_id": tool_call_id,
+                        "function_name": function_name,
+                        "status": "failed",
+                        "error": event["data"].get("error"),
+                    }
+
+        if record is not None:
+            executed_calls.append((function_name, arguments, record))
+
+    def _start_prefetch(self, tool_event: Dict[str, Any]):
+        """
+        Start a read-only tool call detected from its opening tag.
+
+        Nothing is started if an earlier call of the turn may change what the
+        tool reads, since that call may not have run yet.
+        """
+        earlier_calls = self.token_processor.get_collected_tools()
+        if conflicts_with_any(
+            tool_event,
+            earlier_calls,
+            self.tool_registry,
+            self.environment._resolve_path,
+        ):
+            return
+
+        cache_entry = self._tool_cache_entry(
+            tool_event["function_name"], tool_event["arguments"]
+        )
+        if cache_entry and self.tool_result_cache.contains(cache_entry[0]):
+            return
+
+        handler = self.tool_handlers.get(tool_event["function_name"])
+        if handler:
+            self.prefetch_cache.start(
+                tool_event["function_name"],
+                tool_event["arguments"],
+                functools.partial(handler.execute, tool_event["arguments"]),
+            )
+
+    async def _execute_handler(
+        self, function_name: str, handler: ToolHandler, arguments: Dict[str, Any]
+    ) -> ToolResult:
+        """
+        Execute a tool handler, or use the result of its prefetched call.
+
+        Results of tools declaring a cache_ttl are served from and stored in
+        the tool result cache. Tools that may write drop the cached results
+        depending on what they write.
+        """
+        cache_entry = self._tool_cache_entry(function_name, arguments)
+        if cache_entry:
+            key, ttl, path = cache_entry
+            result = self.tool_result_cache.get(key)
+            if result is not None:
+                logger.info(f"Using cached result of {function_name}")
+                return result
+
+        try:
+            result = await self.prefetch_cache.take(function_name, arguments)
+            if result is None:
+                result = await handler.execute(arguments)
+        finally:
+            self._invalidate_tool_cache(function_name, arguments)
+
+        if cache_entry:
+            self.tool_result_cache.put(key, result, ttl, path)
+        return result
+
+    def _tool_cache_entry(
+        self, function_name: str, arguments: Dict[str, Any]
+    ) -> Optional[Tuple[CacheKey, float, Optional[str]]]:
+        """
+        Describe how the result of a tool call is cached.
+
+        Returns:
+            (key, ttl, resolved path) tuple, or None if the result is not cached
+        """
+        ttl = self.tool_registry.get_cache_ttl(function_name)
+        if self.tool_result_cache is None or not ttl:
+            return None
+
+        definition = self._get_tool_definition(function_name)
+        if definition is None or not definition.path_param:
+            # Not reading the environment, shared by every agent
+            return ToolResultCache.make_key(function_name, arguments), ttl, None
+
+        if self.environment.tmux_executor.active_sessions:
+            # Background processes may change files at any time
+            return None
+
+        path = arguments.get(definition.path_param)
+        if path:
+            path = str(self.environment._resolve_path(path))
+            arguments = {**arguments, definition.path_param: path}
+        key = ToolResultCache.make_key(
+            function_name, arguments, self.environment.cache_scope
+        )
+        return key, ttl, path
+
+    def _invalidate_tool_cache(self, function_name: str, arguments: Dict[str, Any]):
+        """Drop the cached results a tool call may have made stale"""
+        if self.tool_result_cache is None:
+            return
+
+        definition = self._get_tool_definition(function_name)
+        if definition is not None and definition.read_only:
+            return
+
+        path = None
+        if definition is not None and definition.path_param:
+            path = arguments.get(definition.path_param)
+            path = str(self.environment._resolve_path(path)) if path else None
+        # Tools that are not path-scoped (e.g. shell commands) may write anywhere
+        self.tool_result_cache.invalidate(self.environment.cache_scope, path)
+
+    def _get_tool_definition(self, function_name: str):
+        """Get the XML tool definition registered for a function"""
+        mapping = self.tool_registry.get_xml_function_mapping()
+        for xml_tag, mapped_name in mapping.items():
+            if mapped_name == function_name:
+                return self.tool_registry.get_xml_tool_definition(xml_tag)
+        return None
+
     async def _handle_tool_execution(
         self, tool_event: Dict[str, Any]
     ) -> AsyncGenerator[Dict[str, Any], None]:
@@ -530,7 +814,7 @@ class Agent:
                 return
 
             # Execute the tool
-            result = await handler.execute(arguments)
+            result = await self._execute_handler(function_name, handler, arguments)
 
             # Generate timestamp for tool end
             end_timestamp = datetime.now().isoformat()
@@ -578,9 +862,15 @@ class Agent:
             }
 
     async def _execute_collected_tools_and_yield_events(
-        self,
+        self, tool_results: Optional[List[Dict[str, Any]]] = None
     ) -> AsyncGenerator[Dict[str, Any], None]:
-        """Execute all collected tools and yield their start/end events"""
+        """
+        Execute all collected tools and yield their start/end events.
+
+        Args:
+            tool_results: Optional list that receives the tool results, in the order
+                the tools were emitted, once all events have been yielded
+        """
         collected_tools = self.token_processor.get_collected_tools()
 
         if not collected_tools:
@@ -588,136 +878,162 @@ class Agent:
 
         logger.info(f"Executing {len(collected_tools)} collected tools")
 
-        for tool_call in collected_tools:
-            try:
-                function_name = tool_call["function_name"]
-                arguments = tool_call["arguments"]
-                xml_tag_name = tool_call.get("xml_tag_name")
-
-                # Check if this tool is breaking
-                is_breaking = False
-                if xml_tag_name:
-                    xml_tool_def = self.tool_registry.get_xml_tool_definition(
-                        xml_tag_name
-                    )
-                    if xml_tool_def:
-                        is_breaking = xml_tool_def.is_breaking
-
-                # Generate timestamp for tool start
-                start_timestamp = datetime.utcnow().isoformat() + "Z"
-
-                # Yield tool start event
+        results_by_index: Dict[int, Dict[str, Any]] = {}
+        async for stage, index, record in self._iter_tool_executions(collected_tools):
+            tool_call = collected_tools[index]
+            if stage == "start":
                 yield {
                     "event_type": "tool_start",
-                    "timestamp": start_timestamp,
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
                     "data": {
-                        "tool_name": function_name,
-                        "input_params": arguments,
+                        "tool_name": tool_call["function_name"],
+                        "input_params": tool_call["arguments"],
+                    },
+                }
+            elif record["status"] == "completed":
+                yield {
+                    "event_type": "tool_end",
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                    "data": {
+                        "tool_name": tool_call["function_name"],
+                        "input_params": tool_call["arguments"],
+                        "output_params": record["result"],
+                    },
+                }
+            else:
+                yield {
+                    "event_type": "error",
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                    "data": {
+                        "tool_name": tool_call.get("function_name", "unknown"),
+                        "input_params": tool_call.get("arguments", {}),
+                        "error": record["error"],
                     },
                 }
 
-                # Trigger callbacks before tool execution
-                self._trigger_callbacks(function_name, arguments, "start")
-
-                # Get the appropriate handler
-                handler = self.tool_handlers.get(function_name)
-                if not handler:
-                    error_msg = f"No handler found for function: {function_name}"
-                    logger.error(error_msg)
-
-                    # Yield error event
-                    error_timestamp = datetime.utcnow().isoformat() + "Z"
-                    yield {
-                        "event_type": "error",
-                        "timestamp": error_timestamp,
-                        "data": {
-                            "tool_name": function_name,
-                            "input_params": arguments,
-                            "error": error_msg,
-                        },
-                    }
+            if stage == "end":
+                results_by_index[index] = record
 
-                    # If this was a breaking tool, stop execution even if it failed
-                    if is_breaking:
-                        logger.info(
-                            f"Breaking tool {function_name} encountered. Stopping execution."
-                        )
-                        break
+        if tool_results is not None:
+            tool_results.extend(
+                results_by_index[index] for index in sorted(results_by_index)
+            )
 
-                    continue
+    async def _iter_tool_executions(
+        self, tool_calls: List[Dict[str, Any]]
+    ) -> AsyncGenerator[Tuple[str, int, Optional[Dict[str, Any]]], None]:
+        """
+        Execute tool calls and yield ("start", index, None) and ("end", index, result) stages.
 
-                # Execute the tool
-                result = await handler.execute(arguments)
+        Independent tool calls are executed concurrently, up to max_concurrent_tools
+        at a time, using the conflict rules declared in the ToolRegistry. Calls after
+        the first breaking tool are not executed.
 
-                # Generate timestamp for tool end
-                end_timestamp = datetime.now().isoformat() + "Z"
-
-                if result.success:
-                    yield {
-                        "event_type": "tool_end",
-                        "timestamp": end_timestamp,
-                        "data": {
-                            "tool_name": function_name,
-                            "input_params": arguments,
-                            "output_params": result.data,
-                        },
-                    }
-                    logger.info(f"Tool {function_name} executed successfully")
-                    # Trigger callbacks after tool execution
-                    self._trigger_callbacks(
-                        function_name, arguments, "end", result.data
-                    )
-                else:
-                    yield {
-                        "event_type": "error",
-                        "timestamp": end_timestamp,
-                        "data": {
-                            "tool_name": function_name,
-                            "input_params": arguments,
-                            "error": result.error,
-                        },
-                    }
-                    logger.error(f"Tool {function_name} failed: {result.error}")
-                    # Trigger callbacks on error
-                    self._trigger_callbacks(
-                        function_name, arguments, "error", result.error
-                    )
+        Args:
+            tool_calls: Tool calls in the order they were emitted by the model
+
+        Yields:
+            Tuples of stage, index into tool_calls and result (for "end" stages)
+        """
+        tool_calls = self._truncate_after_breaking_tool(tool_calls)
+
+        if self.max_concurrent_tools > 1:
+            batches = plan_tool_batches(
+                tool_calls, self.tool_registry, self.environment._resolve_path
+            )
+        else:
+            batches = [[index] for index in range(len(tool_calls))]
+
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_concurrent_tools)
 
-                # If this was a breaking tool, stop execution after executing it
-                if is_breaking:
+        async def run(index: int):
+            async with semaphore:
+                await queue.put(("start", index, None))
+                result = await self._run_tool_call(tool_calls[index])
+                await queue.put(("end", index, result))
+
+        for batch in batches:
+            tasks = [asyncio.create_task(run(index)) for index in batch]
+            try:
+                for _ in range(2 * len(batch)):
+                    yield await queue.get()
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+
+    def _truncate_after_breaking_tool(
+        self, tool_calls: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Drop the tool calls that follow the first breaking tool"""
+        for index, tool_call in enumerate(tool_calls):
+            xml_tag_name = tool_call.get("xml_tag_name")
+            if xml_tag_name:
+                xml_tool_def = self.tool_registry.get_xml_tool_definition(xml_tag_name)
+                if xml_tool_def and xml_tool_def.is_breaking:
                     logger.info(
-                        f"Breaking tool {function_name} executed. Stopping execution."
+                        f"Breaking tool {tool_call.get('function_name')} encountered. Stopping execution after it."
                     )
-                    break
+                    return tool_calls[: index + 1]
+        return tool_calls
 
-            except Exception as e:
-                logger.error(
-                    f"Error executing tool {tool_call.get('function_name')}: {e}"
-                )
+    async def _run_tool_call(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a single collected tool call, trigger its callbacks and return its result"""
+        function_name = tool_call.get("function_name", "unknown")
+        arguments = tool_call.get("arguments", {})
+        tool_call_id = tool_call.get("id", "unknown")
 
-                # Yield error event
-                error_timestamp = datetime.utcnow().isoformat() + "Z"
-                yield {
-                    "event_type": "error",
-                    "timestamp": error_timestamp,
-                    "data": {
-                        "tool_name": tool_call.get("function_name", "unknown"),
-                        "input_params": tool_call.get("arguments", {}),
-                        "error": str(e),
-                    },
+        try:
+            # Trigger callbacks before tool execution
+            self._trigger_callbacks(function_name, arguments, "start")
+
+            # Get the appropriate handler
+            handler = self.tool_handlers.get(function_name)
+            if not handler:
+                error_msg = f"No handler found for function: {function_name}"
+                logger.error(error_msg)
+                return {
+                    "tool_call_id": tool_call_id,
+                    "function_name": function_name,
+                    "status": "failed",
+                    "error": error_msg,
                 }
 
-                # Check if this was a breaking tool even if it failed
-                xml_tag_name = tool_call.get("xml_tag_name")
-                if xml_tag_name:
-                    xml_tool_def = self.tool_registry.get_xml_tool_definition(
-                        xml_tag_name
-                    )
-                    if xml_tool_def and xml_tool_def.is_breaking:
-                        logger.info(
-                            f"Breaking tool {tool_call.get('function_name')} encountered (failed). Stopping execution."
-                        )
-                        break
+            # Execute the tool
+            result = await self._execute_handler(function_name, handler, arguments)
+
+            if result.success:
+                logger.info(f"Tool {function_name} executed successfully")
+                # Trigger callbacks after tool execution
+                self._trigger_callbacks(function_name, arguments, "end", result.data)
+                return {
+                    "tool_call_id": tool_call_id,
+                    "function_name": function_name,
+                    "status": "completed",
+                    "result": result.data,
+                }
+
+            logger.error(f"Tool {function_name} failed: {result.error}")
+            # Trigger callbacks on error
+            self._trigger_callbacks(
+                function_name, arguments, "error", {"error": result.error}
+            )
+            return {
+                "tool_call_id": tool_call_id,
+                "function_name": function_name,
+                "status": "failed",
+                "error": result.error,
+            }
+
+        except Exception as e:
+            logger.error(f"Error executing tool {function_name}: {e}")
+            return {
+                "tool_call_id": tool_call_id,
+                "function_name": function_name,
+                "status": "failed",
+                "error": str(e),
+            }
 
     def _check_breaking_tools_in_results(
         self, tool_results: List[Dict[str, Any]]
@@ -755,146 +1071,11 @@ class Agent:
 
         return False
 
-    async def _execute_collected_tools_with_breaking_check(
-        self,
-    ) -> Tuple[List[Dict[str, Any]], bool]:
-        """Execute all collected tools and return their results along with breaking tool status."""
-        tool_results = await self._execute_collected_tools()
-
-        # Check if any breaking tool was executed by examining the collected tools
-        collected_tools = self.token_processor.get_collected_tools()
-        breaking_tool_executed = False
-
-        for tool_call in collected_tools:
-            xml_tag_name = tool_call.get("xml_tag_name")
-            if xml_tag_name:
-                xml_tool_def = self.tool_registry.get_xml_tool_definition(xml_tag_name)
-                if xml_tool_def and xml_tool_def.is_breaking:
-                    breaking_tool_executed = True
-                    break
-
-        return tool_results, breaking_tool_executed
-
     async def _execute_collected_tools(self) -> List[Dict[str, Any]]:
         """Execute all collected tools and return their results. Stop execution when a breaking tool is encountered."""
-        collected_tools = self.token_processor.get_collected_tools()
-        tool_results = []
-
-        if not collected_tools:
-            return tool_results
-
-        logger.info(f"Executing {len(collected_tools)} collected tools")
-
-        for tool_call in collected_tools:
-            logger.info(f"tool_call: {tool_call}")
-            try:
-                function_name = tool_call["function_name"]
-                arguments = tool_call["arguments"]
-                tool_call_id = tool_call["id"]
-                xml_tag_name = tool_call.get("xml_tag_name")
-
-                # Check if this tool is breaking
-                is_breaking = False
-                if xml_tag_name:
-                    xml_tool_def = self.tool_registry.get_xml_tool_definition(
-                        xml_tag_name
-                    )
-                    if xml_tool_def:
-                        is_breaking = xml_tool_def.is_breaking
-
-                # Trigger callbacks before tool execution
-                logger.info(
-                    f"Triggering callbacks for tool {function_name} with arguments {arguments}"
-                )
-                self._trigger_callbacks(function_name, arguments, "start")
-
-                # Get the appropriate handler
-                handler = self.tool_handlers.get(function_name)
-                if not handler:
-                    error_msg = f"No handler found for function: {function_name}"
-                    logger.error(error_msg)
-                    tool_results.append(
-                        {
-                            "tool_call_id": tool_call_id,
-                            "function_name": function_name,
-                            "status": "failed",
-                            "error": error_msg,
-                        }
-                    )
-
-                    # If this was a breaking tool, stop execution even if it failed
-                    if is_breaking:
-                        logger.info(
-                            f"Breaking tool {function_name} encountered. Stopping execution."
-                        )
-                        break
-
-                    continue
-
-                # Execute the tool
-                result = await handler.execute(arguments)
-
-                if result.success:
-                    tool_results.append(
-                        {
-                            "tool_call_id": tool_call_id,
-                            "function_name": function_name,
-                            "status": "completed",
-                            "result": result.data,
-                        }
-                    )
-                    logger.info(f"Tool {function_name} executed successfully")
-                    # Trigger callbacks after tool execution
-                    self._trigger_callbacks(
-                        function_name, arguments, "end", result.data
-                    )
-                else:
-                    tool_results.append(
-                        {
-                            "tool_call_id": tool_call_id,
-                            "function_name": function_name,
-                            "status": "failed",
-                            "error": result.error,
-                        }
-                    )
-                    logger.error(f"Tool {function_name} failed: {result.error}")
-                    # Trigger callbacks on error
-                    self._trigger_callbacks(
-                        function_name, arguments, "error", result.error
-                    )
-
-                # If this was a breaking tool, stop execution after executing it
-                if is_breaking:
-                    logger.info(
-                        f"Breaking tool {function_name} executed. Stopping execution."
-                    )
-                    break
-
-            except Exception as e:
-                logger.error(
-                    f"Error executing tool {tool_call.get('function_name')}: {e}"
-                )
-                tool_results.append(
-                    {
-                        "tool_call_id": tool_call.get("id", "unknown"),
-                        "function_name": tool_call.get("function_name", "unknown"),
-                        "status": "failed",
-                        "error": str(e),
-                    }
-                )
-
-                # Check if this was a breaking tool even if it failed
-                xml_tag_name = tool_call.get("xml_tag_name")
-                if xml_tag_name:
-                    xml_tool_def = self.tool_registry.get_xml_tool_definition(
-                        xml_tag_name
-                    )
-                    if xml_tool_def and xml_tool_def.is_breaking:
-                        logger.info(
-                            f"Breaking tool {tool_call.get('function_name')} encountered (failed). Stopping execution."
-                        )
-                        break
-
+        tool_results: List[Dict[str, Any]] = []
+        async for _ in self._execute_collected_tools_and_yield_events(tool_results):
+            pass
         return tool_results
 
     async def _send_tool_results_to_endpoint(
@@ -971,9 +1152,7 @@ class Agent:
                 messages=[Message(role="user", content="Continue processing.")],
                 model=self.model,
                 tools_config=self.state.tools_config,
-                tools=(
-                    [tool.to_tool_info() for tool in self.tools] if self.tools else None
-                ),
+                tools=self._tool_infos(),
             )
 
         # Format tool results as a message
@@ -1007,7 +1186,7 @@ class Agent:
             messages=[tool_message],
             model=self.model,
             tools_config=self.state.tools_config,
-            tools=[tool.to_tool_info() for tool in self.tools] if self.tools else None,
+            tools=self._tool_infos(),
         )
 
         logger.debug(
@@ -1041,6 +1220,9 @@ class Agent:
         """
         Get the current file system structure with depth 2.
 
+        With send_file_system_diff, every listing after the first one only holds
+        the entries added, modified or removed since the previous call.
+
         Returns:
             Dictionary representing the file system structure
         """
@@ -1048,6 +1230,12 @@ class Agent:
             self.environment, path="/", max_depth=max_depth
         )
 
+        if self.send_file_system_diff and file_system_info.get("status") == "success":
+            previous = self._last_sent_file_system
+            self._last_sent_file_system = file_system_info
+            if previous and previous.get("path") == file_system_info["path"]:
+                file_system_info = diff_snapshots(previous, file_system_info)
+
         available_ports = await self.environment.get_available_ports()
         file_system_info["available_ports_for_deployments"] = available_ports
         return file_system_info
@@ -1246,8 +1434,6 @@ class Agent:
             )
 
             # Create a handler class for this specific tool
-            from ..tools.base import ToolHandler, ToolResult
-
             class CustomToolHandler(ToolHandler):
                 def __init__(self, tool_name):
                     super().__init__()
@@ -0,0 +1,58 @@
+"""
+Sharing of identical in-flight requests.
+
+When several callers ask for the same thing while a request for it is still
+running (e.g. the model issuing the same search twice in one turn), only the
+first one is sent and every caller receives its result.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger("RequestCoalescer")
+
+T = TypeVar("T")
+
+
+class RequestCoalescer:
+    """In-flight requests keyed by what they ask for"""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def run(self, key: Hashable, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a request, or wait for the identical one already running.
+
+        Args:
+            key: Identifies the request, e.g. the normalized query
+            request: Sends the request and returns its result
+
+        Returns:
+            The result of the request, shared by every caller with the same key
+        """
+        task = self._in_flight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            self.requests += 1
+            task = asyncio.ensure_future(request())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+            # Not the key itself, it may hold credentials
+            logger.debug("Sharing an in-flight request")
+        # A cancelled caller must not cancel the request of the others
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Retrieve the exception, callers that went away never will
+            task.exception()
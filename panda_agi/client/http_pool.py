@@ -0,0 +1,187 @@
+"""
+Process-wide pool of HTTP clients for the PandaAGI API.
+
+Agents are often short-lived (a web backend builds one per request), so each
+of them owning an `httpx.AsyncClient` means a new TCP and TLS handshake per
+chat turn. Clients are instead shared per (base URL, pool config, event loop)
+and kept alive until `close_shared_http_clients()` is called, typically on
+application shutdown.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger("HttpPool")
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    """Connection settings of a shared client"""
+
+    http2: bool = True
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    # Seconds an idle connection is kept open
+    keepalive_expiry: float = 60.0
+
+    def limits(self) -> httpx.Limits:
+        """Get the httpx connection limits"""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+@dataclass
+class HttpPoolMetrics:
+    """Connection reuse counters, filled from httpcore trace events"""
+
+    requests: int = 0
+    new_connections: int = 0
+    handshake_seconds: float = 0.0
+
+    @property
+    def reused_requests(self) -> int:
+        """Requests sent over an already open connection"""
+        return max(0, self.requests - self.new_connections)
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Fraction of requests that did not open a connection"""
+        if not self.requests:
+            return 0.0
+        return self.reused_requests / self.requests
+
+    @property
+    def average_handshake_seconds(self) -> float:
+        """Average TCP + TLS setup time of a new connection"""
+        if not self.new_connections:
+            return 0.0
+        return self.handshake_seconds / self.new_connections
+
+    @property
+    def handshake_seconds_saved(self) -> float:
+        """Estimated setup time avoided by reusing connections"""
+        return self.reused_requests * self.average_handshake_seconds
+
+    def request_trace(self) -> Callable[[str, Dict[str, Any]], Awaitable[None]]:
+        """
+        Count a request and get its trace callback.
+
+        The callback is passed as the "trace" request extension, httpcore calls
+        it around connection setup steps.
+        """
+        self.requests += 1
+        last_event_at = [0.0]
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            now = time.perf_counter()
+            if event_name == "connection.connect_tcp.started":
+                last_event_at[0] = now
+            elif event_name == "connection.connect_tcp.complete":
+                self.new_connections += 1
+                self.handshake_seconds += now - last_event_at[0]
+                last_event_at[0] = now
+            elif event_name == "connection.start_tls.complete":
+                self.handshake_seconds += now - last_event_at[0]
+
+        return trace
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the metrics as a dict"""
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_requests": self.reused_requests,
+            "reuse_ratio": round(self.reuse_ratio, 4),
+            "average_handshake_ms": round(self.average_handshake_seconds * 1000, 3),
+            "handshake_ms_saved": round(self.handshake_seconds_saved * 1000, 3),
+        }
+
+
+PoolKey = Tuple[str, HttpPoolConfig, asyncio.AbstractEventLoop]
+
+
+class SharedHttpPool:
+    """Shared `httpx.AsyncClient` instances and their metrics"""
+
+    def __init__(self):
+        self._clients: Dict[PoolKey, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, HttpPoolMetrics] = {}
+
+    def get_client(
+        self, base_url: str, config: Optional[HttpPoolConfig] = None
+    ) -> httpx.AsyncClient:
+        """
+        Get the shared client for a base URL, creating it if needed.
+
+        Must be called from a running event loop, since httpx clients cannot
+        be used across loops.
+
+        Args:
+            base_url: Base URL of the API
+            config: Connection settings, defaults to HttpPoolConfig()
+
+        Returns:
+            httpx.AsyncClient shared by every caller with the same arguments
+        """
+        config = config or HttpPoolConfig()
+        loop = asyncio.get_running_loop()
+        self._drop_closed_loops()
+
+        key = (base_url, config, loop)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            http2 = config.http2 and HTTP2_AVAILABLE
+            if config.http2 and not HTTP2_AVAILABLE:
+                logger.debug("h2 is not installed, using HTTP/1.1")
+            client = httpx.AsyncClient(
+                base_url=base_url, http2=http2, limits=config.limits()
+            )
+            self._clients[key] = client
+        return client
+
+    def metrics(self, base_url: str) -> HttpPoolMetrics:
+        """Get the metrics of the clients for a base URL"""
+        return self._metrics.setdefault(base_url, HttpPoolMetrics())
+
+    def all_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get the metrics of every base URL as dicts"""
+        return {url: metrics.as_dict() for url, metrics in self._metrics.items()}
+
+    def _drop_closed_loops(self):
+        """Forget clients created in event loops that are closed"""
+        for key in [k for k in self._clients if k[2].is_closed()]:
+            # Their connections died with the loop, nothing left to close
+            del self._clients[key]
+
+    async def aclose(self):
+        """Close the clients created in the running event loop"""
+        loop = asyncio.get_running_loop()
+        self._drop_closed_loops()
+        for key in [k for k in self._clients if k[2] is loop]:
+            client = self._clients.pop(key)
+            await client.aclose()
+
+
+shared_http_pool = SharedHttpPool()
+
+
+async def close_shared_http_clients():
+    """Close the shared clients, e.g. on application shutdown"""
+    await shared_http_pool.aclose()
+
+
+def get_http_pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Get connection reuse metrics per base URL"""
+    return shared_http_pool.all_metrics()
@@ -2,6 +2,7 @@ import inspect
 import json
 import logging
 import os
+import uuid
 from datetime import datetime
 from enum import Enum
 from typing import Any, Callable, Dict, List, Literal, Optional, Union
@@ -154,6 +155,10 @@ class AgentRequestModel(BaseModel):
         default=None,
         description="List of tools that the agent can use",
     )
+    request_id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()),
+        description="Idempotency key of the request, kept when it is retried",
+    )
 
     def to_dict(self):
         return self.model_dump()
@@ -5,8 +5,10 @@ from typing import AsyncGenerator, Dict, List, Optional, Union
 import httpx
 from pydantic import BaseModel, Field
 
+from .http_pool import HttpPoolConfig, HttpPoolMetrics, shared_http_pool
 from .models import AgentRequestModel
 from .state import AgentState
+from .stream_decoder import StreamFrameDecoder
 
 logger = logging.getLogger("AgentClient")
 logger.setLevel(logging.INFO)
@@ -65,21 +67,59 @@ class PandaAgiClient:
         conversation_id: Optional[str] = None,
         timeout: float = 60.0,
         state: AgentState = None,
+        shared_pool: bool = True,
+        pool_config: Optional[HttpPoolConfig] = None,
     ):
+        """
+        Args:
+            base_url: Base URL of the PandaAGI API
+            api_key: API key sent with every request
+            conversation_id: Conversation to continue, if any
+            timeout: Request timeout in seconds
+            state: Agent state shared with the agent
+            shared_pool: Use the process-wide connection pool instead of a
+                client owned by this instance
+            pool_config: Connection settings (HTTP/2, limits, keep-alive)
+        """
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.conversation_id = conversation_id
         self.timeout = timeout
+        self.shared_pool = shared_pool
+        self.pool_config = pool_config or HttpPoolConfig()
 
         self.state = state or AgentState()
         self.state.conversation_id = self.conversation_id
 
-        # HTTP client
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            headers=self._headers(),
-            timeout=httpx.Timeout(timeout=self.timeout),
-        )
+        # Own HTTP client, only when not using the shared pool
+        self._own_client: Optional[httpx.AsyncClient] = None
+        if shared_pool:
+            self.metrics = shared_http_pool.metrics(self.base_url)
+        else:
+            self.metrics = HttpPoolMetrics()
+            self._own_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers(),
+                timeout=httpx.Timeout(timeout=self.timeout),
+                limits=self.pool_config.limits(),
+            )
+
+    @property
+    def _client(self) -> httpx.AsyncClient:
+        """HTTP client used for requests"""
+        if self._own_client is not None:
+            return self._own_client
+        return shared_http_pool.get_client(self.base_url, self.pool_config)
+
+    def _request_extensions(self) -> Dict:
+        """Get the extensions recording connection metrics for a request"""
+        return {"trace": self.metrics.request_trace()}
+
+    async def __aenter__(self) -> "PandaAgiClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
     def _headers(self) -> Dict[str, str]:
         """Get headers for HTTP requests"""
@@ -109,32 +149,42 @@ class PandaAgiClient:
             endpoint = "/v2/agent/stream"
             logger.info(f"[HTTP] Sending streaming request to: {endpoint}")
 
+            headers = self._headers()
+            if request_data.get("request_id"):
+                # Lets the server recognize retries of the same request
+                headers["Idempotency-Key"] = request_data["request_id"]
+
             async with self._client.stream(
                 "POST",
                 endpoint,
                 json=request_data,
-                headers=self._headers(),
+                headers=headers,
+                timeout=httpx.Timeout(timeout=self.timeout),
+                extensions=self._request_extensions(),
             ) as response:
                 response.raise_for_status()
 
-                # Process the streaming response events
-                buffer = ""
-                async for chunk in response.aiter_text():
-                    buffer += chunk
-
-                    # check if chunk is conversation_id
-                    if self.is_chunk_conversation_id(chunk):
-                        self.conversation_id = self._extract_conversation_id(chunk)
-                        logger.debug(
-                            f"[HTTP] Received conversation_id: {self.conversation_id}"
-                        )
-                        yield {
-                            "type": "conversation_id",
-                            "conversation_id": self.conversation_id,
-                        }
-
-                    elif self.is_chunk_data(chunk):
-                        yield self._extract_data(chunk)
+                # Frames can be split across reads or share one
+                decoder = StreamFrameDecoder()
+                async for chunk in response.aiter_bytes():
+                    for frame_type, payload in decoder.feed(chunk):
+                        if frame_type == "conversation_id":
+                            self.conversation_id = payload
+                            logger.debug(
+                                f"[HTTP] Received conversation_id: {self.conversation_id}"
+                            )
+                            yield {
+                                "type": "conversation_id",
+                                "conversation_id": self.conversation_id,
+                            }
+                        else:
+                            yield payload
+
+                if decoder.in_frame:
+                    logger.warning(
+                        f"[HTTP] Stream ended inside a frame, dropped "
+                        f"{decoder.pending_bytes} bytes"
+                    )
 
         except httpx.HTTPStatusError as e:
             logger.error(
@@ -189,6 +239,8 @@ class PandaAgiClient:
                 endpoint,
                 json=request.model_dump(),
                 headers=self._headers(),
+                timeout=httpx.Timeout(timeout=self.timeout),
+                extensions=self._request_extensions(),
             )
             response.raise_for_status()
 
@@ -206,23 +258,11 @@ class PandaAgiClient:
             raise
 
     async def close(self):
-        """Close the HTTP client"""
-        await self._client.aclose()
-
-    def is_chunk_conversation_id(self, chunk: str) -> bool:
-        """Check if the chunk is a conversation ID"""
-        return chunk.startswith("<conversation_id>") and chunk.endswith(
-            "</conversation_id>"
-        )
-
-    def is_chunk_data(self, chunk: str) -> bool:
-        """Check if the chunk is a data chunk"""
-        return chunk.startswith("<data>") and chunk.endswith("</data>")
-
-    def _extract_conversation_id(self, chunk: str) -> str:
-        """Extract the conversation ID from a chunk"""
-        return chunk.split("<conversation_id>")[1].split("</conversation_id>")[0]
-
-    def _extract_data(self, chunk: str) -> str:
-        """Extract the data from a chunk"""
-        return chunk.split("<data>")[1].split("</data>")[0]
+        """
+        Close the HTTP client.
+
+        Shared clients stay open for other instances, they are closed with
+        close_shared_http_clients().
+        """
+        if self._own_client is not None:
+            await self._own_client.aclose()
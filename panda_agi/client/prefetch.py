@@ -0,0 +1,75 @@
+"""
+Speculative execution of read-only tool calls.
+
+The arguments of tools such as file_read or explore_directory are all in the
+opening tag's attributes, so they can start before the closing tag is
+streamed. The result is used if the complete call has the same arguments.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..tools.base import ToolResult
+from .retry import tool_call_key
+
+logger = logging.getLogger("ToolPrefetch")
+
+
+class ToolPrefetchCache:
+    """Tool calls started from their opening tag, keyed by name and arguments"""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def start(
+        self,
+        function_name: str,
+        arguments: Dict[str, Any],
+        execute: Callable[[], Awaitable[ToolResult]],
+    ):
+        """
+        Start a tool call in the background.
+
+        Args:
+            function_name: Name of the tool
+            arguments: Arguments parsed from the opening tag
+            execute: Runs the call and returns its ToolResult
+        """
+        key = tool_call_key(function_name, arguments)
+        if key not in self._tasks:
+            logger.debug(f"Prefetching {function_name} {arguments}")
+            self._tasks[key] = asyncio.create_task(execute())
+
+    async def take(
+        self, function_name: str, arguments: Dict[str, Any]
+    ) -> Optional[ToolResult]:
+        """
+        Get the result of a prefetched call with the same arguments.
+
+        Args:
+            function_name: Name of the tool
+            arguments: Arguments of the complete call
+
+        Returns:
+            The ToolResult, or None if no such call was prefetched
+        """
+        task = self._tasks.pop(tool_call_key(function_name, arguments), None)
+        if task is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return await task
+
+    def clear(self):
+        """Cancel and forget the prefetched calls that were not used"""
+        for task in self._tasks.values():
+            task.cancel()
+        self.discarded += len(self._tasks)
+        self._tasks.clear()
@@ -0,0 +1,96 @@
+"""
+Retry policy for agent streaming requests and replay of executed tool calls.
+
+A turn whose stream fails is sent again with the same request ID, so the
+server can recognize the retry. Tool calls that already ran during the failed
+attempt are not executed again when the retried stream emits them: their
+results are replayed.
+"""
+
+import json
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .panda_agi_client import PandaAgiConnectionError
+
+# Status codes worth retrying: rate limiting and unavailable upstreams
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+# (function name, arguments, result) of a tool call run while streaming
+ExecutedToolCall = Tuple[str, Dict[str, Any], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class StreamRetryPolicy:
+    """Jittered exponential backoff for failed streams"""
+
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int, rng: Optional[random.Random] = None) -> float:
+        """
+        Get the wait before a retry ("full jitter" backoff).
+
+        Args:
+            attempt: Number of the retry, starting at 1
+            rng: Random generator, defaults to the random module
+
+        Returns:
+            Seconds to wait, uniformly drawn up to the exponential bound
+        """
+        bound = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return (rng or random).uniform(0, bound)
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Check whether a streaming error is transient"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (PandaAgiConnectionError, httpx.TransportError))
+
+
+def tool_call_key(function_name: str, arguments: Dict[str, Any]) -> str:
+    """Identify a tool call by its function name and arguments"""
+    return json.dumps([function_name, arguments], sort_keys=True, default=str)
+
+
+class ToolResultReplay:
+    """Results of tool calls executed by failed attempts of a turn"""
+
+    def __init__(self):
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(results) for results in self._results.values())
+
+    def record(self, function_name: str, arguments: Dict[str, Any], result: Dict):
+        """Keep the result of an executed tool call"""
+        key = tool_call_key(function_name, arguments)
+        self._results.setdefault(key, []).append(result)
+
+    def take(
+        self, function_name: str, arguments: Dict[str, Any], tool_call_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get the result of an identical call executed earlier, at most once.
+
+        Args:
+            function_name: Name of the tool
+            arguments: Arguments of the call
+            tool_call_id: ID of the call in the current attempt
+
+        Returns:
+            The earlier result under the new tool call ID, or None
+        """
+        results = self._results.get(tool_call_key(function_name, arguments))
+        if not results:
+            return None
+        return {**results.pop(0), "tool_call_id": tool_call_id}
+
+    def clear(self):
+        """Forget every recorded result"""
+        self._results.clear()
@@ -0,0 +1,130 @@
+"""
+Incremental decoder for the frames of the agent streaming endpoint.
+
+The endpoint sends `<conversation_id>...</conversation_id>` and `<data>...</data>`
+frames, but network reads do not follow frame boundaries: a read can end in the
+middle of a tag or of a multi-byte character, or carry several frames at once.
+"""
+
+from typing import List, Optional, Tuple
+
+# Opening tag -> (frame type, closing tag)
+FRAME_TAGS = {
+    b"<data>": ("data", b"</data>"),
+    b"<conversation_id>": ("conversation_id", b"</conversation_id>"),
+}
+
+DEFAULT_MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+
+class StreamFrameError(ValueError):
+    """Raised when the stream cannot be decoded into frames"""
+
+
+class StreamFrameDecoder:
+    """
+    Turns arbitrarily split bytes into (frame type, payload) tuples.
+
+    Only the frame in progress is buffered, bytes outside of frames are
+    dropped as soon as they cannot start an opening tag. Payloads are decoded
+    as UTF-8 once the whole frame arrived.
+    """
+
+    def __init__(self, max_frame_bytes: int = DEFAULT_MAX_FRAME_BYTES):
+        """
+        Args:
+            max_frame_bytes: Largest accepted frame payload, bounds the buffer
+        """
+        self.max_frame_bytes = max_frame_bytes
+        self._buffer = bytearray()
+        self._frame: Optional[Tuple[str, bytes]] = None  # (type, closing tag)
+        self._search_pos = 0  # Where the next search for the closing tag starts
+        self._max_open_tag = max(len(tag) for tag in FRAME_TAGS)
+
+    @property
+    def pending_bytes(self) -> int:
+        """Number of bytes buffered for an incomplete frame"""
+        return len(self._buffer)
+
+    @property
+    def in_frame(self) -> bool:
+        """Whether a frame was opened and not closed yet"""
+        return self._frame is not None
+
+    def feed(self, data: bytes) -> List[Tuple[str, str]]:
+        """
+        Decode newly received bytes.
+
+        Args:
+            data: Bytes as read from the response
+
+        Returns:
+            Complete frames as (frame type, payload) tuples, in stream order
+
+        Raises:
+            StreamFrameError: If a frame payload exceeds max_frame_bytes
+        """
+        buffer = self._buffer
+        buffer += data
+        frames: List[Tuple[str, str]] = []
+        position = 0  # Start of the unconsumed bytes
+
+        while position < len(buffer):
+            if self._frame is None:
+                position = self._open_frame(position)
+                if self._frame is None:
+                    break
+                continue
+
+            frame_type, close_tag = self._frame
+            end = buffer.find(close_tag, max(position, self._search_pos))
+            if end < 0:
+                if len(buffer) - position > self.max_frame_bytes:
+                    raise StreamFrameError(
+                        f"<{frame_type}> frame exceeds {self.max_frame_bytes} bytes"
+                    )
+                # The closing tag may start in the last bytes already received
+                self._search_pos = max(position, len(buffer) - len(close_tag) + 1)
+                break
+
+            payload = buffer[position:end].decode("utf-8", errors="replace")
+            frames.append((frame_type, payload))
+            position = end + len(close_tag)
+            self._frame = None
+            self._search_pos = 0
+
+        # Keep only the unconsumed bytes, search positions are relative to them
+        del buffer[:position]
+        self._search_pos = max(0, self._search_pos - position)
+        return frames
+
+    def _open_frame(self, position: int) -> int:
+        """
+        Look for the next opening tag, opening a frame if it is found.
+
+        Args:
+            position: Where the unconsumed bytes start
+
+        Returns:
+            Position after the opening tag, or of the bytes to keep for later
+        """
+        buffer = self._buffer
+        while True:
+            start = buffer.find(b"<", position)
+            if start < 0:
+                return len(buffer)
+
+            for open_tag, frame in FRAME_TAGS.items():
+                if buffer.startswith(open_tag, start):
+                    self._frame = frame
+                    return start + len(open_tag)
+
+            rest = bytes(buffer[start : start + self._max_open_tag])
+            if len(rest) < self._max_open_tag and any(
+                open_tag.startswith(rest) for open_tag in FRAME_TAGS
+            ):
+                # Partial opening tag, wait for the rest
+                return start
+
+            # Not a frame, skip the "<"
+            position = start + 1
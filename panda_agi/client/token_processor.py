@@ -3,6 +3,9 @@ import logging
 import re
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
+from ..tools.registry import XML_ATTRIBUTES
+from .xml_scanner import XMLToolScanner
+
 logger = logging.getLogger("TokenProcessor")
 logger.setLevel(logging.INFO)
 
@@ -10,23 +13,31 @@ logger.setLevel(logging.INFO)
 class TokenProcessor:
     """Simple processor to collect and handle streaming tokens with XML tool detection"""
 
-    def __init__(self, tool_registry=None, collect_mode=False):
+    def __init__(self, tool_registry=None, collect_mode=False, memory_lean=False):
         self.collected_tokens: List[str] = []
-        self.accumulated_content = ""
-        self.xml_buffer = ""  # Buffer for detecting XML tool calls
+        # If True, the response is only kept as the list of collected tokens:
+        # token events carry just the delta and the full text is joined on request
+        self.memory_lean = memory_lean
+        self._accumulated_content = ""
         self.tool_registry = tool_registry
+        # Incremental scanner for detecting XML tool calls
+        self.xml_scanner = XMLToolScanner(tool_registry) if tool_registry else None
         self.completed_tools: List[Dict[str, Any]] = []  # Store completed tool calls
         self.tool_call_id_counter = 0
         self.collect_mode = collect_mode  # If True, collect tools for later execution
         self.immediate_execution_mode = (
             False  # If True, collect tools AND yield events for immediate execution
         )
+        # If True, yield tool_opened events for read-only tools whose arguments
+        # are all known once their opening tag is complete
+        self.prefetch_mode = False
 
     def reset(self):
         """Reset the processor state"""
         self.collected_tokens.clear()
-        self.accumulated_content = ""
-        self.xml_buffer = ""
+        self._accumulated_content = ""
+        if self.xml_scanner:
+            self.xml_scanner.reset()
         self.completed_tools.clear()
         self.tool_call_id_counter = 0
 
@@ -67,8 +78,8 @@ class TokenProcessor:
                     )
 
                 try:
-                    self.accumulated_content += token
-                    self.xml_buffer += token
+                    if not self.memory_lean:
+                        self._accumulated_content += token
 
                     # Check for XML tool calls and yield tool events
                     async for tool_event in self._process_xml_tools_and_yield_events(
@@ -77,13 +88,15 @@ class TokenProcessor:
                         logger.debug(f"Yielding XML tool call: {tool_event}")
                         yield tool_event
 
-                    yield {
+                    token_event = {
                         "type": "token",
                         "raw_token": token,
                         "parsed_data": None,
                         "content": token,
-                        "accumulated_content": self.accumulated_content,
                     }
+                    if not self.memory_lean:
+                        token_event["accumulated_content"] = self._accumulated_content
+                    yield token_event
 
                 except Exception as e:
                     logger.error(f"Error processing token: {e}")
@@ -96,16 +109,20 @@ class TokenProcessor:
         self, new_content: str
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """Process XML tool calls from the buffer and yield tool events or collect them"""
-        if not self.tool_registry:
+        if not self.xml_scanner:
             return
 
-        # Look for complete XML tool calls
-        xml_chunks = self._extract_xml_chunks(self.xml_buffer)
+        # Look for XML tool calls completed by the new content
+        xml_chunks = self.xml_scanner.feed(new_content)
 
-        for chunk in xml_chunks:
-            # Remove processed chunk from buffer
-            self.xml_buffer = self.xml_buffer.replace(chunk, "", 1)
+        opening_tags = self.xml_scanner.take_opening_tags()
+        if self.prefetch_mode:
+            for opening_tag in opening_tags:
+                tool_event = self._parse_prefetchable_opening_tag(opening_tag)
+                if tool_event:
+                    yield tool_event
 
+        for chunk in xml_chunks:
             # Parse the XML tool call
             tool_call = self._parse_xml_tool_call(chunk)
             if tool_call:
@@ -126,16 +143,13 @@ class TokenProcessor:
 
     async def _process_xml_tools(self, new_content: str):
         """Process XML tool calls from the buffer (legacy method for backward compatibility)"""
-        if not self.tool_registry:
+        if not self.xml_scanner:
             return
 
-        # Look for complete XML tool calls
-        xml_chunks = self._extract_xml_chunks(self.xml_buffer)
+        # Look for XML tool calls completed by the new content
+        xml_chunks = self.xml_scanner.feed(new_content)
 
         for chunk in xml_chunks:
-            # Remove processed chunk from buffer
-            self.xml_buffer = self.xml_buffer.replace(chunk, "", 1)
-
             # Parse the XML tool call
             tool_call = self._parse_xml_tool_call(chunk)
             if tool_call:
@@ -145,22 +159,6 @@ class TokenProcessor:
                 # The tool will be executed by the agent when it processes these events
                 logger.info(f"Detected XML tool call: {tool_call['function_name']}")
 
-    def _extract_xml_chunks(self, content: str) -> List[str]:
-        """Extract complete XML chunks from content using registry patterns"""
-        if not self.tool_registry:
-            return []
-
-        chunks = []
-
-        # Get XML patterns from registry
-        xml_patterns = self.tool_registry.get_all_xml_patterns()
-
-        for pattern in xml_patterns:
-            matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
-            chunks.extend(matches)
-
-        return chunks
-
     def _parse_xml_tool_call(self, xml_chunk: str) -> Optional[Dict[str, Any]]:
         """Parse an XML chunk into a tool call using registry definitions"""
         try:
@@ -205,6 +203,37 @@ class TokenProcessor:
             logger.error(f"Error parsing XML tool call: {e}")
             return None
 
+    def _parse_prefetchable_opening_tag(
+        self, opening_tag: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build a tool_opened event from the opening tag of a read-only tool.
+
+        Args:
+            opening_tag: Complete opening tag, e.g. '<file_read file="a.txt">'
+
+        Returns:
+            The event, or None if the tool may have side effects or the
+            attributes do not hold all its required parameters (e.g. they
+            come from its content)
+        """
+        tag_match = re.match(r"<([^>\s]+)", opening_tag)
+        tool_def = self.tool_registry.get_xml_tool_definition(tag_match.group(1))
+        if not tool_def or not tool_def.read_only:
+            return None
+
+        arguments = self._build_arguments_from_definition(
+            tool_def, self._extract_attributes(opening_tag), None
+        )
+        if any(param not in arguments for param in tool_def.required_params):
+            return None
+        return {
+            "type": "tool_opened",
+            "function_name": tool_def.function_name,
+            "arguments": arguments,
+            "xml_tag_name": tag_match.group(1),
+        }
+
     def _build_arguments_from_definition(
         self, tool_def, attributes: Dict[str, str], content: Optional[str]
     ) -> Dict[str, Any]:
@@ -246,7 +275,7 @@ class TokenProcessor:
         attributes = {}
 
         # Find the opening tag
-        opening_tag_match = re.match(r"<[^>]*>", xml_chunk)
+        opening_tag_match = re.match(f"<{XML_ATTRIBUTES}>", xml_chunk)
         if not opening_tag_match:
             return attributes
 
@@ -265,7 +294,7 @@ class TokenProcessor:
         """Extract content between opening and closing tags"""
         try:
             # Simple pattern to extract content
-            pattern = f"<{tag_name}[^>]*>(.*?)</{tag_name}>"
+            pattern = f"<{tag_name}{XML_ATTRIBUTES}>(.*?)</{tag_name}>"
             match = re.search(pattern, xml_chunk, re.DOTALL)
 
             if match:
@@ -305,6 +334,13 @@ class TokenProcessor:
         """Get all collected tokens"""
         return self.collected_tokens.copy()
 
+    @property
+    def accumulated_content(self) -> str:
+        """The full response text received so far"""
+        if self.memory_lean:
+            return "".join(self.collected_tokens)
+        return self._accumulated_content
+
     def get_accumulated_content(self) -> str:
         """Get the accumulated content"""
         return self.accumulated_content
@@ -386,6 +422,10 @@ class TokenProcessor:
         self.collect_mode = collect_mode
         self.immediate_execution_mode = immediate_execution_mode
 
+    def set_prefetch_mode(self, prefetch_mode: bool):
+        """Set whether to yield tool_opened events for prefetchable tools"""
+        self.prefetch_mode = prefetch_mode
+
     def get_collected_tools(self) -> List[Dict[str, Any]]:
         """Get all collected tool calls"""
         return self.completed_tools.copy()
@@ -0,0 +1,207 @@
+"""
+Planning of concurrent execution for the tool calls of one agent turn.
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from ..envs.paths import paths_overlap
+
+# (path, writes) for path-scoped or read-only tools, None for tools that must run alone
+ToolAccess = Optional[Tuple[Optional[str], bool]]
+
+
+def get_tool_access(
+    tool_call: Dict[str, Any],
+    tool_registry,
+    resolve_path: Optional[Callable[[str], Any]] = None,
+) -> ToolAccess:
+    """
+    Describe what a tool call touches using the conflict rules declared in the registry.
+
+    Args:
+        tool_call: Tool call as collected by the TokenProcessor
+        tool_registry: Registry holding the XML tool definitions
+        resolve_path: Optional callable used to normalize paths (e.g. the environment's resolver)
+
+    Returns:
+        (path, writes) tuple, or None if the tool call must run alone
+    """
+    xml_tag_name = tool_call.get("xml_tag_name")
+    definition = (
+        tool_registry.get_xml_tool_definition(xml_tag_name) if xml_tag_name else None
+    )
+    if not definition or definition.is_breaking:
+        return None
+
+    path = None
+    if definition.path_param:
+        path = tool_call.get("arguments", {}).get(definition.path_param)
+        if not path:
+            # Unknown target, only safe if the tool cannot modify anything
+            return (None, False) if definition.read_only else None
+        path = str(resolve_path(path)) if resolve_path else str(path)
+        path = os.path.normpath(path)
+    elif not definition.read_only:
+        return None
+
+    return path, not definition.read_only
+
+
+def _conflicts(access_a: ToolAccess, access_b: ToolAccess) -> bool:
+    """Check whether two tool accesses cannot run at the same time"""
+    if access_a is None or access_b is None:
+        return True
+
+    path_a, writes_a = access_a
+    path_b, writes_b = access_b
+    if not (writes_a or writes_b) or path_a is None or path_b is None:
+        return False
+    return paths_overlap(path_a, path_b)
+
+
+def conflicts_with_any(
+    tool_call: Dict[str, Any],
+    other_calls: List[Dict[str, Any]],
+    tool_registry,
+    resolve_path: Optional[Callable[[str], Any]] = None,
+) -> bool:
+    """Check whether a tool call cannot run at the same time as any of other_calls"""
+    access = get_tool_access(tool_call, tool_registry, resolve_path)
+    return any(
+        _conflicts(access, get_tool_access(other, tool_registry, resolve_path))
+        for other in other_calls
+    )
+
+
+def plan_tool_batches(
+    tool_calls: List[Dict[str, Any]],
+    tool_registry,
+    resolve_path: Optional[Callable[[str], Any]] = None,
+) -> List[List[int]]:
+    """
+    Split tool calls into consecutive batches of mutually independent calls.
+
+    Batches run one after the other and calls within a batch may run concurrently.
+    A call never overtakes an earlier call it conflicts with, so the observable
+    effect is the same as running the calls in order.
+
+    Args:
+        tool_calls: Tool calls in the order they were emitted by the model
+        tool_registry: Registry holding the XML tool definitions
+        resolve_path: Optional callable used to normalize paths
+
+    Returns:
+        List of batches, each a list of indexes into tool_calls
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_accesses: List[ToolAccess] = []
+
+    for index, tool_call in enumerate(tool_calls):
+        access = get_tool_access(tool_call, tool_registry, resolve_path)
+
+        if any(_conflicts(access, other) for other in current_accesses):
+            batches.append(current)
+            current, current_accesses = [], []
+
+        current.append(index)
+        current_accesses.append(access)
+
+        # Exclusive tools close their batch so nothing runs alongside them
+        if access is None:
+            batches.append(current)
+            current, current_accesses = [], []
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+class StreamingToolScheduler:
+    """
+    Runs tool calls in background tasks as they are detected in a stream.
+
+    A call starts once every earlier call it conflicts with has finished and a
+    concurrency slot is free, so reading the stream never waits for a tool.
+    Events of the running calls are queued until the consumer picks them up.
+    """
+
+    def __init__(
+        self,
+        tool_registry,
+        resolve_path: Optional[Callable[[str], Any]] = None,
+        max_concurrent: int = 1,
+    ):
+        """
+        Args:
+            tool_registry: Registry holding the XML tool definitions
+            resolve_path: Optional callable used to normalize paths
+            max_concurrent: Maximum number of calls running at the same time
+        """
+        self.tool_registry = tool_registry
+        self.resolve_path = resolve_path
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[Tuple[asyncio.Task, ToolAccess]] = []
+        self._running = 0
+
+    def submit(
+        self,
+        tool_call: Dict[str, Any],
+        execute: Callable[[], AsyncIterator[Dict[str, Any]]],
+    ):
+        """
+        Schedule a tool call.
+
+        Args:
+            tool_call: Tool call with its xml_tag_name and arguments
+            execute: Returns an async iterator running the call and yielding its events
+        """
+        access = get_tool_access(tool_call, self.tool_registry, self.resolve_path)
+        blockers = [task for task, other in self._tasks if _conflicts(access, other)]
+        task = asyncio.create_task(self._run(blockers, execute))
+        self._tasks.append((task, access))
+        self._running += 1
+
+    async def _run(
+        self,
+        blockers: List[asyncio.Task],
+        execute: Callable[[], AsyncIterator[Dict[str, Any]]],
+    ):
+        try:
+            if blockers:
+                await asyncio.wait(blockers)
+            async with self._semaphore:
+                async for event in execute():
+                    self._queue.put_nowait(event)
+        finally:
+            # Marks the end of the call for join()
+            self._queue.put_nowait(None)
+
+    def pending_events(self) -> List[Dict[str, Any]]:
+        """Get the events queued so far without waiting"""
+        events = []
+        while not self._queue.empty():
+            event = self._queue.get_nowait()
+            if event is None:
+                self._running -= 1
+            else:
+                events.append(event)
+        return events
+
+    async def join(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the remaining events until every scheduled call finished"""
+        while self._running:
+            event = await self._queue.get()
+            if event is None:
+                self._running -= 1
+            else:
+                yield event
+
+    def cancel(self):
+        """Cancel the calls that did not finish"""
+        for task, _ in self._tasks:
+            task.cancel()
@@ -0,0 +1,145 @@
+"""
+Incremental scanner for XML tool calls embedded in a token stream.
+"""
+
+import re
+from typing import Dict, List, Optional, Pattern
+
+from ..tools.registry import XML_ATTRIBUTES
+
+_TAG_NAME = re.compile(r"<([^\s<>/\"']*)")
+_ATTRIBUTES = re.compile(XML_ATTRIBUTES)
+
+
+class XMLToolScanner:
+    """
+    Stateful scanner that detects complete XML tool calls as tokens arrive.
+
+    Only newly arrived text is examined on each call to `feed`: while outside a
+    tool call the scanner looks for an opening tag of any registered tool using
+    the registry's single precompiled alternation, and while inside one it only
+    looks for the matching closing tag. Text that cannot be part of a tool call
+    is dropped, so the internal buffer never holds more than the call in progress.
+    """
+
+    def __init__(self, tool_registry):
+        self.tool_registry = tool_registry
+        self.buffer = ""
+        self.open_tag: Optional[str] = None  # Tag name of the call in progress
+        self._search_pos = 0  # Position in buffer where the next search resumes
+        self._close_patterns: Dict[str, Pattern] = {}
+        # Opening tags completed since the last take_opening_tags() call
+        self.opening_tags: List[str] = []
+
+    def reset(self):
+        """Reset the scanner state"""
+        self.buffer = ""
+        self.open_tag = None
+        self._search_pos = 0
+        self.opening_tags.clear()
+
+    def take_opening_tags(self) -> List[str]:
+        """Get the opening tags completed by the text fed since the last call"""
+        opening_tags = self.opening_tags
+        self.opening_tags = []
+        return opening_tags
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Feed newly streamed text and return the raw XML of every tool call completed by it.
+
+        Args:
+            text: The newly arrived text
+
+        Returns:
+            List of complete XML chunks, in stream order
+        """
+        if not text:
+            return []
+
+        self.buffer += text
+        chunks = []
+
+        while True:
+            if self.open_tag is None:
+                if not self._find_opening_tag():
+                    break
+            else:
+                chunk = self._find_closing_tag()
+                if chunk is None:
+                    break
+                chunks.append(chunk)
+
+        return chunks
+
+    def _find_opening_tag(self) -> bool:
+        """Look for the next opening tag and move the buffer start onto it"""
+        pattern = self.tool_registry.get_xml_tag_pattern()
+        match = pattern.search(self.buffer, self._search_pos) if pattern else None
+
+        # A tag still open before the match holds it in an attribute value, and
+        # text that cannot grow into an opening tag is dropped
+        end = match.start() if match else len(self.buffer)
+        start = self.buffer.find("<", 0, end)
+        while start != -1 and not self._could_open(start):
+            start = self.buffer.find("<", start + 1, end)
+        if start != -1 or match is None:
+            self.buffer = self.buffer[start:] if start != -1 else ""
+            self._search_pos = 0
+            return False
+
+        self.open_tag = match.group(1)
+        self.opening_tags.append(match.group(0))
+        self.buffer = self.buffer[match.start() :]
+        self._search_pos = match.end() - match.start()
+        return True
+
+    def _could_open(self, start: int) -> bool:
+        """
+        Check whether the unterminated text at a '<' may still grow into a
+        registered opening tag.
+
+        Quotes are tracked, so a '<' or '>' inside an attribute value neither
+        starts nor ends a tag.
+        """
+        name_match = _TAG_NAME.match(self.buffer, start)
+        name = name_match.group(1).lower()
+        tags = [tag.lower() for tag in self.tool_registry.list_xml_tools()]
+
+        position = name_match.end()
+        if position == len(self.buffer):
+            return any(tag.startswith(name) for tag in tags)
+        if name not in tags or not self.buffer[position].isspace():
+            return False
+
+        # Stops at a '>' ending the tag, or at a quote still open
+        end = _ATTRIBUTES.match(self.buffer, position).end()
+        return end == len(self.buffer) or self.buffer[end] != ">"
+
+    def _find_closing_tag(self) -> Optional[str]:
+        """Look for the closing tag of the call in progress and pop the complete chunk"""
+        close_pattern = self._get_close_pattern(self.open_tag)
+        match = close_pattern.search(self.buffer, self._search_pos)
+
+        if match is None:
+            # Rescan only the tail that could hold the start of a split closing tag
+            close_length = len(self.open_tag) + 3
+            self._search_pos = max(
+                self._search_pos, len(self.buffer) - close_length + 1
+            )
+            return None
+
+        chunk = self.buffer[: match.end()]
+        self.buffer = self.buffer[match.end() :]
+        self.open_tag = None
+        self._search_pos = 0
+        return chunk
+
+    def _get_close_pattern(self, tag: str) -> Pattern:
+        """Get the cached closing tag pattern for a tag"""
+        key = tag.lower()
+        if key not in self._close_patterns:
+            self._close_patterns[key] = re.compile(
+                f"</{re.escape(tag)}>", re.IGNORECASE
+            )
+        return self._close_patterns[key]
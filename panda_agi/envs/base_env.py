@@ -6,19 +6,177 @@ and shell commands are executed.
 """
 
 import asyncio
+import base64
+import fnmatch
+import json
 import logging
+import shlex
+import tempfile
 import time
+import uuid
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import (
+    Any,
+    AsyncIterable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from pydantic import BaseModel
 
-from .tmux_executor import TmuxExecutor
+from . import content_search, name_search
+from .output_log import OutputRingLog
+from .tmux_executor import IncrementalCapture, TmuxExecutor
+from .workspace_snapshot import SnapshotEntry, WorkspaceSnapshotCache
 
 logger = logging.getLogger("BaseEnv")
 logger.setLevel(logging.INFO)
 
+# Common directories that are listed but not descended into when exploring
+EXCLUDED_DIRS = frozenset(
+    {
+        "__pycache__",
+        "node_modules",
+        ".git",
+        ".svn",
+        ".hg",
+        ".bzr",
+        "venv",
+        "env",
+        ".venv",
+        ".env",
+        "virtualenv",
+        ".tox",
+        ".pytest_cache",
+        ".mypy_cache",
+        ".coverage",
+        "htmlcov",
+        "dist",
+        "build",
+        "egg-info",
+        ".egg-info",
+        "target",
+        "bin",
+        "obj",
+        ".vs",
+        ".vscode",
+        ".idea",
+        "*.egg-info",
+        ".DS_Store",
+        "Thumbs.db",
+        ".sass-cache",
+        ".cache",
+    }
+)
+
+
+def is_excluded_dir(name: str, exclude_dirs: Optional[Iterable[str]]) -> bool:
+    """
+    Check whether a directory name matches an exclusion (names or glob patterns).
+
+    Args:
+        name: Directory name
+        exclude_dirs: Names or glob patterns such as "*.egg-info"
+
+    Returns:
+        True if the directory should not be descended into
+    """
+    if not exclude_dirs:
+        return False
+    if name in exclude_dirs:
+        return True
+    return any(
+        fnmatch.fnmatch(name, pattern) for pattern in exclude_dirs if "*" in pattern
+    )
+
+
+def line_slice(
+    start_line: Optional[int], end_line: Optional[int], line_count: Optional[int]
+) -> Tuple[int, Optional[int]]:
+    """
+    Convert a 1-based inclusive line range to slice indexes.
+
+    Args:
+        start_line: First line, 1-based (default: 1)
+        end_line: Last line, inclusive (default: last line)
+        line_count: Number of lines of the file, None if unknown
+
+    Returns:
+        (start, end) 0-based with an exclusive end, clamped to the file when
+        line_count is known (end is None for "to the end" otherwise)
+    """
+    start = max(0, (start_line if start_line is not None else 1) - 1)
+    end = end_line
+    if line_count is not None:
+        end = line_count if end is None else min(end, line_count)
+    if end is not None:
+        end = max(start, end)
+    return start, end
+
+
+def replace_count_error(
+    old_str: str, count: int, expected_count: Optional[int]
+) -> Optional[str]:
+    """Get the reason not to apply a replacement, None if it can be applied"""
+    if count == 0:
+        return f"String not found in file: {old_str}"
+    if expected_count is not None and count != expected_count:
+        return (
+            f"Expected {expected_count} occurrences but found {count}, "
+            "the file was not changed"
+        )
+    return None
+
+
+# Required keys of each action of apply_file_operations
+FILE_OPERATION_PARAMS = {
+    "read": ("path",),
+    "write": ("path", "content"),
+    "replace": ("path", "old_str", "new_str"),
+}
+
+
+# Optional keys of apply_file_operations holding line numbers or counts
+FILE_OPERATION_INT_PARAMS = ("start_line", "end_line", "expected_count")
+
+
+def validate_file_operation(operation: Dict[str, Any]) -> Optional[str]:
+    """Get the reason a batch file operation is invalid, None if it is valid"""
+    action = operation.get("action")
+    if action not in FILE_OPERATION_PARAMS:
+        return f"Unknown action: {action}, expected one of read, write, replace"
+    missing = [key for key in FILE_OPERATION_PARAMS[action] if key not in operation]
+    if missing:
+        return f"Missing required parameters for {action}: {', '.join(missing)}"
+    invalid = [
+        key
+        for key in FILE_OPERATION_INT_PARAMS
+        if operation.get(key) is not None and not isinstance(operation[key], int)
+    ]
+    if invalid:
+        return f"Parameters must be integers: {', '.join(invalid)}"
+    return None
+
+
+def file_operations_result(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summarize the per-operation results of apply_file_operations"""
+    failed = sum(1 for result in results if result.get("status") != "success")
+    summary = {
+        "status": "success" if not failed else "error",
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+    }
+    if failed:
+        summary["message"] = f"{failed} of {len(results)} file operations failed"
+    return summary
+
 
 class ExecutionResult(BaseModel):
     success: bool
@@ -48,6 +206,15 @@ class ShellOutput(BaseModel):
 class BaseEnv(ABC):
     """Abstract base class for environment management."""
 
+    # Seconds between session liveness checks while waiting for a command
+    SESSION_CHECK_INTERVAL = 2.0
+    # Captures attempted after a completion signal before giving up
+    CAPTURE_RETRIES = 20
+    # Maximum bytes kept on disk per background session output log
+    OUTPUT_LOG_MAX_BYTES = 1024 * 1024
+    # Largest JSON arguments passed on the command line by _run_script
+    MAX_SCRIPT_ARGUMENT_BYTES = 64 * 1024
+
     def __init__(
         self,
         base_path: Union[str, Path],
@@ -72,6 +239,15 @@ class BaseEnv(ABC):
         # Defer tmux initialization - will be checked when first needed
         self._tmux_initialized: bool = False
 
+        # Workspace listings sent to the agent, see get_workspace_snapshot
+        self.snapshot_cache = WorkspaceSnapshotCache()
+        # Identifies this environment in caches shared between agents
+        self.cache_scope = uuid.uuid4().hex
+
+        # Output read so far from background sessions, created on first read
+        self._output_logs: Dict[str, OutputRingLog] = {}
+        self._output_log_dir: Optional[Path] = None
+
     @property
     def current_directory(self) -> Path:
         """Get the current working directory."""
@@ -121,6 +297,76 @@ class BaseEnv(ABC):
         else:
             return self.working_directory / path
 
+    async def get_workspace_snapshot(
+        self,
+        path: Union[str, Path] = "/",
+        max_depth: int = 2,
+        max_entries: Optional[int] = 1000,
+    ) -> Dict[str, Any]:
+        """
+        List a directory tree for the agent, reusing the previous listing if current.
+
+        Excluded directories (EXCLUDED_DIRS) are listed but not descended into.
+        A cached listing is dropped when a file operation touches its tree
+        (see invalidate_snapshots) and is not reused while background
+        processes run, since they may change files at any time.
+
+        Args:
+            path: Directory to list
+            max_depth: Maximum depth of the listing
+            max_entries: Maximum number of entries
+
+        Returns:
+            Listing as returned by list_files
+        """
+        target_path = self._resolve_path(path)
+        key = (str(target_path), max_depth, max_entries)
+
+        entry = self.snapshot_cache.get(key)
+        if entry is not None and await self._is_snapshot_current(entry):
+            self.snapshot_cache.hits += 1
+            return dict(entry.result)
+
+        self.snapshot_cache.misses += 1
+        result = await self.list_files(
+            str(target_path),
+            recursive=True,
+            max_depth=max_depth,
+            exclude_dirs=EXCLUDED_DIRS,
+            max_entries=max_entries,
+        )
+        if result.get("status") == "success":
+            fingerprint = await self._snapshot_fingerprint(result)
+            self.snapshot_cache.put(key, result, fingerprint)
+        else:
+            self.snapshot_cache.discard(key)
+        return dict(result)
+
+    def invalidate_snapshots(self, path: Optional[Union[str, Path]] = None):
+        """
+        Drop cached workspace listings that may include a path.
+
+        Args:
+            path: Path that was created, modified or deleted, None for all
+        """
+        if path is not None:
+            path = str(self._resolve_path(path))
+        self.snapshot_cache.invalidate(path)
+
+    async def _snapshot_fingerprint(self, result: Dict[str, Any]) -> Any:
+        """
+        Capture what is needed to tell later whether a listing is still current.
+
+        Environments that can check this cheaply (e.g. directory mtimes)
+        override this together with _is_snapshot_current.
+        """
+        return None
+
+    async def _is_snapshot_current(self, entry: SnapshotEntry) -> bool:
+        """Check whether a cached listing can be reused"""
+        # Background processes may change files at any time
+        return not self.tmux_executor.active_sessions
+
     @abstractmethod
     async def _run_command(self, command: str, timeout: int = 30) -> ExecutionResult:
         """
@@ -136,6 +382,35 @@ class BaseEnv(ABC):
         """
         pass
 
+    async def _run_script(self, module, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a standard library only module of this package as a script where
+        the files are, e.g. inside a sandbox.
+
+        The module's main() reads its arguments as base64 JSON from argv and
+        prints a JSON result.
+
+        Args:
+            module: Module to run, e.g. content_search
+            arguments: Keyword arguments of the module's function
+
+        Returns:
+            The printed result, or an error status if the script failed
+        """
+        with open(module.__file__, encoding="utf-8") as f:
+            script = f.read()
+        encoded = base64.b64encode(json.dumps(arguments).encode()).decode()
+        result = await self._run_command(
+            f"python3 -c {shlex.quote(script)} {encoded}", timeout=self.timeout
+        )
+        try:
+            return json.loads(result.output.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            return {
+                "status": "error",
+                "message": f"Script failed: {result.error or result.output}",
+            }
+
     @abstractmethod
     async def _initialize_tmux(self):
         """
@@ -210,7 +485,9 @@ class BaseEnv(ABC):
             logger.info(f"session {session_id} registered")
             logger.info(f"active sessions: {self.tmux_executor.active_sessions.keys()}")
 
-            struct_result = self.tmux_executor.generate_command(session_id, command)
+            struct_result = self.tmux_executor.generate_command(
+                session_id, command, signal_completion=blocking
+            )
             send_result = await self._run_command(
                 struct_result.tmux_command, timeout=timeout
             )
@@ -228,42 +505,16 @@ class BaseEnv(ABC):
             command_timeout = (
                 timeout or self.timeout
             )  # max timeout is the timeout of the sandbox
-            start_wait = time.perf_counter()
             final_output = ""
             command_id = struct_result.command_id
 
             if blocking:
-                # Poll for command completion with shorter intervals
-                while (time.perf_counter() - start_wait) < command_timeout:
-                    # Check if session still exists
-                    if not await self._session_exists(session_id):
-                        logger.error(
-                            f"session {session_id} ended before command completion"
-                        )
-                        break
-
-                    # Capture session output
-                    capture_cmd = self.tmux_executor.generate_capture_command(
-                        session_id
-                    )
-                    capture_result = await self._run_command(capture_cmd, timeout=10)
-                    current_output = capture_result.output or ""
-
-                    # Check completion using TmuxExecutor
-                    parse_result = self.tmux_executor.parse_command_output(
-                        session_id, command_id, current_output
-                    )
-
-                    if parse_result.status == "success" and parse_result.completed:
-                        final_output = current_output
-                        break
-
-                    else:
-                        logger.debug(
-                            f"command {command_id} not completed: {parse_result}"
-                        )
-
-                    await asyncio.sleep(0.5)  # check every 0.5 seconds
+                final_output = await self._wait_for_command(
+                    session_id,
+                    command_id,
+                    struct_result.completion_channel,
+                    command_timeout,
+                )
 
             if final_output:
                 parse_result = self.tmux_executor.parse_command_output(
@@ -272,6 +523,13 @@ class BaseEnv(ABC):
                 clean_output = (
                     parse_result.output if parse_result.status == "success" else ""
                 )
+            elif not blocking:
+                # Start the session's output cursor so later views only return
+                # what was printed after this call
+                parse_result = await self._read_session_output(session_id)
+                clean_output = "\n".join(
+                    parse_result.lines + [parse_result.partial_line]
+                ).strip("\n")
             else:
                 capture_cmd = self.tmux_executor.generate_capture_command(session_id)
                 capture_result = await self._run_command(capture_cmd, timeout=10)
@@ -290,6 +548,9 @@ class BaseEnv(ABC):
                 )
                 await self.kill_background_process(session_id)
 
+            # The command may have changed any file
+            self.invalidate_snapshots()
+
             await self.change_directory(original_dir)
 
             if parse_result.exit_code == "0":
@@ -324,6 +585,69 @@ class BaseEnv(ABC):
                 },
             )
 
+    async def _wait_for_command(
+        self, session_id: str, command_id: str, channel: str, timeout: float
+    ) -> str:
+        """
+        Wait until a command signals its completion channel.
+
+        A single `tmux wait-for` replaces polling the pane, so short commands
+        return as soon as they finish. The session is checked periodically so
+        that a shell that dies without signalling does not block until timeout.
+
+        Args:
+            session_id: The tmux session running the command
+            command_id: The command ID
+            channel: Completion channel of the command
+            timeout: Maximum time to wait in seconds
+
+        Returns:
+            The captured pane output once the command completed, "" otherwise
+        """
+        wait_cmd = self.tmux_executor.generate_wait_for_command(channel)
+        wait_task = asyncio.ensure_future(
+            self._run_command(wait_cmd, timeout=timeout)
+        )
+        signalled = False
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    {wait_task}, timeout=self.SESSION_CHECK_INTERVAL
+                )
+                if done:
+                    signalled = wait_task.result().success
+                    break
+                if not await self._session_exists(session_id):
+                    logger.error(
+                        f"session {session_id} ended before command completion"
+                    )
+                    break
+        finally:
+            if not signalled:
+                # Wake up the waiter (or a timed out one still registered in tmux)
+                # so it does not linger on the server
+                wait_task.cancel()
+                signal_cmd = self.tmux_executor.generate_signal_command(channel)
+                await self._run_command(signal_cmd, timeout=10)
+
+        if not signalled:
+            return ""
+
+        # The signal can overtake the last lines of pane output, re-capture briefly
+        capture_cmd = self.tmux_executor.generate_capture_command(session_id)
+        for _ in range(self.CAPTURE_RETRIES):
+            capture_result = await self._run_command(capture_cmd, timeout=10)
+            current_output = capture_result.output or ""
+            parse_result = self.tmux_executor.parse_command_output(
+                session_id, command_id, current_output
+            )
+            if parse_result.completed:
+                return current_output
+            await asyncio.sleep(0.05)
+
+        logger.debug(f"command {command_id} signalled but output incomplete")
+        return ""
+
     @abstractmethod
     async def write_file(
         self,
@@ -350,6 +674,25 @@ class BaseEnv(ABC):
         """
         pass
 
+    async def write_file_stream(
+        self, path: Union[str, Path], chunks: AsyncIterable[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Write a binary file from chunks as they arrive, e.g. from a download.
+
+        This default collects the chunks and calls write_file. Backends
+        override it so that the whole file is never held in memory.
+
+        Args:
+            path: File path (relative to current directory)
+            chunks: Content of the file
+
+        Returns:
+            Same dict as write_file
+        """
+        content = b"".join([chunk async for chunk in chunks])
+        return await self.write_file(path, content, mode="wb", encoding=None)
+
     @abstractmethod
     async def read_file(
         self,
@@ -377,6 +720,233 @@ class BaseEnv(ABC):
         """
         pass
 
+    async def read_file_lines(
+        self,
+        path: Union[str, Path],
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        encoding: Optional[str] = "utf-8",
+    ) -> Dict[str, Any]:
+        """
+        Read a range of lines of a text file.
+
+        This default reads the whole file and slices it. Backends override it
+        to read only the requested lines.
+
+        Args:
+            path: File path (relative to current directory)
+            start_line: First line to read, 1-based (default: 1)
+            end_line: Last line to read, inclusive (default: last line)
+            encoding: File encoding
+
+        Returns:
+            Same dict as read_file, plus:
+                - line_range: {"start", "end"} of the lines read, as 0-based
+                  indexes with an exclusive end
+        """
+        result = await self.read_file(path, encoding=encoding)
+        if result.get("status") != "success":
+            return result
+
+        lines = result["content"].splitlines(keepends=True)
+        start, end = line_slice(start_line, end_line, len(lines))
+        result["content"] = "".join(lines[start:end])
+        result["line_range"] = {"start": start, "end": end}
+        return result
+
+    async def replace_in_file(
+        self,
+        path: Union[str, Path],
+        old_str: str,
+        new_str: str,
+        expected_count: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Replace every occurrence of a string in a file.
+
+        This default reads the file, replaces and writes it back. Backends
+        override it with stream_replace, which runs next to the file and
+        swaps in the result atomically.
+
+        Args:
+            path: File path (relative to current directory)
+            old_str: String to replace
+            new_str: Replacement
+            expected_count: If set, the file is left unchanged unless exactly
+                this many occurrences are found
+
+        Returns:
+            Dict containing:
+                - status: success/error
+                - path: Absolute path of the file
+                - replacements: Number of occurrences replaced
+                - size: New file size
+                - message: Error message if any
+        """
+        result = await self.read_file(path)
+        if result.get("status") != "success":
+            return result
+
+        content = result["content"]
+        count = content.count(old_str) if old_str else 0
+        error = replace_count_error(old_str, count, expected_count)
+        if error:
+            return {"status": "error", "message": error, "file": result["path"]}
+
+        write_result = await self.write_file(path, content.replace(old_str, new_str))
+        if write_result.get("status") == "success":
+            write_result["replacements"] = count
+        return write_result
+
+    async def search_content(
+        self,
+        regex: str,
+        path: Optional[Union[str, Path]] = None,
+        glob: Optional[str] = None,
+        ignore_case: bool = False,
+        context_lines: int = 0,
+        max_results: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        Search the files of a directory tree with a regular expression.
+
+        Excluded directories (EXCLUDED_DIRS), hidden, binary and very large
+        files are skipped. This default runs content_search where the files
+        are, LocalEnv narrows the files to read with a trigram index.
+
+        Args:
+            regex: Python regular expression
+            path: Directory to search (default: current directory)
+            glob: Comma-separated globs of the files to search, e.g. "*.py"
+            ignore_case: Whether the search is case-insensitive
+            context_lines: Lines of context before and after each match
+            max_results: Maximum number of matching lines
+
+        Returns:
+            Dict containing:
+                - status: success/error
+                - path: Directory that was searched
+                - matches: Matching lines with file, line_number, line_content
+                  (and before/after context lines)
+                - match_count: Number of matches returned
+                - files_searched: Number of files read
+                - truncated: Whether max_results cut the results short
+                - message: Error message if any
+        """
+        target_path = self._resolve_path(path or ".")
+        result = await self._run_script(
+            content_search,
+            {
+                "root": str(target_path),
+                "regex": regex,
+                "glob": glob,
+                "ignore_case": ignore_case,
+                "context_lines": context_lines,
+                "max_results": max_results,
+                "exclude_dirs": sorted(EXCLUDED_DIRS),
+            },
+        )
+        return {"path": str(target_path), **result}
+
+    async def find_files(
+        self,
+        glob: str,
+        path: Optional[Union[str, Path]] = None,
+        max_results: int = name_search.MAX_NAME_RESULTS,
+    ) -> Dict[str, Any]:
+        """
+        Find the files and directories whose path matches globs.
+
+        Hidden entries and paths ignored by .gitignore files are skipped,
+        excluded directories (EXCLUDED_DIRS) are not descended into. This
+        default walks the tree where the files are, LocalEnv answers from a
+        name index.
+
+        Args:
+            glob: Comma-separated globs, "*.py" matches file names at any
+                depth, "src/**/*.ts" matches paths relative to path
+            path: Directory to search (default: current directory)
+            max_results: Maximum number of matches
+
+        Returns:
+            Dict containing:
+                - status: success/error
+                - path: Directory that was searched
+                - matches: Entries with name, path, relative_path and type
+                - match_count: Number of matches returned
+                - truncated: Whether max_results cut the matches short
+                - message: Error message if any
+        """
+        target_path = self._resolve_path(path or ".")
+        result = await self._run_script(
+            name_search,
+            {
+                "root": str(self.base_path),
+                "glob": glob,
+                "path": str(target_path),
+                "exclude_dirs": sorted(EXCLUDED_DIRS),
+                "max_results": max_results,
+            },
+        )
+        return {"path": str(target_path), **result}
+
+    async def apply_file_operations(
+        self, operations: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Apply many file reads, writes and replacements in one call.
+
+        Operations run in order and independently: a failed operation gets an
+        error result and the following ones still run. This default applies
+        them one by one, remote backends override it to batch the transfers.
+
+        Args:
+            operations: Dicts with an action and its parameters:
+                - read: path, optional start_line/end_line (1-based, inclusive)
+                - write: path, content, optional append
+                - replace: path, old_str, new_str, optional expected_count
+
+        Returns:
+            Dict containing:
+                - status: success if every operation succeeded, else error
+                - results: One result per operation, with its index and action
+                - succeeded: Number of successful operations
+                - failed: Number of failed operations
+                - message: Error message if any
+        """
+        results = []
+        for index, operation in enumerate(operations):
+            result = await self._apply_file_operation(operation)
+            action = operation.get("action")
+            results.append({"index": index, "action": action, **result})
+        return file_operations_result(results)
+
+    async def _apply_file_operation(self, operation: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply one operation of apply_file_operations"""
+        error = validate_file_operation(operation)
+        if error:
+            return {"status": "error", "message": error, "path": operation.get("path")}
+
+        path = operation["path"]
+        try:
+            if operation["action"] == "read":
+                start_line = operation.get("start_line")
+                end_line = operation.get("end_line")
+                if start_line is None and end_line is None:
+                    return await self.read_file(path)
+                return await self.read_file_lines(path, start_line, end_line)
+            if operation["action"] == "write":
+                mode = "a" if operation.get("append") else "w"
+                return await self.write_file(path, operation["content"], mode=mode)
+            return await self.replace_in_file(
+                path,
+                operation["old_str"],
+                operation["new_str"],
+                expected_count=operation.get("expected_count"),
+            )
+        except Exception as e:
+            return {"status": "error", "message": str(e), "path": path}
+
     @abstractmethod
     async def delete_file(self, path: Union[str, Path]) -> Dict[str, Any]:
         """
@@ -400,6 +970,8 @@ class BaseEnv(ABC):
         recursive: bool = False,
         include_hidden: bool = False,
         max_depth: int = 5,
+        exclude_dirs: Optional[Iterable[str]] = None,
+        max_entries: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         List files in a directory.
@@ -408,12 +980,16 @@ class BaseEnv(ABC):
             path: Directory path (relative to current directory). If None, uses current directory
             recursive: Whether to list files recursively
             include_hidden: Whether to include hidden files
+            max_depth: Maximum depth when recursive (1 lists direct children only)
+            exclude_dirs: Directory names or patterns that are listed but not descended into
+            max_entries: Maximum number of entries to return
 
         Returns:
             Dict containing:
                 - status: success/error
                 - path: Directory that was listed
                 - files: List of file/directory information
+                - truncated: Whether max_entries cut the listing short
                 - message: Error message if any
         """
         pass
@@ -442,6 +1018,7 @@ class BaseEnv(ABC):
             # Clean up from our tracking regardless of kill command result
             if session_id in self.tmux_executor.active_sessions:
                 del self.tmux_executor.active_sessions[session_id]
+            self._delete_output_log(session_id)
 
             # Unregister from TmuxExecutor
             _ = self.tmux_executor.unregister_session(session_id)
@@ -467,46 +1044,107 @@ class BaseEnv(ABC):
                 "session_id": session_id,
             }
 
+    def _get_output_log(self, session_id: str) -> OutputRingLog:
+        """Get the on-disk output log of a session, creating it if needed"""
+        if session_id not in self._output_logs:
+            if self._output_log_dir is None:
+                self._output_log_dir = Path(
+                    tempfile.mkdtemp(prefix="panda_agi_output_")
+                )
+            self._output_logs[session_id] = OutputRingLog(
+                self._output_log_dir / f"{session_id}.log",
+                max_bytes=self.OUTPUT_LOG_MAX_BYTES,
+            )
+        return self._output_logs[session_id]
+
+    def _delete_output_log(self, session_id: str):
+        """Remove the on-disk output log of a session"""
+        output_log = self._output_logs.pop(session_id, None)
+        if output_log:
+            output_log.delete()
+
+    async def _read_session_output(self, session_id: str) -> IncrementalCapture:
+        """
+        Capture the output a session printed since the previous read.
+
+        New complete lines are appended to the session's output log.
+
+        Args:
+            session_id: The tmux session ID
+
+        Returns:
+            IncrementalCapture with the new lines of the session's command
+        """
+        capture_cmd = self.tmux_executor.generate_incremental_capture_command(
+            session_id
+        )
+        capture_result = await self._run_command(capture_cmd, timeout=10)
+        if not capture_result.success:
+            raise ValueError(
+                f"Failed to capture output for session {session_id}: {capture_result.error}"
+            )
+
+        capture = self.tmux_executor.parse_incremental_capture(
+            session_id, capture_result.output or ""
+        )
+        self._get_output_log(session_id).append(capture.lines)
+        return capture
+
     async def get_process_output(
-        self, session_id: str, wait_seconds: int = 5, kill_process: bool = False
+        self,
+        session_id: str,
+        wait_seconds: Optional[float] = 5,
+        kill_process: bool = False,
+        since: Optional[int] = None,
+        tail: Optional[int] = None,
     ) -> ShellOutput:
         """
         Get the status and output of a background tmux session using TmuxExecutor.
 
+        Only the output printed since the previous call is captured from tmux.
+        Without since/tail, only that new output is returned. Older output is
+        served from the session's bounded on-disk log.
+
         Args:
             session_id: Session ID of the background process
+            wait_seconds: Seconds to wait before reading the output
+            kill_process: Whether to kill the session after reading
+            since: Return output from this line number on (see next_line)
+            tail: Return at most this many of the most recent lines
 
         Returns:
-            Dict with process status and accumulated output
+            ShellOutput with the output, exit code, completion flag and next_line,
+            the line number to pass as since to continue reading
         """
         if session_id not in self.tmux_executor.active_sessions.keys():
             return None
 
         try:
-            process_info = self.tmux_executor.active_sessions[session_id]
-
             # Check if session still exists
             if not await self._session_exists(session_id):
                 # Session no longer exists, clean up
                 self.tmux_executor.unregister_session(session_id)
+                self._delete_output_log(session_id)
                 return None
 
-            # Wait for the process to finish
-            await asyncio.sleep(wait_seconds)
+            # Wait for the process to produce output
+            if wait_seconds:
+                await asyncio.sleep(wait_seconds)
 
-            # Capture current output using TmuxExecutor
-            capture_cmd = self.tmux_executor.generate_capture_command(session_id)
-            capture_result = await self._run_command(capture_cmd)
-            if not capture_result.success:
-                raise ValueError(
-                    f"Failed to capture output for session {session_id}: {capture_result.error}"
-                )
+            output_log = self._get_output_log(session_id)
+            capture = await self._read_session_output(session_id)
 
-            process_output = self.tmux_executor.parse_command_output(
-                session_id,
-                process_info["command_history"][0]["command_id"],
-                capture_result.output or "",
-            )
+            truncated = capture.truncated
+            if since is None and tail is None:
+                lines = capture.lines
+            else:
+                lines, first_line = output_log.read(since=since, tail=tail)
+                truncated = truncated or (since is not None and since < first_line)
+            if capture.partial_line:
+                # Show the line still being written too, it is logged once complete
+                lines = lines + [capture.partial_line]
+
+            next_line = output_log.total_lines
 
             if kill_process:
                 await self.kill_background_process(session_id)
@@ -515,9 +1153,11 @@ class BaseEnv(ABC):
                 status="success",
                 result={
                     "session_id": session_id,
-                    "output": process_output.output,
-                    "exit_code": process_output.exit_code,
-                    "completed": process_output.completed,
+                    "output": "\n".join(lines),
+                    "exit_code": capture.exit_code,
+                    "completed": capture.completed,
+                    "next_line": next_line,
+                    "truncated": truncated,
                 },
             )
 
@@ -597,6 +1237,8 @@ class BaseEnv(ABC):
             # Clear our tracking
             num_tracked = len(self.tmux_executor.active_sessions)
             self.tmux_executor.active_sessions.clear()
+            for session_id in list(self._output_logs):
+                self._delete_output_log(session_id)
 
             return {
                 "status": "success",
@@ -0,0 +1,242 @@
+"""
+Trigram index narrowing down the files a content search has to read.
+
+Each file is summarized by a signature: a bitmap with one bit set per hashed
+trigram of its lowercased text. The literal parts of a regular expression
+give trigrams every matching file must contain, so files whose signature
+lacks one of their bits are skipped without being read. Signatures are kept
+up to date incrementally: a stat-only pass before each search finds the files
+whose mtime or size changed, and only those are read again.
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+from .content_search import MAX_SEARCH_BYTES, is_excluded, read_text
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Bits of a file signature, the false positive rate grows with the number of
+# distinct trigrams of a file relative to this
+SIGNATURE_BITS = 8192
+
+# Larger files always are candidates, their signature would be saturated
+MAX_INDEXED_BYTES = 1024 * 1024
+
+
+def trigram_signature(text: str) -> int:
+    """Compute the signature of a text"""
+    text = text.lower()
+    signature = 0
+    for trigram in set(zip(text, text[1:], text[2:])):
+        signature |= 1 << (hash(trigram) % SIGNATURE_BITS)
+    return signature
+
+
+def _literal_runs(items) -> List[str]:
+    """Collect the literal strings of a parsed pattern that every match contains"""
+    runs, current = [], []
+    for op, value in items:
+        if op is sre_parse.LITERAL:
+            current.append(chr(value))
+            continue
+        runs.append("".join(current))
+        current = []
+        if op is sre_parse.SUBPATTERN:
+            # A group is required, its own literals are too
+            runs.extend(_literal_runs(value[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and value[0] >= 1:
+            runs.extend(_literal_runs(value[2]))
+    runs.append("".join(current))
+    return [run for run in runs if len(run) >= 3]
+
+
+def required_literals(regex: str, ignore_case: bool = False) -> List[str]:
+    """
+    Find strings that every match of a regular expression contains.
+
+    Alternations and other constructs are not analyzed, they only make the
+    result smaller (an empty list means every file is a candidate).
+    """
+    try:
+        parsed = sre_parse.parse(regex, re.IGNORECASE if ignore_case else 0)
+    except re.error:
+        return []
+    return _literal_runs(list(parsed))
+
+
+@dataclass
+class IndexedFile:
+    mtime_ns: int
+    size: int
+    # None for files that are always candidates (too large to index)
+    signature: Optional[int]
+
+
+@dataclass
+class IndexedDirectory:
+    # Adding, removing or renaming an entry updates the mtime
+    mtime_ns: int
+    files: Set[str]
+    subdirectories: Set[str]
+
+
+def _join(directory: str, name: str) -> str:
+    return f"{directory}/{name}" if directory else name
+
+
+class TrigramIndex:
+    """Signatures of the files of a directory tree"""
+
+    def __init__(self, root: str, exclude_dirs: Iterable[str] = ()):
+        """
+        Args:
+            root: Directory to index
+            exclude_dirs: Directory names or globs not descended into
+        """
+        self.root = root
+        self.exclude_dirs = list(exclude_dirs)
+        self._files: Dict[str, IndexedFile] = {}
+        self._directories: Dict[str, IndexedDirectory] = {}
+        self._lock = threading.Lock()
+        self.indexed = 0
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def covers(self, relative_path: str, is_dir: bool = False) -> bool:
+        """Check whether a path relative to the root belongs in the index"""
+        parts = [part for part in relative_path.split("/") if part]
+        directories = parts if is_dir else parts[:-1]
+        return not any(part.startswith(".") for part in parts) and not any(
+            is_excluded(part, self.exclude_dirs) for part in directories
+        )
+
+    def _update(self, relative_path: str, path: str):
+        """Index a file again if it changed, or drop it"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._files.pop(relative_path, None)
+            return
+        entry = self._files.get(relative_path)
+        if entry and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+            return
+
+        signature = None
+        if stat.st_size > MAX_SEARCH_BYTES:
+            self._files.pop(relative_path, None)
+            return
+        if stat.st_size <= MAX_INDEXED_BYTES:
+            text = read_text(path)
+            if text is None:
+                # Binary files are never searched
+                self._files.pop(relative_path, None)
+                return
+            signature = trigram_signature(text)
+        self._files[relative_path] = IndexedFile(
+            stat.st_mtime_ns, stat.st_size, signature
+        )
+        self.indexed += 1
+
+    def _scan_directory(self, relative_dir: str, recursive: bool):
+        """
+        List a directory to index its new files and drop its removed entries.
+
+        Subdirectories are scanned if new, or all of them if recursive.
+        """
+        path = os.path.join(self.root, relative_dir)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as entries:
+                entries = list(entries)
+        except OSError:
+            self._drop_directory(relative_dir)
+            return
+
+        files, subdirectories = set(), set()
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            relative_path = _join(relative_dir, entry.name)
+            if entry.is_dir():
+                # Like os.walk, symbolic links to directories are not followed
+                if entry.is_symlink() or is_excluded(entry.name, self.exclude_dirs):
+                    continue
+                subdirectories.add(entry.name)
+                if recursive or relative_path not in self._directories:
+                    self._scan_directory(relative_path, recursive)
+            else:
+                files.add(entry.name)
+                self._update(relative_path, entry.path)
+
+        previous = self._directories.get(relative_dir)
+        if previous:
+            for name in previous.files - files:
+                self._files.pop(_join(relative_dir, name), None)
+            for name in previous.subdirectories - subdirectories:
+                self._drop_directory(_join(relative_dir, name))
+        self._directories[relative_dir] = IndexedDirectory(
+            mtime_ns, files, subdirectories
+        )
+
+    def _drop_directory(self, relative_dir: str):
+        directory = self._directories.pop(relative_dir, None)
+        if directory is None:
+            return
+        for name in directory.files:
+            self._files.pop(_join(relative_dir, name), None)
+        for name in directory.subdirectories:
+            self._drop_directory(_join(relative_dir, name))
+
+    def refresh(self):
+        """
+        Bring the index up to date with the tree.
+
+        Files are changed by the agent's tools, shell commands and other
+        programs alike, so every refresh validates the index with a stat-only
+        pass: files whose mtime or size changed are indexed again, and
+        directories whose mtime changed are listed again for new or removed
+        entries. Only changed files are read.
+        """
+        with self._lock:
+            if not self._directories:
+                self._scan_directory("", recursive=True)
+                return
+
+            for relative_path in list(self._files):
+                self._update(relative_path, os.path.join(self.root, relative_path))
+            for relative_dir in list(self._directories):
+                directory = self._directories.get(relative_dir)
+                if directory is None:
+                    # Dropped with a removed parent
+                    continue
+                path = os.path.join(self.root, relative_dir)
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    mtime_ns = None
+                if mtime_ns != directory.mtime_ns:
+                    self._scan_directory(relative_dir, recursive=False)
+
+    def candidates(self, regex: str, ignore_case: bool = False) -> List[str]:
+        """
+        Get the files that may match a regular expression, in path order.
+
+        Call refresh first to include recent changes.
+        """
+        required = 0
+        for literal in required_literals(regex, ignore_case):
+            required |= trigram_signature(literal)
+        with self._lock:
+            return sorted(
+                relative_path
+                for relative_path, entry in self._files.items()
+                if entry.signature is None or entry.signature & required == required
+            )
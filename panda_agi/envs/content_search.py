@@ -0,0 +1,223 @@
+"""
+Regular expression search over the files of a directory tree.
+
+Matches are reported once per line, with optional context lines, in path
+order. Excluded directories are not descended into, and binary or very
+large files are skipped.
+
+This module only uses the standard library: remote environments run it as a
+script inside the sandbox (see main), so file contents never leave it.
+"""
+
+import base64
+import fnmatch
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Larger files are not searched
+MAX_SEARCH_BYTES = 8 * 1024 * 1024
+
+# Upper bound of the context lines around a match
+MAX_CONTEXT_LINES = 10
+
+# Longest line content returned for a match
+MAX_LINE_CHARS = 500
+
+
+def is_excluded(name: str, exclude_dirs: Iterable[str]) -> bool:
+    """Check whether a directory name matches an exclusion (names or globs)"""
+    return any(
+        name == pattern or ("*" in pattern and fnmatch.fnmatch(name, pattern))
+        for pattern in exclude_dirs
+    )
+
+
+def glob_matches(relative_path: str, glob: Optional[str]) -> bool:
+    """
+    Check a path against comma-separated globs.
+
+    Globs without a slash match the file name (e.g. "*.py"), others match
+    the path relative to the searched directory (e.g. "src/**/*.ts").
+    """
+    if not glob:
+        return True
+    name = os.path.basename(relative_path)
+    for pattern in glob.split(","):
+        pattern = pattern.strip()
+        target = relative_path if "/" in pattern else name
+        if pattern and fnmatch.fnmatch(target, pattern):
+            return True
+    return False
+
+
+def iter_files(
+    root: str, exclude_dirs: Iterable[str] = (), include_hidden: bool = False
+) -> Iterator[Tuple[str, str]]:
+    """
+    Walk the files of a tree in path order.
+
+    Yields:
+        (path relative to root, absolute path)
+    """
+    exclude_dirs = list(exclude_dirs)
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            name
+            for name in dirnames
+            if not is_excluded(name, exclude_dirs)
+            and (include_hidden or not name.startswith("."))
+        )
+        relative_dir = os.path.relpath(directory, root)
+        for name in sorted(filenames):
+            if not include_hidden and name.startswith("."):
+                continue
+            relative_path = name if relative_dir == "." else f"{relative_dir}/{name}"
+            yield relative_path, os.path.join(directory, name)
+
+
+def read_text(path: str) -> Optional[str]:
+    """Read a file to search, None if it is binary or too large"""
+    try:
+        if os.path.getsize(path) > MAX_SEARCH_BYTES:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:8192]:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def _line_bounds(text: str, position: int) -> Tuple[int, int]:
+    start = text.rfind("\n", 0, position) + 1
+    end = text.find("\n", position)
+    return start, len(text) if end == -1 else end
+
+
+def _clip(line: str) -> str:
+    line = line.rstrip("\r")
+    return line if len(line) <= MAX_LINE_CHARS else line[:MAX_LINE_CHARS] + "..."
+
+
+def search_text(
+    text: str, pattern: "re.Pattern", context_lines: int, limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Find the lines of a text matching a pattern.
+
+    Returns:
+        Up to limit matches with their 1-based line number, line content and
+        the context lines before and after
+    """
+    matches = []
+    line_number, counted_to, last_line_start = 1, 0, -1
+    for match in pattern.finditer(text):
+        line_start, line_end = _line_bounds(text, match.start())
+        if line_start == last_line_start:
+            continue
+        line_number += text.count("\n", counted_to, line_start)
+        counted_to = last_line_start = line_start
+
+        result = {
+            "line_number": line_number,
+            "line_content": _clip(text[line_start:line_end]),
+            "match": match.group()[:MAX_LINE_CHARS],
+        }
+        if context_lines:
+            before, position = [], line_start
+            while len(before) < context_lines and position > 0:
+                start, _ = _line_bounds(text, position - 1)
+                before.insert(0, _clip(text[start : position - 1]))
+                position = start
+            after, position = [], line_end
+            while len(after) < context_lines and position + 1 < len(text):
+                _, end = _line_bounds(text, position + 1)
+                after.append(_clip(text[position + 1 : end]))
+                position = end
+            result["before"] = before
+            result["after"] = after
+        matches.append(result)
+        if len(matches) >= limit:
+            break
+    return matches
+
+
+def search_files(
+    root: str,
+    regex: str,
+    glob: Optional[str] = None,
+    ignore_case: bool = False,
+    context_lines: int = 0,
+    max_results: int = 100,
+    exclude_dirs: Iterable[str] = (),
+    paths: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Search the files of a directory tree.
+
+    Args:
+        root: Directory to search
+        regex: Python regular expression
+        glob: Comma-separated globs of the files to search
+        ignore_case: Whether the search is case-insensitive
+        context_lines: Lines of context before and after each match
+        max_results: Maximum number of matching lines
+        exclude_dirs: Directory names or globs not descended into
+        paths: Paths relative to root to search instead of walking the tree
+
+    Returns:
+        Dict with the matches, the number of files searched and whether
+        max_results cut the results short
+    """
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    pattern = re.compile(regex, flags)
+    context_lines = max(0, min(int(context_lines), MAX_CONTEXT_LINES))
+
+    if paths is None:
+        candidates = iter_files(root, exclude_dirs)
+    else:
+        candidates = ((path, os.path.join(root, path)) for path in paths)
+
+    matches: List[Dict[str, Any]] = []
+    files_searched = 0
+    truncated = False
+    for relative_path, path in candidates:
+        if not glob_matches(relative_path, glob):
+            continue
+        text = read_text(path)
+        if text is None:
+            continue
+        files_searched += 1
+        remaining = max_results - len(matches)
+        for match in search_text(text, pattern, context_lines, remaining + 1):
+            if len(matches) >= max_results:
+                truncated = True
+                break
+            matches.append({"file": relative_path, **match})
+        if truncated:
+            break
+
+    return {
+        "matches": matches,
+        "match_count": len(matches),
+        "files_searched": files_searched,
+        "truncated": truncated,
+    }
+
+
+def main():
+    """Run a search from base64-encoded JSON arguments, print a JSON result"""
+    arguments = json.loads(base64.b64decode(sys.argv[1]))
+    try:
+        result = {"status": "success", **search_files(**arguments)}
+    except (re.error, OSError, ValueError) as e:
+        result = {"status": "error", "message": str(e)}
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
 from .base_env import ExecutionResult
+from .exec_channel import ExecChannel
 from .local_env import LocalEnv
 
 logger = logging.getLogger("DockerEnv")
@@ -19,10 +20,14 @@ class DockerEnv(LocalEnv):
     All file-reads/writes happen on the host under `base_path`, which is
     mounted into the container at /workspace.
 
-    Uses a persistent container for tmux-based shell execution and throwaway
-    containers for simple commands.
+    Commands run in a persistent container through long-lived exec channels.
+    Throwaway containers are only used for non-tmux commands when
+    isolate_commands is set.
     """
 
+    # Idle exec channels kept open for reuse
+    MAX_IDLE_CHANNELS = 4
+
     def __init__(
         self,
         base_path: Union[str, Path],
@@ -30,6 +35,7 @@ class DockerEnv(LocalEnv):
         metadata: Optional[Dict[str, Any]] = None,
         ports: Optional[List[int]] = None,
         timeout: Optional[int] = 3600,
+        isolate_commands: bool = False,
     ):
         """
         Args:
@@ -38,6 +44,7 @@ class DockerEnv(LocalEnv):
             metadata: optional metadata
             ports: list of ports to expose from container to host (host:container mapping)
             timeout: default command timeout
+            isolate_commands: run non-tmux commands in fresh throwaway containers
         """
         super().__init__(base_path, metadata, timeout)
         self.image = image
@@ -47,6 +54,8 @@ class DockerEnv(LocalEnv):
         # Persistent container for tmux sessions
         self.persistent_container_id: Optional[str] = None
         self.persistent_container_name = f"panda_agi_docker_{uuid.uuid4().hex[:8]}"
+        self.isolate_commands = isolate_commands
+        self._idle_channels: List[ExecChannel] = []
 
         # ensure host base exists
         self.base_path.mkdir(parents=True, exist_ok=True)
@@ -70,6 +79,9 @@ class DockerEnv(LocalEnv):
         """
         Create and start a persistent Docker container for tmux sessions.
         """
+        # Channels into a previous container cannot be reused
+        await self._close_exec_channels()
+
         # First, try to remove any existing container with the same name
         try:
             await asyncio.create_subprocess_exec(
@@ -122,59 +134,46 @@ class DockerEnv(LocalEnv):
         except Exception as e:
             raise Exception(f"Failed to create persistent container: {e}")
 
+    def _new_exec_channel(self) -> ExecChannel:
+        """Create a channel running commands in the persistent container"""
+        container = self.persistent_container_name
+        # Login shell so that PATH matches an interactive container shell
+        return ExecChannel(
+            ["docker", "exec", "-i", container, "bash", "-l"],
+            exec_prefix=["docker", "exec", container],
+        )
+
     async def _run_persistent_command(
         self, command: str, timeout: Optional[int] = None
     ) -> ExecutionResult:
         """
         Run `command` inside the persistent Docker container.
 
-        We mount host `base_path` into /workspace, chdir there, then
-        run `bash -lc "command"`.
+        Commands go through long-lived `docker exec` shells (ExecChannel), so no
+        process is started per command. Idle channels are reused; concurrent
+        commands (e.g. a `tmux wait-for` next to a capture) open extra ones.
         """
         if timeout is None:
             timeout = self.timeout
 
-        if not self.persistent_container_id:
-            await self._create_persistent_container()
-
-        docker_cmd = [
-            "docker",
-            "exec",
-            self.persistent_container_name,
-            # wrap in bash -lc so that tmux/shell functions work
-            "bash",
-            "-lc",
-            command.replace('"', '\\"'),
-        ]
+        if self._idle_channels:
+            channel = self._idle_channels.pop()
+        else:
+            await self._ensure_persistent_container_running()
+            channel = self._new_exec_channel()
 
         try:
-            proc = await asyncio.create_subprocess_exec(
-                *docker_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(), timeout=timeout
-                )
-            except asyncio.TimeoutError:
-                proc.kill()
-                stdout, stderr = await proc.communicate()
-                return ExecutionResult(
-                    output=stdout.decode().strip(),
-                    error=stderr.decode().strip(),
-                    exit_code=-1,
-                    success=False,
-                )
-
-            exit_code = proc.returncode
-            return ExecutionResult(
-                output=stdout.decode().strip(),
-                error=stderr.decode().strip(),
-                exit_code=exit_code,
-                success=(exit_code == 0),
-            )
+                result = await channel.run(command, timeout)
+            except ConnectionError:
+                # The container was stopped or recreated under the channel
+                await self._ensure_persistent_container_running()
+                channel = self._new_exec_channel()
+                result = await channel.run(command, timeout)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
+            await channel.close()
             return ExecutionResult(
                 output="",
                 error=str(e),
@@ -182,6 +181,18 @@ class DockerEnv(LocalEnv):
                 success=False,
             )
 
+        if channel.is_alive and len(self._idle_channels) < self.MAX_IDLE_CHANNELS:
+            self._idle_channels.append(channel)
+        else:
+            await channel.close()
+        return result
+
+    async def _close_exec_channels(self):
+        """Close the idle exec channels into the persistent container"""
+        channels, self._idle_channels = self._idle_channels, []
+        for channel in channels:
+            await channel.close()
+
     async def _initialize_tmux(self):
         """
         Initialize tmux in a persistent Docker container.
@@ -218,19 +229,14 @@ class DockerEnv(LocalEnv):
         self, command: str, timeout: Optional[int] = None
     ) -> ExecutionResult:
         """
-        Override _run_command to use persistent container for tmux operations.
+        Override _run_command to run commands in the persistent container.
 
-        For tmux-related commands, use the persistent container.
-        For other commands, use throwaway containers.
+        With isolate_commands, commands unrelated to tmux run in throwaway
+        containers instead, at the cost of a container start per command.
         """
-        # Check if this is a tmux-related command
-        if self._is_tmux_command(command):
-            # Ensure persistent container is running
-            await self._ensure_persistent_container_running()
-            return await self._run_persistent_command(command, timeout)
-        else:
-            # Use throwaway container for non-tmux commands
+        if self.isolate_commands and not self._is_tmux_command(command):
             return await self._run_throwaway_command(command, timeout)
+        return await self._run_persistent_command(command, timeout)
 
     def _is_tmux_command(self, command: str) -> bool:
         """
@@ -322,7 +328,7 @@ class DockerEnv(LocalEnv):
             # wrap in bash -lc so that tmux/shell functions work
             "bash",
             "-lc",
-            command.replace('"', '\\"'),
+            command,
         ]
 
         try:
@@ -379,6 +385,8 @@ class DockerEnv(LocalEnv):
             "image_removed": False
         }
         
+        await self._close_exec_channels()
+
         if self.persistent_container_id:
             try:
                 # Force kill the container (SIGKILL)
@@ -506,6 +514,7 @@ class DockerEnv(LocalEnv):
         result = await super().cleanup_all_sessions()
 
         # Then stop and remove the persistent container
+        await self._close_exec_channels()
         if self.persistent_container_id:
             try:
                 # Stop the container
@@ -1,17 +1,28 @@
+import json
 import os
+import shlex
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Union
 
 try:
     from e2b import AsyncSandbox
-    from e2b.sandbox.filesystem.filesystem import FileType
+    from e2b.sandbox.filesystem.filesystem import FileType, WriteEntry
     from e2b.sandbox_sync.sandbox_api import SandboxQuery
 except ImportError:
     AsyncSandbox = None
 
 import logging
 
-from .base_env import BaseEnv, ExecutionResult
+from . import file_batch, stream_replace
+from .base_env import (
+    BaseEnv,
+    ExecutionResult,
+    file_operations_result,
+    is_excluded_dir,
+    line_slice,
+    validate_file_operation,
+)
 
 logger = logging.getLogger("E2BEnv")
 logger.setLevel(logging.INFO)
@@ -20,6 +31,9 @@ logger.setLevel(logging.INFO)
 class E2BEnv(BaseEnv):
     """Environment backed by an E2B sandbox via `e2b-code-interpreter` SDK with tmux support."""
 
+    # Streamed writes larger than this are spooled to disk before the upload
+    STREAM_SPOOL_BYTES = 8 * 1024 * 1024
+
     def __init__(
         self,
         base_path: Union[str, Path],
@@ -154,12 +168,50 @@ class E2BEnv(BaseEnv):
         """
         resolved_path = self._resolve_path(path)
         entry = await self.sandbox.files.write(str(resolved_path), content)
+        self.invalidate_snapshots(resolved_path)
+        return {
+            "status": "success",
+            "path": self._display_path(entry.path),
+            "file": entry.name,
+        }
+
+    def _display_path(self, path: str) -> str:
+        """Replace the base path prefix of a sandbox path with "/" """
+        if path.startswith(str(self.base_path)):
+            return "/" + path[len(str(self.base_path)) :].lstrip("/")
+        return path
 
-        # Replace base path prefix with "/" if it exists
-        if entry.path.startswith(str(self.base_path)):
-            entry.path = "/" + entry.path[len(str(self.base_path)) :].lstrip("/")
+    async def write_file_stream(
+        self, path: Union[str, Path], chunks: AsyncIterable[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Upload chunks to the sandbox. They are spooled to a temporary file
+        (in memory up to STREAM_SPOOL_BYTES) that the SDK streams to the
+        sandbox, so large files are never held in memory.
+        """
+        resolved_path = self._resolve_path(path)
+        try:
+            with tempfile.SpooledTemporaryFile(self.STREAM_SPOOL_BYTES) as spool:
+                size = 0
+                async for chunk in chunks:
+                    spool.write(chunk)
+                    size += len(chunk)
+                spool.seek(0)
+                entry = await self.sandbox.files.write(str(resolved_path), spool)
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Failed to write file {str(resolved_path)}: {str(e)}",
+                "path": str(resolved_path),
+            }
+        self.invalidate_snapshots(resolved_path)
 
-        return {"status": "success", "path": entry.path, "file": entry.name}
+        return {
+            "status": "success",
+            "path": self._display_path(entry.path),
+            "file": entry.name,
+            "size": size,
+        }
 
     async def read_file(
         self,
@@ -192,12 +244,220 @@ class E2BEnv(BaseEnv):
             "content": content,
         }
 
+    async def read_file_lines(
+        self,
+        path: Union[str, Path],
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        encoding: Optional[str] = "utf-8",
+    ) -> Dict[str, Any]:
+        """
+        Read a range of lines with sed in the sandbox, so that only the
+        requested lines are transferred. sed stops after the last line.
+        """
+        resolved_path = self._resolve_path(path)
+        start, end = line_slice(start_line, end_line, None)
+        if end is None:
+            script = f"{start + 1},$p"
+        elif end > start:
+            script = f"{start + 1},{end}p;{end}q"
+        else:
+            # Empty range, only check that the file exists
+            script = "q"
+        result = await self._run_command(
+            f"sed -n {shlex.quote(script)} {shlex.quote(str(resolved_path))}"
+        )
+        if not result.success:
+            return {
+                "status": "error",
+                "message": f"Failed to read file {str(resolved_path)}: "
+                f"{result.error or result.output}",
+                "path": str(resolved_path),
+            }
+
+        content = result.output.replace("\r\n", "\n")
+        line_count = content.count("\n") + (0 if content.endswith("\n") else 1)
+        return {
+            "status": "success",
+            "path": str(resolved_path),
+            "size": len(content),
+            "content": content,
+            "line_range": {
+                "start": start,
+                "end": start + line_count if content else start,
+            },
+        }
+
+    async def replace_in_file(
+        self,
+        path: Union[str, Path],
+        old_str: str,
+        new_str: str,
+        expected_count: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run stream_replace as a script in the sandbox, so the file content
+        never leaves it. Replacements whose strings do not fit in a command
+        line fall back to reading and writing the file.
+        """
+        resolved_path = self._resolve_path(path)
+        arguments = {
+            "path": str(resolved_path),
+            "old": old_str,
+            "new": new_str,
+            "expected_count": expected_count,
+        }
+        if len(json.dumps(arguments)) > self.MAX_SCRIPT_ARGUMENT_BYTES:
+            return await super().replace_in_file(
+                path, old_str, new_str, expected_count
+            )
+
+        output = await self._run_script(stream_replace, arguments)
+        if output.get("status") != "success":
+            return {**output, "file": str(resolved_path)}
+
+        self.invalidate_snapshots(resolved_path)
+        return {"status": "success", "path": str(resolved_path), **output}
+
+    async def apply_file_operations(
+        self, operations: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Apply the operations in as few round trips as possible: each run of
+        consecutive overwrites is uploaded with a single write_files request,
+        and each run of other operations runs file_batch as one script in the
+        sandbox (split only to fit MAX_SCRIPT_ARGUMENT_BYTES).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+        pending_kind, pending = None, []
+        for index, operation in enumerate(operations):
+            error = validate_file_operation(operation)
+            if error:
+                results[index] = {
+                    "status": "error",
+                    "message": error,
+                    "path": operation.get("path"),
+                }
+                continue
+            kind, item = self._batch_item(operation)
+            if kind != pending_kind and pending:
+                await self._apply_batch(pending_kind, pending, results)
+                pending = []
+            pending_kind = kind
+            pending.append((index, operation, item))
+        if pending:
+            await self._apply_batch(pending_kind, pending, results)
+
+        return file_operations_result(
+            [
+                {"index": index, "action": operation.get("action"), **result}
+                for index, (operation, result) in enumerate(zip(operations, results))
+            ]
+        )
+
+    def _batch_item(self, operation: Dict[str, Any]):
+        """Get how an operation is batched: ("upload" | "script" | "single", item)"""
+        path = str(self._resolve_path(operation["path"]))
+        action = operation["action"]
+        if action == "write" and not operation.get("append"):
+            return "upload", (path, operation["content"])
+        if action == "write" and isinstance(operation["content"], str):
+            return "script", {
+                "action": "write",
+                "path": path,
+                "content": operation["content"],
+                "append": True,
+            }
+        if action == "read":
+            item = {"action": "read", "path": path}
+            start_line = operation.get("start_line")
+            end_line = operation.get("end_line")
+            if start_line is not None or end_line is not None:
+                item["start"], item["end"] = line_slice(start_line, end_line, None)
+            return "script", item
+        if action == "replace":
+            return "script", {
+                "action": "replace",
+                "path": path,
+                "old": operation["old_str"],
+                "new": operation["new_str"],
+                "expected_count": operation.get("expected_count"),
+            }
+        return "single", None
+
+    async def _apply_batch(
+        self,
+        kind: str,
+        pending: List[tuple],
+        results: List[Optional[Dict[str, Any]]],
+    ):
+        """Apply consecutive operations of the same kind, see _batch_item"""
+        if kind == "upload":
+            entries = [
+                WriteEntry(path=path, data=data) for _, _, (path, data) in pending
+            ]
+            try:
+                infos = await self.sandbox.files.write_files(entries)
+            except Exception as e:
+                for index, _, (path, _) in pending:
+                    results[index] = {
+                        "status": "error",
+                        "message": f"Failed to write file {path}: {str(e)}",
+                        "path": path,
+                    }
+                return
+            for (index, _, (path, _)), info in zip(pending, infos):
+                self.invalidate_snapshots(path)
+                results[index] = {
+                    "status": "success",
+                    "path": self._display_path(info.path),
+                    "file": info.name,
+                }
+            return
+
+        if kind == "single":
+            for index, operation, _ in pending:
+                results[index] = await self._apply_file_operation(operation)
+            return
+
+        chunk, chunk_size = [], 0
+        for entry in pending:
+            size = len(json.dumps(entry[2]))
+            if chunk and chunk_size + size > self.MAX_SCRIPT_ARGUMENT_BYTES:
+                await self._run_batch_script(chunk, results)
+                chunk, chunk_size = [], 0
+            if size > self.MAX_SCRIPT_ARGUMENT_BYTES:
+                # Too large for a command line, e.g. a big append
+                results[entry[0]] = await self._apply_file_operation(entry[1])
+                continue
+            chunk.append(entry)
+            chunk_size += size
+        if chunk:
+            await self._run_batch_script(chunk, results)
+
+    async def _run_batch_script(
+        self, chunk: List[tuple], results: List[Optional[Dict[str, Any]]]
+    ):
+        """Run file_batch in the sandbox for script-batched operations"""
+        output = await self._run_script(
+            file_batch, {"operations": [item for _, _, item in chunk]}
+        )
+        if output.get("status") != "success":
+            for index, _, item in chunk:
+                results[index] = {**output, "path": item["path"]}
+            return
+        for (index, _, item), result in zip(chunk, output["results"]):
+            if item["action"] != "read" and result.get("status") == "success":
+                self.invalidate_snapshots(item["path"])
+            results[index] = result
+
     async def delete_file(self, path: Union[str, Path]) -> Dict[str, Any]:
         """
         Removes a file or directory in the sandbox.
         """
         resolved_path = self._resolve_path(path)
         await self.sandbox.files.remove(str(resolved_path))
+        self.invalidate_snapshots(resolved_path)
         return {"status": "success", "path": str(resolved_path)}
 
     async def list_files(
@@ -206,9 +466,14 @@ class E2BEnv(BaseEnv):
         recursive: bool = False,
         include_hidden: bool = False,
         max_depth: int = 5,
+        exclude_dirs: Optional[Iterable[str]] = None,
+        max_entries: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Lists directory contents inside the sandbox.
+
+        The sandbox lists the whole depth at once, so excluded directories are
+        filtered out of the result rather than pruned during the walk.
         """
         try:
             resolved_path = self._resolve_path(path or self.current_directory)
@@ -237,6 +502,7 @@ class E2BEnv(BaseEnv):
                 }
 
             files = []
+            truncated = False
             base_path = Path(str_path)
 
             for entry in entries:
@@ -255,6 +521,16 @@ class E2BEnv(BaseEnv):
                     # If we can't get relative path, use the full path
                     rel_path = Path(entry.path)
 
+                # Keep excluded directories themselves, but not their content
+                if any(
+                    is_excluded_dir(part, exclude_dirs) for part in rel_path.parts[:-1]
+                ):
+                    continue
+
+                if max_entries is not None and len(files) >= max_entries:
+                    truncated = True
+                    break
+
                 # Create file info dict similar to LocalEnv
                 file_info = {
                     "name": Path(entry.path).name,
@@ -269,6 +545,7 @@ class E2BEnv(BaseEnv):
                 "path": str_path,
                 "files": files,
                 "total_files": len(files),
+                "truncated": truncated,
             }
 
         except Exception as e:
@@ -359,6 +636,7 @@ class E2BEnv(BaseEnv):
 
             # Create the actual directory
             await self.sandbox.files.make_dir(str_path)
+            self.invalidate_snapshots(str_path)
             return {"status": "success", "path": str_path}
         except Exception as e:
             if exist_ok:
@@ -0,0 +1,190 @@
+"""
+Long-lived shell process that runs commands sent over its stdin.
+
+Used by DockerEnv to avoid paying a `docker exec` (or `docker run`) per command:
+the channel is started once with `docker exec -i <container> bash` and every
+command is framed with unique markers carrying its process group, exit code
+and stderr.
+"""
+
+import asyncio
+import os
+import shlex
+import signal
+import uuid
+from typing import List, Optional
+
+from .base_env import ExecutionResult
+
+
+class ExecChannel:
+    """
+    Runs one command at a time in a persistent shell.
+
+    Each command runs in a subshell so that `cd`, `exit` or variables do not
+    leak into the next one. The shell has job control on, so each subshell
+    gets its own process group, which a timeout kills. Stdout is streamed back
+    directly, stderr is kept in a temporary file and sent after the exit code
+    marker.
+    """
+
+    def __init__(
+        self,
+        argv: List[str],
+        workdir: Optional[str] = None,
+        exec_prefix: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            argv: Command starting a bash shell that reads commands from stdin
+            workdir: Directory commands run in, if any
+            exec_prefix: Command prefix running a command where the shell runs
+                (e.g. `docker exec <container>`), used to stop timed-out
+                commands. Commands run locally by default.
+        """
+        self.argv = argv
+        self.workdir = workdir
+        self.exec_prefix = exec_prefix or []
+        self.process: Optional[asyncio.subprocess.Process] = None
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the shell process is running"""
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        """Start the shell process"""
+        self.process = await asyncio.create_subprocess_exec(
+            *self.argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            # Command output can have very long lines
+            limit=16 * 1024 * 1024,
+            # Own process group so that close() also stops the `docker exec`
+            # client, commands are stopped by _kill_command
+            start_new_session=True,
+        )
+        # Job control: every command gets its own process group
+        self.process.stdin.write(b"set -m\n")
+
+    @staticmethod
+    def _stderr_file(marker: str) -> str:
+        return f"/tmp/{marker}.err"
+
+    def _frame(self, command: str, marker: str) -> str:
+        """
+        Wrap a command so that its process group precedes its stdout, and its
+        exit code and stderr follow it.
+        """
+        stderr_file = self._stderr_file(marker)
+        body = f"eval {shlex.quote(command)}"
+        if self.workdir:
+            body = f"cd {shlex.quote(self.workdir)} && {body}"
+        return (
+            f"( printf '{marker} %d\\n' $BASHPID; {body} ) "
+            f"< /dev/null 2> {stderr_file} & wait $!; "
+            f"printf '\\n{marker} %d\\n' $?; "
+            f"cat {stderr_file}; rm -f {stderr_file}; "
+            f"printf '\\n{marker}\\n'\n"
+        )
+
+    async def _read_until(self, marker: str) -> List[str]:
+        """Read stdout lines until a line starting with the marker"""
+        lines = []
+        while True:
+            raw = await self.process.stdout.readline()
+            if not raw:
+                raise ConnectionError("Exec channel closed")
+            line = raw.decode(errors="replace").rstrip("\n")
+            if line.startswith(marker):
+                lines.append(line)
+                return lines
+            lines.append(line)
+
+    async def run(
+        self, command: str, timeout: Optional[float] = None
+    ) -> ExecutionResult:
+        """
+        Run a command and wait for its result.
+
+        On timeout or cancellation the command's process group is killed and
+        the channel is closed; the caller should start a new one.
+
+        Args:
+            command: Shell command to run
+            timeout: Timeout in seconds
+
+        Returns:
+            ExecutionResult with the command's stdout, stderr and exit code
+        """
+        if not self.is_alive:
+            await self.start()
+
+        marker = f"__panda_agi_exec_{uuid.uuid4().hex}__"
+        self.process.stdin.write(self._frame(command, marker).encode())
+        await self.process.stdin.drain()
+
+        process_group = None
+        try:
+            pid_lines = await asyncio.wait_for(self._read_until(marker), timeout)
+            process_group = int(pid_lines[-1].split()[-1])
+            stdout_lines = await asyncio.wait_for(self._read_until(marker), timeout)
+            exit_code = int(stdout_lines.pop().split()[-1])
+            stderr_lines = await asyncio.wait_for(self._read_until(marker), timeout)
+            stderr_lines.pop()
+        except asyncio.TimeoutError:
+            await self._kill_command(process_group, marker)
+            await self.close()
+            return ExecutionResult(
+                output="",
+                error=f"Command timed out after {timeout} seconds",
+                exit_code=-1,
+                success=False,
+            )
+        except BaseException:
+            await self._kill_command(process_group, marker)
+            await self.close()
+            raise
+
+        return ExecutionResult(
+            output="\n".join(stdout_lines).strip(),
+            error="\n".join(stderr_lines).strip(),
+            exit_code=exit_code,
+            success=exit_code == 0,
+        )
+
+    async def _kill_command(self, process_group: Optional[int], marker: str):
+        """
+        Kill the process group of a command that did not finish, and remove
+        its stderr file.
+
+        Killing the local shell process is not enough: with `docker exec`, the
+        command keeps running in the container.
+        """
+        script = f"rm -f {self._stderr_file(marker)}"
+        if process_group:
+            script = f"kill -KILL -- -{process_group} 2> /dev/null; {script}"
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self.exec_prefix,
+                "bash",
+                "-c",
+                script,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            await asyncio.wait_for(process.wait(), 10)
+        except (OSError, asyncio.TimeoutError):
+            # Best effort, the channel is closed anyway
+            pass
+
+    async def close(self):
+        """Stop the shell process"""
+        if self.is_alive:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await self.process.wait()
+        self.process = None
@@ -0,0 +1,127 @@
+"""
+Reads, appends and replacements applied to many files in one run.
+
+Operations are applied in order and independently: a failed operation gets
+an error result and the following ones still run. Replacements are done in
+memory with the same rules as stream_replace (line breaks follow the file's,
+expected_count guards) and swap in the result atomically.
+
+This module only uses the standard library: remote environments run it as a
+script inside the sandbox (see main), so a batch costs a single round trip.
+"""
+
+import base64
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+
+def read_file(path: str, start: Optional[int] = None, end: Optional[int] = None):
+    """
+    Read a text file, or a range of its lines with line breaks as "\\n".
+
+    Args:
+        path: File to read
+        start: First line, 0-based, None to read the whole file as is
+        end: End of the range (exclusive), None for the last line
+    """
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        content = f.read()
+    if start is None:
+        return {"path": path, "size": len(content), "content": content}
+
+    lines = content.splitlines(keepends=True)[start:end]
+    content = "".join(lines).replace("\r\n", "\n")
+    return {
+        "path": path,
+        "size": len(content),
+        "content": content,
+        "line_range": {"start": start, "end": start + len(lines)},
+    }
+
+
+def write_file(path: str, content: str, append: bool = False) -> Dict[str, Any]:
+    """Write or append text to a file, creating its directory"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a" if append else "w", encoding="utf-8") as f:
+        f.write(content)
+    return {"path": path, "file": os.path.basename(path)}
+
+
+def replace_in_file(
+    path: str, old: str, new: str, expected_count: Optional[int] = None
+) -> Dict[str, Any]:
+    """Replace every occurrence of a string, the file is unchanged on error"""
+    if not old:
+        raise ValueError("The string to replace is empty")
+    # Write through symbolic links instead of replacing them
+    target = os.path.realpath(path)
+    with open(target, "rb") as f:
+        data = f.read()
+    old_bytes, new_bytes = old.encode("utf-8"), new.encode("utf-8")
+    if b"\r\n" in data and b"\r\n" not in old_bytes:
+        old_bytes = old_bytes.replace(b"\n", b"\r\n")
+        new_bytes = new_bytes.replace(b"\n", b"\r\n")
+
+    count = data.count(old_bytes)
+    if count == 0:
+        raise ValueError(f"String not found in file: {old}")
+    if expected_count is not None and count != expected_count:
+        raise ValueError(
+            f"Expected {expected_count} occurrences but found {count}, "
+            "the file was not changed"
+        )
+
+    data = data.replace(old_bytes, new_bytes)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".replace-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return {"path": path, "replacements": count, "size": len(data)}
+
+
+def apply_operations(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply file operations in order.
+
+    Args:
+        operations: Dicts with an action ("read", "write" or "replace"), an
+            absolute path and the arguments of the matching function
+
+    Returns:
+        Dict with one result (with a status) per operation
+    """
+    functions = {"read": read_file, "write": write_file, "replace": replace_in_file}
+    results = []
+    for operation in operations:
+        arguments = dict(operation)
+        action = arguments.pop("action", None)
+        try:
+            if action not in functions:
+                raise ValueError(f"Unknown action: {action}")
+            results.append({"status": "success", **functions[action](**arguments)})
+        except (OSError, ValueError, TypeError) as e:
+            results.append(
+                {"status": "error", "message": str(e), "path": operation.get("path")}
+            )
+    return {"results": results}
+
+
+def main():
+    """Apply operations from base64-encoded JSON arguments, print a JSON result"""
+    arguments = json.loads(base64.b64decode(sys.argv[1]))
+    print(json.dumps({"status": "success", **apply_operations(**arguments)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Line-range reads of large files without loading them.
+
+A LineIndex stores, for each fixed-size block of a file, the number of
+newlines before it. Counting newlines per block runs at memory speed, and
+finding the offset of a line only walks the lines of one block, so reading
+a few lines of a multi-hundred-MB file touches little more than those lines.
+Indexes are cached per path and rebuilt when the file's size or mtime
+changes.
+"""
+
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# Bytes per index block, the most a line lookup has to scan
+BLOCK_SIZE = 256 * 1024
+
+
+@dataclass
+class LineIndex:
+    """Newline counts per block of a file, valid for one size and mtime"""
+
+    size: int
+    mtime_ns: int
+    # newlines_before[i] is the number of newlines in the first i blocks
+    newlines_before: array
+    line_count: int
+
+    @classmethod
+    def build(cls, path: str) -> "LineIndex":
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            newlines_before = array("q", [0])
+            total = 0
+            last_byte = b""
+            while True:
+                block = f.read(BLOCK_SIZE)
+                if not block:
+                    break
+                total += block.count(b"\n")
+                newlines_before.append(total)
+                last_byte = block[-1:]
+        # A last line without a trailing newline still counts as a line
+        line_count = total + (1 if last_byte and last_byte != b"\n" else 0)
+        return cls(stat.st_size, stat.st_mtime_ns, newlines_before, line_count)
+
+    def matches(self, stat: os.stat_result) -> bool:
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+    def line_offset(self, data: mmap.mmap, line: int) -> int:
+        """Get the byte offset where a 0-based line starts"""
+        if line <= 0:
+            return 0
+        if line >= self.line_count:
+            return self.size
+        # The block holding the newline that ends the previous line
+        block = bisect_left(self.newlines_before, line) - 1
+        position = block * BLOCK_SIZE
+        for _ in range(line - self.newlines_before[block]):
+            position = data.find(b"\n", position) + 1
+        return position
+
+    def read_range(self, path: str, start: int, end: int) -> bytes:
+        """Read the bytes of the 0-based lines [start, end) of the file"""
+        if self.size == 0 or start >= end:
+            return b""
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                start_offset = self.line_offset(data, start)
+                end_offset = self.line_offset(data, end)
+                return data[start_offset:end_offset]
+
+
+class LineIndexCache:
+    """Line indexes of the most recently read files"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._indexes: "OrderedDict[str, LineIndex]" = OrderedDict()
+        self.builds = 0
+
+    def get(self, path: str) -> LineIndex:
+        """Get the index of a file, building it if it is missing or stale"""
+        stat = os.stat(path)
+        index = self._indexes.get(path)
+        if index is None or not index.matches(stat):
+            index = LineIndex.build(path)
+            self.builds += 1
+            self._indexes[path] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        self._indexes.move_to_end(path)
+        return index
+
+    def read_lines(
+        self, path: str, start: int, end: Optional[int]
+    ) -> Tuple[bytes, int, int]:
+        """
+        Read a range of lines of a file.
+
+        Args:
+            path: File to read
+            start: First line, 0-based
+            end: Line after the last one, None for the end of the file
+
+        Returns:
+            (content, start, end) with the range clamped to the file
+        """
+        index = self.get(path)
+        end = index.line_count if end is None else min(end, index.line_count)
+        start = max(0, start)
+        return index.read_range(path, start, end), start, max(start, end)
@@ -7,13 +7,30 @@ and shell commands are executed.
 
 import asyncio
 import logging
+import os
 import shutil
-import subprocess
+import signal
+import tempfile
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
-
-from .base_env import BaseEnv, ExecutionResult
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Union
+
+from .base_env import (
+    EXCLUDED_DIRS,
+    BaseEnv,
+    ExecutionResult,
+    is_excluded_dir,
+    line_slice,
+)
+from .content_index import TrigramIndex
+from .content_search import search_files
+from .line_index import LineIndexCache
+from .name_index import NameIndex
+from .name_search import MAX_NAME_RESULTS, find_names, match_info
+from .stream_replace import ReplaceError, stream_replace
+from .threads import to_thread
+from .workspace_snapshot import SnapshotEntry
 
 # PDF processing import with fallback
 try:
@@ -55,6 +72,12 @@ class LocalEnv(BaseEnv):
         # Create base directory if it doesn't exist
         self.base_path.mkdir(parents=True, exist_ok=True)
         self.ports = ports
+        # Line indexes of the files read by line range
+        self.line_indexes = LineIndexCache()
+        # Narrows down the files read by search_content
+        self.content_index = TrigramIndex(str(self.base_path), EXCLUDED_DIRS)
+        # Answers find_files without walking the tree
+        self.name_index = NameIndex(str(self.base_path), EXCLUDED_DIRS)
 
     async def _run_command(
         self, command: str, timeout: Optional[int] = None
@@ -72,38 +95,58 @@ class LocalEnv(BaseEnv):
         if timeout is None:
             timeout = self.timeout
         try:
-            process = subprocess.Popen(
+            process = await asyncio.create_subprocess_shell(
                 command,
-                shell=True,
                 cwd=str(self.working_directory),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                # Own process group so that a timeout also kills the shell's children
+                start_new_session=True,
             )
 
             try:
-                stdout, stderr = process.communicate(timeout=timeout)
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), timeout=timeout
+                )
                 exit_code = process.returncode
                 success = exit_code == 0
 
                 return ExecutionResult(
-                    output=stdout.strip() if stdout else "",
-                    error=stderr.strip() if stderr else "",
+                    output=self._decode_output(stdout),
+                    error=self._decode_output(stderr),
                     exit_code=exit_code,
                     success=success,
                 )
-            except subprocess.TimeoutExpired:
-                process.kill()
-                stdout, stderr = process.communicate()
+            except asyncio.TimeoutError:
+                self._kill_process_group(process)
+                stdout, stderr = await process.communicate()
                 return ExecutionResult(
-                    output=stdout.strip() if stdout else "",
-                    error=stderr.strip() if stderr else "",
+                    output=self._decode_output(stdout),
+                    error=self._decode_output(stderr),
                     exit_code=-1,
                     success=False,
                 )
+            except asyncio.CancelledError:
+                self._kill_process_group(process)
+                raise
         except Exception as e:
             return ExecutionResult(output="", error=str(e), exit_code=-1, success=False)
 
+    @staticmethod
+    def _decode_output(data: Optional[bytes]) -> str:
+        """Decode captured process output"""
+        return data.decode(errors="replace").strip() if data else ""
+
+    @staticmethod
+    def _kill_process_group(process: asyncio.subprocess.Process):
+        """Kill a process started in its own session together with its children"""
+        if process.returncode is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            process.kill()
+
     async def _initialize_tmux(self):
         """
         Initialize tmux for the local environment.
@@ -145,6 +188,7 @@ class LocalEnv(BaseEnv):
                 # Text mode
                 with open(target_path, mode, encoding=encoding) as f:
                     f.write(content)
+            self.invalidate_snapshots(target_path)
 
             return {
                 "status": "success",
@@ -159,6 +203,48 @@ class LocalEnv(BaseEnv):
                 "path": str(path),
             }
 
+    async def write_file_stream(
+        self, path: Union[str, Path], chunks: AsyncIterable[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Write chunks to a temporary file next to the target, then move it in
+        place so that an interrupted write never leaves a partial file.
+        """
+        target_path = self._resolve_path(path)
+        tmp_path = None
+        try:
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=target_path.parent, prefix=f".{target_path.name}."
+            )
+            # mkstemp creates the file readable by its owner only
+            os.fchmod(fd, 0o644)
+            size = 0
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    f.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, target_path)
+            tmp_path = None
+            self.invalidate_snapshots(target_path)
+
+            return {
+                "status": "success",
+                "message": f"File written successfully: {target_path}",
+                "path": str(target_path),
+                "size": size,
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": str(e),
+                "path": str(path),
+            }
+        finally:
+            # Also on cancellation
+            if tmp_path:
+                Path(tmp_path).unlink(missing_ok=True)
+
     async def read_file(
         self, path: Union[str, Path], mode: str = "r", encoding: Optional[str] = "utf-8"
     ) -> Dict[str, Any]:
@@ -206,6 +292,185 @@ class LocalEnv(BaseEnv):
                 "path": str(path),
             }
 
+    async def read_file_lines(
+        self,
+        path: Union[str, Path],
+        start_line: Optional[int] = None,
+        end_line: Optional[int] = None,
+        encoding: Optional[str] = "utf-8",
+    ) -> Dict[str, Any]:
+        """
+        Read a range of lines through a cached line index, so that only the
+        requested lines are read from the file.
+        """
+        target_path = self._resolve_path(path)
+        if target_path.suffix.lower() == ".pdf":
+            return await super().read_file_lines(path, start_line, end_line, encoding)
+        try:
+            if not target_path.is_file():
+                return {
+                    "status": "error",
+                    "message": f"File not found: {target_path}",
+                    "path": str(target_path),
+                }
+
+            start, end = line_slice(start_line, end_line, None)
+            data, start, end = await to_thread(
+                self.line_indexes.read_lines, str(target_path), start, end
+            )
+            # Same newlines as a file opened in text mode
+            content = data.decode(encoding or "utf-8").replace("\r\n", "\n")
+            return {
+                "status": "success",
+                "content": content,
+                "path": str(target_path),
+                "size": len(content),
+                "line_range": {"start": start, "end": end},
+            }
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": str(e),
+                "path": str(path),
+            }
+
+    async def replace_in_file(
+        self,
+        path: Union[str, Path],
+        old_str: str,
+        new_str: str,
+        expected_count: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Replace a string with stream_replace, without loading the file."""
+        target_path = self._resolve_path(path)
+        try:
+            result = await to_thread(
+                stream_replace, str(target_path), old_str, new_str, expected_count
+            )
+        except ReplaceError as e:
+            return {"status": "error", "message": str(e), "file": str(target_path)}
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": str(e),
+                "path": str(path),
+            }
+        self.invalidate_snapshots(target_path)
+
+        return {
+            "status": "success",
+            "message": f"File written successfully: {target_path}",
+            "path": str(target_path),
+            **result,
+        }
+
+    async def search_content(
+        self,
+        regex: str,
+        path: Optional[Union[str, Path]] = None,
+        glob: Optional[str] = None,
+        ignore_case: bool = False,
+        context_lines: int = 0,
+        max_results: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        Search the workspace, reading only the files that the trigram index
+        cannot rule out. The index is first validated against the tree, so
+        files changed outside the environment are searched too.
+        """
+        target_path = self._resolve_path(path or ".")
+        if not target_path.is_dir():
+            return {
+                "status": "error",
+                "message": f"Directory not found: {target_path}",
+                "path": str(target_path),
+            }
+
+        relative_root = os.path.relpath(target_path, self.base_path)
+        relative_root = "" if relative_root == "." else relative_root + "/"
+
+        def search():
+            paths = None
+            if not relative_root.startswith("..") and self.content_index.covers(
+                relative_root, is_dir=True
+            ):
+                self.content_index.refresh()
+                paths = [
+                    candidate[len(relative_root) :]
+                    for candidate in self.content_index.candidates(regex, ignore_case)
+                    if candidate.startswith(relative_root)
+                ]
+            return search_files(
+                str(target_path),
+                regex,
+                glob=glob,
+                ignore_case=ignore_case,
+                context_lines=context_lines,
+                max_results=max_results,
+                exclude_dirs=EXCLUDED_DIRS,
+                paths=paths,
+            )
+
+        try:
+            result = await to_thread(search)
+        except Exception as e:
+            return {"status": "error", "message": str(e), "path": str(target_path)}
+        return {"status": "success", "path": str(target_path), **result}
+
+    async def find_files(
+        self,
+        glob: str,
+        path: Optional[Union[str, Path]] = None,
+        max_results: int = MAX_NAME_RESULTS,
+    ) -> Dict[str, Any]:
+        """
+        Find matching entries in the name index, after listing again the
+        directories whose mtime changed (by any program). Directories the
+        index does not cover (e.g. excluded or ignored ones) are walked
+        instead.
+        """
+        target_path = self._resolve_path(path or ".")
+        if not target_path.is_dir():
+            return {
+                "status": "error",
+                "message": f"Directory not found: {target_path}",
+                "path": str(target_path),
+            }
+
+        relative_dir = os.path.relpath(target_path, self.base_path)
+        relative_dir = "" if relative_dir == "." else relative_dir
+        root = str(self.base_path)
+
+        def find():
+            if not relative_dir.startswith(".."):
+                self.name_index.refresh()
+                if self.name_index.covers(relative_dir):
+                    found, truncated = self.name_index.find(
+                        glob, relative_dir, max_results
+                    )
+                    matches = [
+                        match_info(root, relative_path, relative_dir, is_dir)
+                        for relative_path, is_dir in found
+                    ]
+                    return {
+                        "matches": matches,
+                        "match_count": len(matches),
+                        "truncated": truncated,
+                    }
+            return find_names(
+                root,
+                glob,
+                str(target_path),
+                exclude_dirs=EXCLUDED_DIRS,
+                max_results=max_results,
+            )
+
+        try:
+            result = await to_thread(find)
+        except Exception as e:
+            return {"status": "error", "message": str(e), "path": str(target_path)}
+        return {"status": "success", "path": str(target_path), **result}
+
     async def _read_pdf_file(self, file_path: Path) -> Dict[str, Any]:
         """Read and extract text content from a PDF file."""
         try:
@@ -250,6 +515,7 @@ class LocalEnv(BaseEnv):
                     "path": str(target_path),
                 }
 
+            self.invalidate_snapshots(target_path)
             if target_path.is_dir():
                 shutil.rmtree(target_path)
                 return {
@@ -304,6 +570,7 @@ class LocalEnv(BaseEnv):
         try:
             target_path = self._resolve_path(path)
             target_path.mkdir(parents=parents, exist_ok=exist_ok)
+            self.invalidate_snapshots(target_path)
 
             return {
                 "status": "success",
@@ -329,8 +596,16 @@ class LocalEnv(BaseEnv):
         recursive: bool = False,
         include_hidden: bool = False,
         max_depth: int = None,
+        exclude_dirs: Optional[Iterable[str]] = None,
+        max_entries: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """List files in a directory."""
+        """
+        List files in a directory.
+
+        The tree is walked breadth-first with os.scandir, so that a max_entries
+        cut keeps the shallowest entries, and excluded directories are pruned
+        before being read.
+        """
         try:
             if path is None:
                 target_path = self.working_directory
@@ -351,42 +626,41 @@ class LocalEnv(BaseEnv):
                     "path": str(target_path),
                 }
 
-            files = []
+            if not recursive:
+                max_depth = 1
 
-            if recursive:
-                pattern = "**/*"
-            else:
-                pattern = "*"
+            files = []
+            truncated = False
+            # (directory, its path relative to target_path, its depth)
+            pending = deque([(str(target_path), "", 1)])
 
-            for item in target_path.glob(pattern):
-                # Skip hidden files unless explicitly requested
-                if not include_hidden and item.name.startswith("."):
+            while pending and not truncated:
+                directory, relative_dir, depth = pending.popleft()
+                try:
+                    with os.scandir(directory) as entries:
+                        entries = list(entries)
+                except OSError:
                     continue
 
-                try:
-                    stat = item.stat()
-                    file_info = {
-                        "name": item.name,
-                        "path": str(item),
-                        "relative_path": str(item.relative_to(target_path)),
-                        "type": "directory" if item.is_dir() else "file",
-                        "size": stat.st_size if item.is_file() else 0,
-                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                        "permissions": oct(stat.st_mode)[-3:],
-                    }
-                    files.append(file_info)
-                except (OSError, PermissionError) as e:
-                    # Skip files we can't access
-                    files.append(
-                        {
-                            "name": item.name,
-                            "path": str(item),
-                            "relative_path": str(item.relative_to(target_path)),
-                            "type": "unknown",
-                            "error": str(e),
-                        }
-                    )
+                for entry in entries:
+                    # Skip hidden files unless explicitly requested
+                    if not include_hidden and entry.name.startswith("."):
+                        continue
+
+                    if max_entries is not None and len(files) >= max_entries:
+                        truncated = True
+                        break
+
+                    relative_path = os.path.join(relative_dir, entry.name)
+                    files.append(self._dir_entry_info(entry, relative_path))
+
+                    if (
+                        files[-1]["type"] == "directory"
+                        and (max_depth is None or depth < max_depth)
+                        and not entry.is_symlink()
+                        and not is_excluded_dir(entry.name, exclude_dirs)
+                    ):
+                        pending.append((entry.path, relative_path, depth + 1))
 
             # Sort files by name
             files.sort(key=lambda x: x["name"].lower())
@@ -399,6 +673,7 @@ class LocalEnv(BaseEnv):
                 "total_directories": len(
                     [f for f in files if f.get("type") == "directory"]
                 ),
+                "truncated": truncated,
             }
 
         except Exception as e:
@@ -408,6 +683,58 @@ class LocalEnv(BaseEnv):
                 "path": str(target_path if "target_path" in locals() else path),
             }
 
+    @staticmethod
+    def _dir_entry_info(entry: os.DirEntry, relative_path: str) -> Dict[str, Any]:
+        """Describe a directory entry, using the stat data cached by scandir"""
+        try:
+            stat = entry.stat()
+            is_dir = entry.is_dir()
+            return {
+                "name": entry.name,
+                "path": entry.path,
+                "relative_path": relative_path,
+                "type": "directory" if is_dir else "file",
+                "size": 0 if is_dir else stat.st_size,
+                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
+                "permissions": oct(stat.st_mode)[-3:],
+            }
+        except OSError as e:
+            # Skip files we can't access
+            return {
+                "name": entry.name,
+                "path": entry.path,
+                "relative_path": relative_path,
+                "type": "unknown",
+                "error": str(e),
+            }
+
+    async def _snapshot_fingerprint(self, result: Dict[str, Any]) -> Any:
+        """Record the mtime of the listed directory and of every listed entry"""
+        paths = [result["path"]] + [f["path"] for f in result["files"]]
+        return {path: self._mtime_ns(path) for path in paths}
+
+    async def _is_snapshot_current(self, entry: SnapshotEntry) -> bool:
+        """
+        Check that no listed entry changed since the listing.
+
+        Adding, removing or renaming an entry updates its directory's mtime,
+        and editing a file updates its own mtime (and the listed size and
+        modified time), which also catches changes made outside of the agent.
+        """
+        if not await super()._is_snapshot_current(entry):
+            return False
+        return all(
+            self._mtime_ns(path) == mtime for path, mtime in entry.fingerprint.items()
+        )
+
+    @staticmethod
+    def _mtime_ns(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
     async def get_available_ports(self) -> List[int]:
         """Get list of available ports."""
         try:
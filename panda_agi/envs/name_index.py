@@ -0,0 +1,194 @@
+"""
+Index of the file and directory names of a workspace.
+
+The paths are kept as a sorted list, so that the entries below a directory
+form a contiguous range, and joined as newline-separated text that a glob's
+regular expression scans in a single pass.
+
+Files are created and removed by the agent's tools, shell commands and other
+programs alike, so the index is validated before each query: adding,
+removing or renaming an entry updates its directory's mtime, and only the
+directories whose mtime (or .gitignore) changed are listed again.
+"""
+
+import os
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .name_search import glob_regex, walk_names
+
+
+def _tree_range(paths: List[str], relative_path: str) -> Tuple[int, int]:
+    """Range of the paths below a directory, "" for the whole list"""
+    if not relative_path:
+        return 0, len(paths)
+    # "/" sorts right before "0", so the range ends at the first "<dir>0"
+    return (
+        bisect_left(paths, relative_path + "/"),
+        bisect_left(paths, relative_path + "0"),
+    )
+
+
+# (mtime of a directory, mtime of its .gitignore or None)
+DirectoryStamp = Tuple[int, Optional[int]]
+
+
+class NameIndex:
+    """Sorted paths of the entries of a directory tree"""
+
+    def __init__(self, root: str, exclude_dirs: Iterable[str] = ()):
+        """
+        Args:
+            root: Directory to index, its .gitignore files apply
+            exclude_dirs: Directory names or globs listed but not descended into
+        """
+        self.root = root
+        self.exclude_dirs = list(exclude_dirs)
+        self._paths: List[str] = []
+        self._dirs: Set[str] = set()
+        # Directories listed but not descended into
+        self._opaque: Set[str] = set()
+        # Stamps of the directories descended into, "" for the root
+        self._stamps: Dict[str, DirectoryStamp] = {}
+        self._text: Optional[str] = None
+        self._lock = threading.Lock()
+        self.scans = 0
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def covers(self, relative_dir: str) -> bool:
+        """Check whether the index holds the whole tree below a directory"""
+        return relative_dir == "" or (
+            relative_dir in self._dirs and relative_dir not in self._opaque
+        )
+
+    def _stamp(self, relative_dir: str) -> Optional[DirectoryStamp]:
+        path = os.path.join(self.root, relative_dir)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        try:
+            ignore_mtime_ns = os.stat(os.path.join(path, ".gitignore")).st_mtime_ns
+        except OSError:
+            ignore_mtime_ns = None
+        return mtime_ns, ignore_mtime_ns
+
+    def refresh(self):
+        """Bring the index up to date with the directories that changed"""
+        with self._lock:
+            if not self._stamps:
+                self._paths, self._dirs, self._opaque = [], set(), set()
+                self._stamps[""] = self._stamp("")
+                self._add(walk_names(self.root, "", self.exclude_dirs))
+                self.scans += 1
+                return
+
+            # Parents first, so that removed subtrees are skipped
+            for relative_dir in sorted(self._stamps):
+                if relative_dir not in self._stamps:
+                    continue
+                stamp = self._stamp(relative_dir)
+                previous = self._stamps[relative_dir]
+                if stamp is None or stamp == previous:
+                    # A removed directory is dropped with its parent's entries
+                    continue
+                if stamp[1] != previous[1]:
+                    # Its .gitignore rules apply to the whole subtree
+                    self._remove(relative_dir, keep_root=True)
+                    self._stamps[relative_dir] = stamp
+                    self._add(walk_names(self.root, relative_dir, self.exclude_dirs))
+                else:
+                    self._stamps[relative_dir] = stamp
+                    self._sync_children(relative_dir)
+
+    def _sync_children(self, relative_dir: str):
+        """Update the direct entries of a directory that changed"""
+        prefix = relative_dir + "/" if relative_dir else ""
+        start, end = _tree_range(self._paths, relative_dir)
+        indexed = {
+            path: (path in self._dirs, path in self._dirs and path not in self._opaque)
+            for path in self._paths[start:end]
+            if "/" not in path[len(prefix) :]
+        }
+        current = {
+            path: (is_dir, descended)
+            for path, is_dir, descended in walk_names(
+                self.root, relative_dir, self.exclude_dirs, recursive=False
+            )
+        }
+        for path, kind in indexed.items():
+            if current.get(path) != kind:
+                self._remove(path)
+        for path, (is_dir, descended) in current.items():
+            if indexed.get(path) != (is_dir, descended):
+                self._add([(path, is_dir, descended)])
+                if descended:
+                    self._add(walk_names(self.root, path, self.exclude_dirs))
+
+    def _add(self, entries: Iterable[Tuple[str, bool, bool]]):
+        added = []
+        for relative_path, is_dir, descended in entries:
+            added.append(relative_path)
+            if is_dir:
+                self._dirs.add(relative_path)
+                if not descended:
+                    self._opaque.add(relative_path)
+                elif relative_path not in self._stamps:
+                    self._stamps[relative_path] = self._stamp(relative_path)
+        if len(added) == 1:
+            insort(self._paths, added[0])
+        elif added:
+            # Merging two sorted runs is linear
+            added.sort()
+            self._paths.extend(added)
+            self._paths.sort()
+        self._text = None
+
+    def _remove(self, relative_path: str, keep_root: bool = False):
+        """Remove an entry and the entries below it"""
+        removed = []
+        if not keep_root:
+            position = bisect_left(self._paths, relative_path)
+            if position < len(self._paths) and self._paths[position] == relative_path:
+                removed.append(self._paths.pop(position))
+        start, end = _tree_range(self._paths, relative_path)
+        removed.extend(self._paths[start:end])
+        del self._paths[start:end]
+        for path in removed:
+            self._dirs.discard(path)
+            self._opaque.discard(path)
+            self._stamps.pop(path, None)
+        self._text = None
+
+    def find(
+        self, glob: str, relative_dir: str = "", max_results: Optional[int] = None
+    ) -> Tuple[List[Tuple[str, bool]], bool]:
+        """
+        Find the paths below a directory matching globs, in path order.
+
+        Call refresh first to include recent changes.
+
+        Args:
+            glob: Comma-separated globs, see name_search
+            relative_dir: Directory to search, relative to the root
+            max_results: Maximum number of matches
+
+        Returns:
+            (list of (path relative to the root, whether it is a directory),
+            whether max_results cut the list short)
+        """
+        prefix = relative_dir + "/" if relative_dir else ""
+        pattern = re.compile(glob_regex(glob, prefix), re.MULTILINE)
+        with self._lock:
+            if self._text is None:
+                self._text = "\n".join(self._paths)
+            found = []
+            for match in pattern.finditer(self._text):
+                if max_results is not None and len(found) >= max_results:
+                    return found, True
+                found.append((match.group(), match.group() in self._dirs))
+        return found, False
@@ -0,0 +1,302 @@
+"""
+File name search over a directory tree with path globs.
+
+Globs follow gitignore syntax: "*" and "?" stay within a path component
+and "**" spans directories. A glob without a slash matches the file name at
+any depth (e.g. "*.py"), others match the path relative to the searched
+directory (e.g. "src/**/test_*.py").
+
+The tree is walked like git sees it: hidden entries and paths ignored by
+.gitignore files are skipped, excluded directories are listed but not
+descended into.
+
+This module only uses the standard library: remote environments run it as a
+script inside the sandbox (see main).
+"""
+
+import base64
+import fnmatch
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Default maximum number of matches returned
+MAX_NAME_RESULTS = 1000
+
+
+def is_excluded(name: str, exclude_dirs: Iterable[str]) -> bool:
+    """Check whether a directory name matches an exclusion (names or globs)"""
+    return any(
+        name == pattern or ("*" in pattern and fnmatch.fnmatch(name, pattern))
+        for pattern in exclude_dirs
+    )
+
+
+def translate_glob(pattern: str) -> str:
+    """
+    Translate a gitignore-style glob to a regular expression (not anchored).
+
+    Paths never contain newlines here, so that the expression can also scan
+    newline-separated path lists.
+    """
+    parts, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**", i):
+            at_start = i == 0 or pattern[i - 1] == "/"
+            if at_start and pattern.startswith("/", i + 2):
+                parts.append("(?:[^\n]*/)?")
+                i += 3
+                continue
+            if at_start and i + 2 == n:
+                parts.append("[^\n]*")
+                i += 2
+                continue
+            c = "*"
+            i += 1
+        if c == "*":
+            parts.append("[^/\n]*")
+        elif c == "?":
+            parts.append("[^/\n]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1 : j].replace("\\", "\\\\")
+                if body[0] in "!^":
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+def glob_regex(glob: str, prefix: str = "") -> str:
+    """
+    Build the regular expression matching paths against comma-separated globs.
+
+    Args:
+        glob: Globs, e.g. "*.py,src/**/*.ts"
+        prefix: Literal prefix of the matched paths, e.g. "src/"
+
+    Returns:
+        An expression matching a whole path (use fullmatch, or re.MULTILINE
+        on newline-separated paths)
+    """
+    alternatives = []
+    for pattern in glob.split(","):
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if "/" in pattern.rstrip("/"):
+            alternatives.append(translate_glob(pattern.strip("/")))
+        else:
+            alternatives.append("(?:[^\n]*/)?" + translate_glob(pattern.rstrip("/")))
+    if not alternatives:
+        raise ValueError("The glob pattern is empty")
+    return f"^{re.escape(prefix)}(?:{'|'.join(alternatives)})$"
+
+
+@dataclass
+class IgnoreRule:
+    """A .gitignore pattern, matching paths relative to the walked root"""
+
+    regex: "re.Pattern"
+    negate: bool
+    dir_only: bool
+
+
+def parse_gitignore(text: str, base: str = "") -> List[IgnoreRule]:
+    """
+    Parse the patterns of a .gitignore file.
+
+    Args:
+        text: Content of the file
+        base: Directory of the file relative to the root, "" or ending in "/"
+    """
+    rules = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        negate = line.startswith("!")
+        if negate or line.startswith(("\\!", "\\#")):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        # Patterns with an inner slash are relative to the .gitignore's directory
+        anchored = "/" in line
+        regex = (
+            "^"
+            + re.escape(base)
+            + ("" if anchored else "(?:[^\n]*/)?")
+            + translate_glob(line.lstrip("/"))
+            + "$"
+        )
+        rules.append(IgnoreRule(re.compile(regex), negate, dir_only))
+    return rules
+
+
+def is_ignored(rules: List[IgnoreRule], relative_path: str, is_dir: bool) -> bool:
+    """Check a path against .gitignore rules, the last matching rule wins"""
+    for rule in reversed(rules):
+        if (is_dir or not rule.dir_only) and rule.regex.match(relative_path):
+            return not rule.negate
+    return False
+
+
+def _load_rules(root: str, relative_dir: str) -> List[IgnoreRule]:
+    path = os.path.join(root, relative_dir, ".gitignore")
+    try:
+        with open(path, errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return []
+    return parse_gitignore(text, relative_dir + "/" if relative_dir else "")
+
+
+def _ancestor_rules(root: str, relative_dir: str) -> List[IgnoreRule]:
+    """Rules of the .gitignore files from root down to a directory"""
+    rules = _load_rules(root, "")
+    directory = ""
+    for part in [part for part in relative_dir.split("/") if part]:
+        directory = f"{directory}/{part}" if directory else part
+        rules = rules + _load_rules(root, directory)
+    return rules
+
+
+def walk_names(
+    root: str,
+    start: str = "",
+    exclude_dirs: Iterable[str] = (),
+    recursive: bool = True,
+) -> Iterator[Tuple[str, bool, bool]]:
+    """
+    Walk the entries of a tree below a directory.
+
+    Args:
+        root: Directory whose .gitignore files apply, paths are relative to it
+        start: Directory to walk, relative to root ("" for root)
+        exclude_dirs: Directory names or globs listed but not descended into
+        recursive: Whether to walk subdirectories
+
+    Yields:
+        (path relative to root, whether it is a directory, whether the
+        directory is descended into)
+    """
+    exclude_dirs = list(exclude_dirs)
+    pending = [(start.strip("/"), _ancestor_rules(root, start.strip("/")))]
+    while pending:
+        directory, rules = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, directory)) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.name.startswith(".") or "\n" in entry.name:
+                continue
+            relative_path = f"{directory}/{entry.name}" if directory else entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_ignored(rules, relative_path, is_dir):
+                continue
+            descended = (
+                is_dir
+                and not entry.is_symlink()
+                and not is_excluded(entry.name, exclude_dirs)
+            )
+            yield relative_path, is_dir, descended
+            if descended and recursive:
+                subdirectories.append(relative_path)
+        for subdirectory in reversed(subdirectories):
+            pending.append((subdirectory, rules + _load_rules(root, subdirectory)))
+
+
+def match_info(root: str, relative_path: str, start: str, is_dir: bool) -> Dict:
+    """Describe a match like a list_files entry, without stat data"""
+    return {
+        "name": os.path.basename(relative_path),
+        "path": os.path.join(root, relative_path),
+        "relative_path": relative_path[len(start) + 1 :] if start else relative_path,
+        "type": "directory" if is_dir else "file",
+    }
+
+
+def find_names(
+    root: str,
+    glob: str,
+    path: Optional[str] = None,
+    exclude_dirs: Iterable[str] = (),
+    max_results: int = MAX_NAME_RESULTS,
+) -> Dict[str, Any]:
+    """
+    Find the files and directories matching globs by walking the tree.
+
+    Args:
+        root: Workspace directory whose .gitignore files apply
+        glob: Comma-separated globs
+        path: Directory to search (default: root)
+        exclude_dirs: Directory names or globs listed but not descended into
+        max_results: Maximum number of matches
+
+    Returns:
+        Dict with the matches, in path order, and whether max_results cut
+        them short
+    """
+    start = os.path.relpath(path or root, root).replace(os.sep, "/")
+    if start == ".":
+        start = ""
+    elif start.startswith(".."):
+        root, start = path, ""
+    pattern = re.compile(glob_regex(glob, start + "/" if start else ""))
+
+    found = []
+    for relative_path, is_dir, _ in walk_names(root, start, exclude_dirs):
+        if pattern.match(relative_path):
+            found.append((relative_path, is_dir))
+    found.sort()
+
+    return {
+        "matches": [
+            match_info(root, relative_path, start, is_dir)
+            for relative_path, is_dir in found[:max_results]
+        ],
+        "match_count": min(len(found), max_results),
+        "truncated": len(found) > max_results,
+    }
+
+
+def main():
+    """Run a search from base64-encoded JSON arguments, print a JSON result"""
+    arguments = json.loads(base64.b64decode(sys.argv[1]))
+    try:
+        result = {"status": "success", **find_names(**arguments)}
+    except (re.error, OSError, ValueError) as e:
+        result = {"status": "error", "message": str(e)}
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Bounded on-disk log of the output read from background shell sessions.
+
+Incremental captures clear the tmux scrollback, so this log is where older
+output of a session remains available (for `since`/`tail` reads).
+"""
+
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+
+class OutputRingLog:
+    """
+    Line log made of two segment files, like a ring buffer on disk.
+
+    New lines are appended to the current segment. Once it exceeds half of
+    max_bytes it replaces the previous segment, so at most max_bytes are kept
+    and the oldest lines are dropped first. Lines are numbered from 0 over the
+    whole life of the log.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 1024 * 1024):
+        """
+        Initialize the log.
+
+        Args:
+            path: Path of the current segment, the previous one gets a ".1" suffix
+            max_bytes: Approximate maximum size of both segments together
+        """
+        self.path = Path(path)
+        self.previous_path = self.path.with_name(self.path.name + ".1")
+        self.max_bytes = max_bytes
+
+        # Absolute number of the first line of each segment
+        self._previous_start = 0
+        self._current_start = 0
+        self._current_bytes = 0
+        self.total_lines = 0
+
+    @property
+    def first_line(self) -> int:
+        """Absolute number of the oldest line still in the log"""
+        if self.previous_path.exists():
+            return self._previous_start
+        return self._current_start
+
+    def append(self, lines: List[str]):
+        """
+        Append lines to the log, rotating segments when needed.
+
+        Args:
+            lines: Lines without trailing newlines
+        """
+        if not lines:
+            return
+
+        data = "".join(f"{line}\n" for line in lines)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+        self._current_bytes += len(data.encode("utf-8"))
+        self.total_lines += len(lines)
+
+        if self._current_bytes > self.max_bytes // 2:
+            os.replace(self.path, self.previous_path)
+            self._previous_start = self._current_start
+            self._current_start = self.total_lines
+            self._current_bytes = 0
+
+    def read(
+        self, since: Optional[int] = None, tail: Optional[int] = None
+    ) -> Tuple[List[str], int]:
+        """
+        Read lines from the log.
+
+        Args:
+            since: Absolute number of the first line to return
+            tail: Return at most this many lines, the most recent ones
+
+        Returns:
+            Tuple of (lines, absolute number of the first returned line)
+        """
+        lines: List[str] = []
+        for segment in (self.previous_path, self.path):
+            if segment.exists():
+                with open(segment, "r", encoding="utf-8") as f:
+                    lines.extend(f.read().splitlines())
+
+        start = self.first_line
+        if since is not None and since > start:
+            lines = lines[since - start :]
+            start = since
+        if tail is not None and len(lines) > tail:
+            start += len(lines) - tail
+            lines = lines[len(lines) - tail :] if tail > 0 else []
+
+        return lines, start
+
+    def delete(self):
+        """Remove the log files"""
+        for segment in (self.previous_path, self.path):
+            segment.unlink(missing_ok=True)
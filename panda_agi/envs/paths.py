@@ -0,0 +1,14 @@
+"""
+Helpers comparing the paths touched by environment operations.
+"""
+
+import os
+
+
+def paths_overlap(path_a: str, path_b: str) -> bool:
+    """Check whether two paths are the same or one contains the other"""
+    if path_a == path_b:
+        return True
+    return path_a.startswith(path_b.rstrip(os.sep) + os.sep) or path_b.startswith(
+        path_a.rstrip(os.sep) + os.sep
+    )
@@ -0,0 +1,128 @@
+"""
+Atomic string replacement in files of any size.
+
+The file is read in chunks and written to a temporary file next to it, which
+replaces the original only once every occurrence was replaced, so a crash
+never leaves a truncated file. A tail of len(old) - 1 bytes is carried over
+between chunks to find occurrences that cross chunk boundaries.
+
+This module only uses the standard library: remote environments run it as a
+script inside the sandbox (see main), so the file never leaves it.
+"""
+
+import base64
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any, Dict, Optional
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ReplaceError(Exception):
+    """The replacement was not applied, the file is unchanged"""
+
+
+def stream_replace(
+    path: str,
+    old: str,
+    new: str,
+    expected_count: Optional[int] = None,
+    encoding: str = "utf-8",
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """
+    Replace every occurrence of a string in a file.
+
+    Line breaks of old and new follow the file's: in a file with CRLF line
+    endings, "\\n" in them stands for "\\r\\n".
+
+    Args:
+        path: File to modify
+        old: String to replace, not empty
+        new: Replacement
+        expected_count: If set, the file is left unchanged unless exactly this
+            many occurrences are found
+        encoding: Encoding of the file
+        chunk_size: Bytes read at a time
+
+    Returns:
+        Dict with the number of replacements and the new size in bytes
+
+    Raises:
+        ReplaceError: If old is not found or expected_count does not match
+    """
+    if not old:
+        raise ReplaceError("The string to replace is empty")
+
+    old_bytes, new_bytes = old.encode(encoding), new.encode(encoding)
+    # Write through symbolic links instead of replacing them
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".replace-")
+    count = size = 0
+    try:
+        with open(path, "rb") as source, os.fdopen(fd, "wb") as target:
+            carry = b""
+            first = True
+            while True:
+                chunk = source.read(chunk_size)
+                if first:
+                    first = False
+                    if b"\r\n" in chunk and b"\r\n" not in old_bytes:
+                        old_bytes = old_bytes.replace(b"\n", b"\r\n")
+                        new_bytes = new_bytes.replace(b"\n", b"\r\n")
+                if not chunk:
+                    target.write(carry)
+                    size += len(carry)
+                    break
+
+                buffer = carry + chunk
+                position = 0
+                while True:
+                    found = buffer.find(old_bytes, position)
+                    if found == -1:
+                        break
+                    target.write(buffer[position:found])
+                    target.write(new_bytes)
+                    size += found - position + len(new_bytes)
+                    count += 1
+                    position = found + len(old_bytes)
+
+                # Keep the bytes that may start an occurrence ending in the next chunk
+                keep = max(position, len(buffer) - len(old_bytes) + 1)
+                target.write(buffer[position:keep])
+                size += keep - position
+                carry = buffer[keep:]
+
+        if count == 0:
+            raise ReplaceError(f"String not found in file: {old}")
+        if expected_count is not None and count != expected_count:
+            raise ReplaceError(
+                f"Expected {expected_count} occurrences but found {count}, "
+                "the file was not changed"
+            )
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+        tmp_path = None
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+
+    return {"replacements": count, "size": size}
+
+
+def main():
+    """Run a replacement from base64-encoded JSON arguments, print a JSON result"""
+    arguments = json.loads(base64.b64decode(sys.argv[1]))
+    try:
+        result = {"status": "success", **stream_replace(**arguments)}
+    except (ReplaceError, OSError, UnicodeError) as e:
+        result = {"status": "error", "message": str(e)}
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+Running blocking functions from coroutines.
+"""
+
+import asyncio
+import contextvars
+import functools
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+async def to_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking function in the loop's default executor.
+
+    Same as asyncio.to_thread, which needs Python 3.9: the function sees the
+    caller's context variables.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(None, call)
@@ -25,6 +25,7 @@ class CommandHistoryItem(TypedDict):
     executed_at: datetime
     prefix_marker: str
     suffix_marker: str
+    completion_channel: Optional[str]
 
 
 class SessionData(TypedDict):
@@ -33,6 +34,10 @@ class SessionData(TypedDict):
     created_at: datetime
     working_directory: Optional[str]
     command_history: List[CommandHistoryItem]
+    # Incremental capture state, see parse_incremental_capture
+    output_cursor: int
+    output_state: str
+    exit_code: Optional[str]
 
 
 # Pydantic models for TmuxExecutor return types
@@ -59,6 +64,7 @@ class Command(BaseResponse):
     structured_command: Optional[str] = None
     prefix_marker: Optional[str] = None
     suffix_marker: Optional[str] = None
+    completion_channel: Optional[str] = None
 
 
 class CommandParseResult(BaseResponse):
@@ -73,6 +79,17 @@ class CommandParseResult(BaseResponse):
     exit_code: Optional[str] = None
 
 
+class IncrementalCapture(BaseResponse):
+    """Response for incremental output capture."""
+
+    session_id: Optional[str] = None
+    lines: List[str] = []
+    partial_line: str = ""
+    truncated: bool = False
+    completed: bool = False
+    exit_code: Optional[str] = None
+
+
 class CommandCompletion(BaseResponse):
     """Response for command completion check."""
 
@@ -192,6 +209,9 @@ class TmuxExecutor:
             "created_at": datetime.now(),
             "working_directory": str(working_directory) if working_directory else None,
             "command_history": [],
+            "output_cursor": 0,
+            "output_state": "pending",
+            "exit_code": None,
         }
 
         return SessionRegistration(
@@ -217,7 +237,11 @@ class TmuxExecutor:
         return uuid.uuid4().hex[:8]
 
     def generate_command(
-        self, session_id: str, command: str, command_id: Optional[str] = None
+        self,
+        session_id: str,
+        command: str,
+        command_id: Optional[str] = None,
+        signal_completion: bool = False,
     ) -> Command:
         """
         Structure a command with prefix/suffix markers for tmux execution.
@@ -226,6 +250,8 @@ class TmuxExecutor:
             session_id: The tmux session ID
             command: The original command
             command_id: Optional command ID, generates one if not provided
+            signal_completion: Whether to signal a tmux wait-for channel once the
+                command has finished, see generate_wait_for_command
 
         Returns:
             Dict containing structured command information
@@ -250,6 +276,13 @@ class TmuxExecutor:
         # Build the full command
         structured_command = f'{prefix_cmd} ; {command} ; exit_code=$? ; {suffix_cmd} ; echo "FINAL_EXIT_CODE:$exit_code"'
 
+        completion_channel = None
+        if signal_completion:
+            # Wakes up a `tmux wait-for` on the channel once the exit code is printed
+            completion_channel = f"{session_id}_done_{command_id}"
+            signal_cmd = self.generate_signal_command(completion_channel)
+            structured_command += f" ; {signal_cmd}"
+
         # Build tmux send-keys command
         tmux_command = f"tmux send-keys -t {session_id} '{structured_command}' C-m"
 
@@ -262,6 +295,7 @@ class TmuxExecutor:
             "executed_at": datetime.now(),
             "prefix_marker": prefix_marker,
             "suffix_marker": suffix_marker,
+            "completion_channel": completion_channel,
         }
 
         self.active_sessions[session_id]["command_history"].append(command_info)
@@ -274,8 +308,36 @@ class TmuxExecutor:
             structured_command=structured_command,
             prefix_marker=prefix_marker,
             suffix_marker=suffix_marker,
+            completion_channel=completion_channel,
         )
 
+    def generate_wait_for_command(self, channel: str) -> str:
+        """
+        Generate tmux command that blocks until a channel is signalled.
+
+        A signal sent before anyone waits is remembered by the tmux server, so
+        the wait can safely start after the command was sent.
+
+        Args:
+            channel: The wait-for channel name
+
+        Returns:
+            The tmux wait-for command
+        """
+        return f"tmux wait-for {channel}"
+
+    def generate_signal_command(self, channel: str) -> str:
+        """
+        Generate tmux command to signal a wait-for channel.
+
+        Args:
+            channel: The wait-for channel name
+
+        Returns:
+            The tmux wait-for -S command
+        """
+        return f"tmux wait-for -S {channel}"
+
     def generate_tmux_install_command(self, sudo: bool = True) -> str:
         """
         Generate tmux command to install tmux.
@@ -322,6 +384,90 @@ set-option -g detach-on-destroy off
         """
         return f"tmux capture-pane -t {session_id} -p -S -"
 
+    def generate_incremental_capture_command(self, session_id: str) -> str:
+        """
+        Generate tmux command to capture output not read yet.
+
+        The pane position is printed first, then the scrollback and screen, then
+        the scrollback is cleared. tmux runs the sequence without reading pane
+        output in between, so no line is lost between capture and clear.
+
+        Args:
+            session_id: The tmux session ID
+
+        Returns:
+            The tmux command sequence
+        """
+        return (
+            f"tmux display-message -t {session_id} -p "
+            f"'#{{history_size}} #{{cursor_y}} #{{history_limit}}' "
+            f"\\; capture-pane -t {session_id} -p -S - -E - "
+            f"\\; clear-history -t {session_id}"
+        )
+
+    def parse_incremental_capture(
+        self, session_id: str, raw_output: str
+    ) -> IncrementalCapture:
+        """
+        Extract the output produced since the previous incremental capture.
+
+        After a capture the scrollback is cleared, so the buffer starts with the
+        screen lines above the cursor that were already read (output_cursor).
+        Only complete lines advance the cursor, the line holding the cursor is
+        returned as partial_line and read again next time. Lines up to the start
+        marker and from the end marker on are dropped, as in parse_command_output.
+
+        Args:
+            session_id: The tmux session ID
+            raw_output: Output of generate_incremental_capture_command
+
+        Returns:
+            New output lines of the session's last command
+        """
+        if session_id not in self.active_sessions:
+            raise ValueError(f"Session {session_id} not registered")
+
+        session = self.active_sessions[session_id]
+        header, _, body = raw_output.partition("\n")
+        history_size, cursor_y, history_limit = (int(v) for v in header.split())
+        buffer = body.split("\n")
+
+        end = history_size + cursor_y
+        buffer += [""] * (end + 1 - len(buffer))
+        new_lines = buffer[session["output_cursor"] : end]
+        partial_line = buffer[end]
+        session["output_cursor"] = cursor_y
+        # A full scrollback may have dropped lines before they could be read
+        truncated = history_size >= history_limit
+
+        command_info = session["command_history"][-1]
+        lines = []
+        for line in new_lines:
+            stripped = line.strip()
+            if session["output_state"] == "pending":
+                if stripped == command_info["prefix_marker"]:
+                    session["output_state"] = "running"
+            elif session["output_state"] == "running":
+                if stripped == command_info["suffix_marker"]:
+                    session["output_state"] = "finished"
+                else:
+                    lines.append(line)
+            elif session["exit_code"] is None and "FINAL_EXIT_CODE:" in line:
+                session["exit_code"] = line.split("FINAL_EXIT_CODE:")[-1].strip()
+
+        if session["output_state"] != "running":
+            partial_line = ""
+
+        return IncrementalCapture(
+            status="success",
+            session_id=session_id,
+            lines=lines,
+            partial_line=partial_line.rstrip(),
+            truncated=truncated,
+            completed=session["output_state"] == "finished",
+            exit_code=session["exit_code"],
+        )
+
     def generate_send_input_command(
         self, session_id: str, input_text: str, press_enter: bool = True
     ) -> str:
@@ -400,28 +546,34 @@ set-option -g detach-on-destroy off
         prefix_marker = command_info["prefix_marker"]
         suffix_marker = command_info["suffix_marker"]
 
-        # Count occurrences of prefix markers
-        prefix_count = raw_output.count(prefix_marker)
-        if prefix_count >= 2:
-            # remove extra prefix markers
-            raw_output = prefix_marker + "\n" + raw_output.split(prefix_marker)[-1]
-
         # split output into lines
         lines = raw_output.split("\n")
 
-        # Find start and end marker lines
+        # Find start and end marker lines. Markers must be alone on their line,
+        # otherwise the echoed command line (which contains both) would match.
         start_line_idx = -1
         end_line_idx = -1
 
         for i, line in enumerate(lines):
-            if prefix_marker in line:
+            stripped = line.strip()
+            if stripped == prefix_marker:
                 start_line_idx = i
-            elif suffix_marker in line:
+                end_line_idx = -1
+            elif stripped == suffix_marker and start_line_idx != -1:
                 end_line_idx = i
-                break
 
         if start_line_idx == -1:
-            raise ValueError("Command start marker not found")
+            # The shell has not printed the start marker yet
+            return CommandParseResult(
+                status="success",
+                session_id=session_id,
+                command_id=command_id,
+                command_status="running",
+                output="",
+                completed=False,
+                original_command=command_info["original_command"],
+                exit_code=None,
+            )
 
         if end_line_idx == -1:
             # Command started but not finished - extract from start marker to end
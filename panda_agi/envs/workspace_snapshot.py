@@ -0,0 +1,110 @@
+"""
+Cached workspace listings and diffs between them.
+
+The agent sends a listing of the workspace with every request. Listings are
+cached per (path, depth, entry limit) until a file operation touches the
+listed tree or the environment reports that the tree changed.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .paths import paths_overlap
+
+SnapshotKey = Tuple[str, int, Optional[int]]
+
+
+@dataclass
+class SnapshotEntry:
+    """A cached listing with the data used to check it is still current"""
+
+    result: Dict[str, Any]
+    fingerprint: Any = None
+
+
+class WorkspaceSnapshotCache:
+    """Listings keyed by (path, max_depth, max_entries)"""
+
+    def __init__(self):
+        self._entries: Dict[SnapshotKey, SnapshotEntry] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: SnapshotKey) -> Optional[SnapshotEntry]:
+        """Get a cached listing"""
+        return self._entries.get(key)
+
+    def put(self, key: SnapshotKey, result: Dict[str, Any], fingerprint: Any = None):
+        """Cache a listing"""
+        self._entries[key] = SnapshotEntry(result=result, fingerprint=fingerprint)
+
+    def discard(self, key: SnapshotKey):
+        """Drop one cached listing"""
+        self._entries.pop(key, None)
+
+    def invalidate(self, path: Optional[str] = None):
+        """
+        Drop the listings that may include a path.
+
+        Args:
+            path: Absolute path that changed, None to drop every listing
+        """
+        if path is None:
+            self._entries.clear()
+            return
+
+        path = os.path.normpath(str(path))
+        for key in list(self._entries):
+            # A change inside the listed tree, or to a directory containing it
+            if paths_overlap(path, os.path.normpath(key[0])):
+                del self._entries[key]
+
+
+def _entry_signature(file_info: Dict[str, Any]) -> Tuple:
+    return (
+        file_info.get("type"),
+        file_info.get("size"),
+        file_info.get("modified"),
+    )
+
+
+def diff_snapshots(
+    previous: Dict[str, Any], current: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Describe a listing as changes against a previous listing of the same tree.
+
+    Args:
+        previous: Listing as returned by list_files
+        current: Newer listing as returned by list_files
+
+    Returns:
+        Dict with the current listing's summary fields and added/modified file
+        infos plus removed relative paths instead of the full file list
+    """
+    previous_files = {f["relative_path"]: f for f in previous.get("files", [])}
+    current_files = {f["relative_path"]: f for f in current.get("files", [])}
+
+    added: List[Dict[str, Any]] = []
+    modified: List[Dict[str, Any]] = []
+    for relative_path, file_info in current_files.items():
+        previous_info = previous_files.get(relative_path)
+        if previous_info is None:
+            added.append(file_info)
+        elif _entry_signature(previous_info) != _entry_signature(file_info):
+            modified.append(file_info)
+
+    removed = [p for p in previous_files if p not in current_files]
+
+    diff = {key: value for key, value in current.items() if key != "files"}
+    diff.update(
+        {
+            "diff_from_previous": True,
+            "unchanged": not (added or modified or removed),
+            "added": added,
+            "modified": modified,
+            "removed": removed,
+        }
+    )
+    return diff
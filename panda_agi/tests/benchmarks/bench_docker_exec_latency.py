@@ -0,0 +1,83 @@
+"""
+p50/p99 latency of a trivial command in DockerEnv, per execution path.
+
+Compares a throwaway container per command (`docker run --rm`, the
+isolate_commands path), a `docker exec` per command (the previous path for
+tmux commands) and the long-lived exec channel used now. Requires Docker.
+Usage:
+
+    python -m panda_agi.tests.benchmarks.bench_docker_exec_latency [-n 100] [--image python:3.9-slim]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from panda_agi.envs import DockerEnv
+
+
+async def _docker_exec_once(env: DockerEnv, command: str):
+    proc = await asyncio.create_subprocess_exec(
+        "docker",
+        "exec",
+        env.persistent_container_name,
+        "bash",
+        "-lc",
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    await proc.communicate()
+
+
+async def _latencies(run, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(name: str, samples):
+    quantiles = statistics.quantiles(samples, n=100)
+    print(f"{name:>18}: p50 {quantiles[49]:8.1f} ms   p99 {quantiles[98]:8.1f} ms")
+
+
+async def main(iterations: int, image: str):
+    command = "which tmux || true"
+    with tempfile.TemporaryDirectory() as workspace:
+        env = DockerEnv(workspace, image=image)
+        try:
+            # Start the container and open a first channel
+            await env._run_persistent_command("true")
+
+            _report(
+                "docker run --rm",
+                await _latencies(
+                    lambda: env._run_throwaway_command(command),
+                    max(2, iterations // 10),
+                ),
+            )
+            _report(
+                "docker exec",
+                await _latencies(lambda: _docker_exec_once(env, command), iterations),
+            )
+            _report(
+                "exec channel",
+                await _latencies(
+                    lambda: env._run_persistent_command(command), iterations
+                ),
+            )
+        finally:
+            await env.cleanup_all_sessions()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--iterations", type=int, default=100)
+    parser.add_argument("--image", default="python:3.9-slim")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.image))
@@ -0,0 +1,118 @@
+"""
+Speed and output size of the page to markdown conversion.
+
+Every page of a corpus of saved pages (*.html files in a directory, e.g.
+saved with `curl -o`) is converted with the previous pipeline (html.parser,
+re-serialized and parsed again by markdownify) and with html_to_markdown.
+Without a corpus, large synthetic pages with scripts and navigation are used.
+Usage:
+
+    python -m panda_agi.tests.benchmarks.bench_html_to_markdown [--corpus pages/] [--repeats 3]
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from bs4 import BeautifulSoup
+from markdownify import markdownify
+
+from panda_agi.tools.web_ops.html_extract import (
+    HTML_PARSER,
+    MAX_CONTENT_CHARS,
+    html_to_markdown,
+)
+
+
+def previous_pipeline(html: str) -> str:
+    """The conversion used before the single-parse extraction"""
+    soup = BeautifulSoup(html, "html.parser")
+    return markdownify(str(soup))
+
+
+def current_pipeline(html: str) -> str:
+    return html_to_markdown(html, MAX_CONTENT_CHARS)
+
+
+def synthetic_page(paragraphs: int, seed: int) -> str:
+    """Build a page with an article surrounded by typical boilerplate"""
+    rng = random.Random(seed)
+    words = ["panda", "bamboo", "forest", "agent", "tool", "data", "search"]
+    links = "".join(f'<li><a href="/p/{i}">Page {i}</a></li>' for i in range(300))
+    script = "<script>" + "var x = {'k': [1, 2, 3]};" * 2000 + "</script>"
+    style = "<style>" + ".c { color: red; margin: 0 }" * 2000 + "</style>"
+    article = "".join(
+        f"<h2>Section {i}</h2><p>"
+        + " ".join(rng.choice(words) for _ in range(rng.randint(50, 150)))
+        + "</p>"
+        for i in range(paragraphs)
+    )
+    return (
+        f"<html><head><title>Page {seed}</title>{style}</head><body>"
+        f"<header><nav><ul>{links}</ul></nav></header>{script}"
+        f'<div class="layout"><aside class="sidebar"><ul>{links}</ul></aside>'
+        f'<div class="story">{article}</div></div>'
+        f"<footer><ul>{links}</ul></footer></body></html>"
+    )
+
+
+def load_corpus(directory: str) -> List[Tuple[str, str]]:
+    pages = []
+    for path in sorted(Path(directory).glob("*.htm*")):
+        pages.append((path.name, path.read_text(encoding="utf-8", errors="replace")))
+    if not pages:
+        raise SystemExit(f"No *.html files in {directory}")
+    return pages
+
+
+def measure(convert: Callable[[str], str], html: str, repeats: int):
+    """Return the best time of a conversion and its output size"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = convert(html)
+        best = min(best, time.perf_counter() - start)
+    return best, len(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", help="Directory with saved *.html pages")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages = load_corpus(args.corpus)
+    else:
+        pages = [
+            (f"synthetic-{i}", synthetic_page(args.paragraphs, i))
+            for i in range(args.pages)
+        ]
+
+    print(f"parser: {HTML_PARSER}")
+    print(
+        f"{'page':<32} {'KB':>7} {'before s':>9} {'after s':>8} "
+        f"{'before chars':>13} {'after chars':>12}"
+    )
+    totals = [0.0, 0.0]
+    for name, html in pages:
+        before_time, before_size = measure(previous_pipeline, html, args.repeats)
+        after_time, after_size = measure(current_pipeline, html, args.repeats)
+        totals[0] += before_time
+        totals[1] += after_time
+        print(
+            f"{name[:32]:<32} {len(html) / 1024:7.0f} {before_time:9.3f} "
+            f"{after_time:8.3f} {before_size:13} {after_size:12}"
+        )
+    print(
+        f"total: {totals[0]:.3f}s before, {totals[1]:.3f}s after "
+        f"({totals[0] / max(totals[1], 1e-9):.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
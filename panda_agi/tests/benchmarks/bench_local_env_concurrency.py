@@ -0,0 +1,81 @@
+"""
+Wall-clock time of N parallel LocalEnv commands versus a single one.
+
+Two scenarios are measured: full exec_shell calls (tmux session, polling,
+cleanup) and raw _run_command calls. For each, the longest event loop stall
+seen by a 10 ms heartbeat is reported too, since a blocking runner stalls
+every other coroutine even when the totals look fine.
+
+Requires tmux. Usage:
+
+    python -m panda_agi.tests.benchmarks.bench_local_env_concurrency [-n 8] [--seconds 1]
+
+Interactive shell startup files are sourced by the tmux shells, so a heavy
+~/.bashrc inflates the exec_shell numbers; run with HOME pointing to an empty
+directory to measure the runner alone.
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from panda_agi.envs import LocalEnv
+
+
+async def _heartbeat(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Return the longest delay observed between two heartbeats"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        worst = max(worst, now - last - interval)
+        last = now
+    return worst
+
+
+async def _timed(make_awaitable):
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(stop))
+    await asyncio.sleep(0)  # let the heartbeat take its first timestamp
+    start = time.perf_counter()
+    await make_awaitable()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await heartbeat
+
+
+async def _scenario(name: str, make_call, parallel: int):
+    single, single_stall = await _timed(make_call)
+    many, many_stall = await _timed(
+        lambda: asyncio.gather(*(make_call() for _ in range(parallel)))
+    )
+
+    print(f"{name}:")
+    print(f"  1 call: {single:.2f} s, max loop stall {single_stall * 1000:.0f} ms")
+    print(
+        f"  {parallel} parallel calls: {many:.2f} s, "
+        f"max loop stall {many_stall * 1000:.0f} ms"
+    )
+    print(f"  ratio: {many / single:.2f}x (sequential would be ~{parallel}x)")
+
+
+async def main(parallel: int, seconds: float):
+    with tempfile.TemporaryDirectory() as workspace:
+        env = LocalEnv(workspace)
+        command = f"sleep {seconds} && echo done"
+
+        # Warm up tmux initialization
+        await env.exec_shell("true")
+
+        await _scenario("exec_shell", lambda: env.exec_shell(command), parallel)
+        await _scenario("_run_command", lambda: env._run_command(command), parallel)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--parallel", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.parallel, args.seconds))
@@ -0,0 +1,107 @@
+"""
+Correctness and throughput of StreamFrameDecoder on re-chunked streams.
+
+A recorded response body (or a synthetic one with multi-byte characters and
+noise between frames) is split at random positions many times. Every split
+must decode to exactly the frames found by a regex over the whole body, and
+the decoding speed is reported in MB/s. Usage:
+
+    python -m panda_agi.tests.benchmarks.bench_stream_framing [--recording body.bin] [--rounds 200]
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import List, Tuple
+
+from panda_agi.client.stream_decoder import StreamFrameDecoder
+
+FRAME_PATTERN = re.compile(rb"<(data|conversation_id)>(.*?)</\1>", re.DOTALL)
+
+
+def synthetic_stream(frames: int, seed: int = 0) -> bytes:
+    """Build a response body similar to the agent endpoint's"""
+    rng = random.Random(seed)
+    words = ["token", "données", "数据", "🐼", "<b>", "a < b", "\n", "x" * 40]
+    parts = [b"<conversation_id>c0ffee-1234</conversation_id>"]
+    for i in range(frames):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 30)))
+        event = {"type": "token", "index": i, "content": text}
+        payload = json.dumps(event, ensure_ascii=False).encode()
+        parts.append(b"<data>" + payload + b"</data>")
+        if rng.random() < 0.1:
+            # Keep-alive noise between frames
+            parts.append(rng.choice([b"\n", b"\r\n", b"<ping/>", b" "]))
+    return b"".join(parts)
+
+
+def reference_frames(body: bytes) -> List[Tuple[str, str]]:
+    return [
+        (m.group(1).decode(), m.group(2).decode("utf-8", errors="replace"))
+        for m in FRAME_PATTERN.finditer(body)
+    ]
+
+
+def random_chunks(body: bytes, rng: random.Random, max_chunk: int) -> List[bytes]:
+    chunks = []
+    position = 0
+    while position < len(body):
+        size = rng.randint(1, max_chunk)
+        chunks.append(body[position : position + size])
+        position += size
+    return chunks
+
+
+def decode(chunks: List[bytes]) -> List[Tuple[str, str]]:
+    decoder = StreamFrameDecoder()
+    frames = []
+    for chunk in chunks:
+        frames.extend(decoder.feed(chunk))
+    assert not decoder.in_frame
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recording", help="File with a raw response body")
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.recording:
+        with open(args.recording, "rb") as f:
+            body = f.read()
+    else:
+        body = synthetic_stream(args.frames, args.seed)
+    expected = reference_frames(body)
+    rng = random.Random(args.seed)
+
+    # Fuzz: many random splits, from byte-by-byte to large reads
+    for round_index in range(args.rounds):
+        max_chunk = rng.choice([1, 3, 16, 256, 4096, 65536])
+        chunks = random_chunks(body, rng, max_chunk)
+        if decode(chunks) != expected:
+            raise SystemExit(
+                f"Mismatch in round {round_index} (max chunk {max_chunk} bytes)"
+            )
+    print(
+        f"{args.rounds} random splits of {len(body)} bytes: "
+        f"all {len(expected)} frames match"
+    )
+
+    for max_chunk in (64, 1024, 16384, 65536):
+        chunks = random_chunks(body, rng, max_chunk)
+        start = time.perf_counter()
+        repeats = 5
+        for _ in range(repeats):
+            decode(chunks)
+        elapsed = time.perf_counter() - start
+        mb_per_s = len(body) * repeats / elapsed / 1e6
+        print(f"reads up to {max_chunk:>6} bytes: {mb_per_s:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Peak memory of TokenProcessor on a 200 KB streamed response.
+
+Each mode runs in a fresh interpreter so that peak RSS is not shared between
+runs. Usage:
+
+    python -m panda_agi.tests.benchmarks.bench_token_stream_memory [--retain]
+
+With --retain the consumer keeps every token event, as a UI collecting the
+stream would do.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+RESPONSE_SIZE = 200 * 1024
+
+
+async def _stream(token_size: int):
+    token = "x" * (token_size - 1) + " "
+    for _ in range(RESPONSE_SIZE // token_size):
+        yield token
+
+
+async def _consume(memory_lean: bool, token_size: int, retain: bool) -> int:
+    from panda_agi.client.token_processor import TokenProcessor
+    from panda_agi.tools import ToolRegistry
+
+    processor = TokenProcessor(tool_registry=ToolRegistry(), memory_lean=memory_lean)
+    events = []
+    async for event in processor.process_token_stream(_stream(token_size)):
+        if retain:
+            events.append(event)
+    return len(processor.get_accumulated_content())
+
+
+def _run_mode(memory_lean: bool, token_size: int, retain: bool) -> dict:
+    """Run one mode in the current process and report its memory usage"""
+    import panda_agi.client.token_processor  # noqa: F401  (exclude import cost)
+
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = asyncio.run(_consume(memory_lean, token_size, retain))
+    elapsed = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "mode": "memory_lean" if memory_lean else "default",
+        "response_bytes": size,
+        "peak_rss_growth_kb": peak_rss - baseline_rss,
+        "peak_traced_kb": peak_traced // 1024,
+        "seconds": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--token-size", type=int, default=256)
+    parser.add_argument("--retain", action="store_true")
+    parser.add_argument("--child", choices=["default", "memory_lean"])
+    args = parser.parse_args()
+
+    if args.child:
+        result = _run_mode(args.child == "memory_lean", args.token_size, args.retain)
+        print(json.dumps(result))
+        return
+
+    for mode in ("default", "memory_lean"):
+        cmd = [
+            sys.executable,
+            "-m",
+            "panda_agi.tests.benchmarks.bench_token_stream_memory",
+            "--child",
+            mode,
+            "--token-size",
+            str(args.token_size),
+        ]
+        if args.retain:
+            cmd.append("--retain")
+        output = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(
+            f"{result['mode']:>12}: peak RSS +{result['peak_rss_growth_kb']} KB, "
+            f"peak traced {result['peak_traced_kb']} KB, {result['seconds']} s "
+            f"({result['response_bytes']} bytes streamed)"
+        )
+
+
+if __name__ == "__main__":
+    main()
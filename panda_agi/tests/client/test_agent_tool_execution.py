@@ -0,0 +1,340 @@
+import asyncio
+import time
+
+from panda_agi import Agent
+from panda_agi.client.panda_agi_client import PandaAgiConnectionError
+from panda_agi.client.retry import StreamRetryPolicy
+from panda_agi.client.tool_scheduler import plan_tool_batches
+from panda_agi.envs import LocalEnv
+from panda_agi.tools import ToolRegistry
+from panda_agi.tools.base import ToolHandler, ToolResult
+from panda_agi.tools.result_cache import ToolResultCache
+
+
+class SleepingHandler(ToolHandler):
+    """Records when it runs and sleeps to simulate I/O"""
+
+    def __init__(self, name, timeline, delay=0.2):
+        super().__init__()
+        self.name = name
+        self.timeline = timeline
+        self.delay = delay
+        self.calls = 0
+
+    async def execute(self, params):
+        self.calls += 1
+        self.timeline.append(("start", self.name, params))
+        await asyncio.sleep(self.delay)
+        self.timeline.append(("end", self.name, params))
+        return ToolResult(success=True, data={"tool": self.name, **params})
+
+
+def _tool_call(index, function_name, **arguments):
+    return {
+        "id": f"tool_call_{index}",
+        "function_name": function_name,
+        "xml_tag_name": function_name,
+        "arguments": arguments,
+    }
+
+
+def _make_agent(tmp_path, max_concurrent_tools, timeline):
+    agent = Agent(
+        model="annie-pro",
+        api_key="test-key",
+        environment=LocalEnv(tmp_path),
+        max_concurrent_tools=max_concurrent_tools,
+    )
+    # Not shared with the agents of other tests
+    agent.tool_result_cache = ToolResultCache()
+    for name in ("web_visit_page", "file_read", "file_write", "shell_exec_command"):
+        agent.tool_handlers[name] = SleepingHandler(name, timeline)
+    return agent
+
+
+def test_plan_tool_batches_respects_conflicts():
+    registry = ToolRegistry()
+    calls = [
+        _tool_call(1, "web_visit_page", url="https://a"),
+        _tool_call(2, "file_read", file="a.txt"),
+        _tool_call(3, "file_read", file="b.txt"),
+        _tool_call(4, "file_write", file="a.txt", content="x"),
+        _tool_call(5, "web_search", query="q"),
+        _tool_call(6, "shell_exec_command", command="ls"),
+        _tool_call(7, "explore_directory", path="src"),
+        _tool_call(8, "file_write", file="src/main.py", content="y"),
+    ]
+
+    assert plan_tool_batches(calls, registry) == [[0, 1, 2], [3, 4], [5], [6], [7]]
+
+
+def test_independent_tools_run_concurrently(tmp_path):
+    timeline = []
+    agent = _make_agent(tmp_path, 4, timeline)
+    agent.token_processor.completed_tools = [
+        _tool_call(i, "web_visit_page", url=f"https://example.com/{i}")
+        for i in range(1, 5)
+    ]
+
+    start = time.perf_counter()
+    results = asyncio.run(agent._execute_collected_tools())
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.6
+    assert [r["tool_call_id"] for r in results] == [f"tool_call_{i}" for i in range(1, 5)]
+    assert all(r["status"] == "completed" for r in results)
+
+
+def test_conflicting_tools_keep_their_order(tmp_path):
+    timeline = []
+    agent = _make_agent(tmp_path, 4, timeline)
+    agent.token_processor.completed_tools = [
+        _tool_call(1, "file_write", file="a.txt", content="x"),
+        _tool_call(2, "file_read", file="a.txt"),
+        _tool_call(3, "shell_exec_command", command="cat a.txt"),
+    ]
+
+    asyncio.run(agent._execute_collected_tools())
+
+    assert [(stage, name) for stage, name, _ in timeline] == [
+        ("start", "file_write"),
+        ("end", "file_write"),
+        ("start", "file_read"),
+        ("end", "file_read"),
+        ("start", "shell_exec_command"),
+        ("end", "shell_exec_command"),
+    ]
+
+
+def test_run_stream_executes_each_collected_tool_once(tmp_path):
+    timeline = []
+    agent = _make_agent(tmp_path, 1, timeline)
+    for handler in agent.tool_handlers.values():
+        if isinstance(handler, SleepingHandler):
+            handler.delay = 0
+    responses = [
+        [
+            '<file_write file="a.txt">hello</file_write>',
+            '<web_visit_page url="https://example.com"></web_visit_page>',
+            '<shell_exec_command command="ls"></shell_exec_command>',
+        ],
+        ['<completed_task success="true"></completed_task>'],
+    ]
+
+    async def fake_streaming_request(request):
+        for token in responses.pop(0):
+            yield token
+
+    agent.client.send_streaming_request = fake_streaming_request
+
+    async def run():
+        return [
+            event
+            async for event in agent.run_stream(
+                "do it", execute_tools_at_end=True, execute_tools_immediately=False
+            )
+        ]
+
+    events = asyncio.run(run())
+
+    for name in ("file_write", "web_visit_page", "shell_exec_command"):
+        assert agent.tool_handlers[name].calls == 1
+    assert [e["event_type"] for e in events] == ["tool_start", "tool_end"] * 4
+    assert not responses
+
+
+def test_run_stream_retries_and_replays_executed_tools(tmp_path):
+    timeline = []
+    agent = _make_agent(tmp_path, 1, timeline)
+    agent.stream_retry = StreamRetryPolicy(base_delay=0.01)
+    for handler in agent.tool_handlers.values():
+        if isinstance(handler, SleepingHandler):
+            handler.delay = 0
+    first_turn = [
+        '<file_write file="a.txt">hello</file_write>',
+        '<shell_exec_command command="ls"></shell_exec_command>',
+    ]
+    responses = [
+        first_turn[:1] + [PandaAgiConnectionError("connection reset")],
+        first_turn,
+        ['<completed_task success="true"></completed_task>'],
+    ]
+    requests = []
+
+    async def fake_streaming_request(request):
+        requests.append(request)
+        for token in responses.pop(0):
+            if isinstance(token, Exception):
+                raise token
+            yield token
+
+    agent.client.send_streaming_request = fake_streaming_request
+
+    async def run():
+        return [
+            event
+            async for event in agent.run_stream(
+                "do it", execute_tools_at_end=False, execute_tools_immediately=True
+            )
+        ]
+
+    events = asyncio.run(run())
+
+    # The interrupted turn is sent again as the same request
+    assert requests[0] is requests[1]
+    assert requests[2].request_id != requests[0].request_id
+    # file_write ran before the failure, its result is replayed
+    assert agent.tool_handlers["file_write"].calls == 1
+    assert agent.tool_handlers["shell_exec_command"].calls == 1
+    assert requests[2].messages[0].content.count("<tool_result") == 2
+    assert [e["event_type"] for e in events] == ["tool_start", "tool_end"] * 3
+    assert not responses
+    # Tools only the client knows about are described in every request
+    assert all(
+        "file_search_in_content" in [tool.name for tool in request.tools]
+        for request in requests
+    )
+
+
+def test_immediate_tools_run_in_background_and_join_in_order(tmp_path):
+    timeline = []
+    agent = _make_agent(tmp_path, 4, timeline)
+    agent.tool_handlers["web_visit_page"].delay = 0.3
+    agent.tool_handlers["file_read"].delay = 0.05
+    responses = [
+        [
+            '<web_visit_page url="https://example.com"></web_visit_page>',
+            '<file_read file="a.txt"></file_read>',
+            "more text",
+        ],
+        ['<completed_task success="true"></completed_task>'],
+    ]
+    token_times = []
+    requests = []
+
+    async def fake_streaming_request(request):
+        requests.append(request)
+        for token in responses.pop(0):
+            token_times.append(time.perf_counter())
+            yield token
+
+    agent.client.send_streaming_request = fake_streaming_request
+
+    async def run():
+        return [
+            event
+            async for event in agent.run_stream(
+                "do it", execute_tools_at_end=False, execute_tools_immediately=True
+            )
+        ]
+
+    asyncio.run(run())
+
+    # Reading the first turn did not wait for the tools
+    assert token_times[2] - token_times[0] < 0.1
+    # file_read finished first, results are still sent in detection order
+    assert [(stage, name) for stage, name, _ in timeline[2:]] == [
+        ("end", "file_read"),
+        ("end", "web_visit_page"),
+    ]
+    content = requests[1].messages[0].content
+    assert content.index("name=web_visit_page") < content.index("name=file_read")
+
+
+def test_read_only_tools_are_prefetched_from_their_opening_tag(tmp_path):
+    timeline = []
+    agent = _make_agent(tmp_path, 1, timeline)
+    agent.prefetch_read_only_tools = True
+    for handler in agent.tool_handlers.values():
+        if isinstance(handler, SleepingHandler):
+            handler.delay = 0.05
+    responses = [
+        [
+            '<file_read file="a.txt">',
+            "</file_read>",
+            '<file_write file="b.txt">x</file_write>',
+            '<file_read file="b.txt">',
+            "</file_read>",
+        ],
+        ['<completed_task success="true"></completed_task>'],
+    ]
+    started_before_close = []
+
+    async def fake_streaming_request(request):
+        for token in responses.pop(0):
+            if token == "</file_read>":
+                await asyncio.sleep(0.01)
+                started_before_close.append(len(timeline))
+            yield token
+
+    agent.client.send_streaming_request = fake_streaming_request
+
+    async def run():
+        return [
+            event
+            async for event in agent.run_stream(
+                "do it", execute_tools_at_end=True, execute_tools_immediately=False
+            )
+        ]
+
+    asyncio.run(run())
+
+    # a.txt was read before its closing tag arrived, b.txt only after the
+    # file_write it depends on
+    assert started_before_close == [1, 1]
+    assert agent.tool_handlers["file_read"].calls == 2
+    assert [(stage, name, params["file"]) for stage, name, params in timeline] == [
+        ("start", "file_read", "a.txt"),
+        ("end", "file_read", "a.txt"),
+        ("start", "file_write", "b.txt"),
+        ("end", "file_write", "b.txt"),
+        ("start", "file_read", "b.txt"),
+        ("end", "file_read", "b.txt"),
+    ]
+    assert agent.prefetch_cache.hits == 1
+
+
+def test_tool_results_are_cached_until_their_path_is_written(tmp_path):
+    timeline = []
+    agent = _make_agent(tmp_path, 1, timeline)
+    for handler in agent.tool_handlers.values():
+        if isinstance(handler, SleepingHandler):
+            handler.delay = 0
+    agent.token_processor.completed_tools = [
+        _tool_call(1, "file_read", file="a.txt"),
+        _tool_call(2, "file_read", file="./a.txt"),
+        _tool_call(3, "web_visit_page", url="https://example.com"),
+        _tool_call(4, "file_write", file="a.txt", content="x"),
+        _tool_call(5, "file_read", file="a.txt"),
+        _tool_call(6, "web_visit_page", url="https://example.com "),
+    ]
+
+    results = asyncio.run(agent._execute_collected_tools())
+
+    assert all(r["status"] == "completed" for r in results)
+    assert agent.tool_handlers["file_read"].calls == 2
+    # Pages are kept fresh by the HTTP cache, not the result cache
+    assert agent.tool_handlers["web_visit_page"].calls == 2
+    assert agent.tool_result_cache.stats()["hits"] == 1
+    assert agent.tool_result_cache.invalidations == 1
+
+
+def test_tool_results_are_not_cached_while_background_sessions_run(tmp_path):
+    timeline = []
+    agent = _make_agent(tmp_path, 1, timeline)
+    agent.tool_handlers["file_read"].delay = 0
+    agent.environment.tmux_executor.active_sessions["server"] = {}
+    agent.token_processor.completed_tools = [
+        _tool_call(1, "file_read", file="a.txt"),
+        _tool_call(2, "file_read", file="a.txt"),
+    ]
+
+    asyncio.run(agent._execute_collected_tools())
+
+    assert agent.tool_handlers["file_read"].calls == 2
+    assert agent.tool_result_cache.stats()["hits"] == 0
+
+
+def test_tool_result_cache_is_opt_in(tmp_path):
+    agent = Agent(model="annie-pro", api_key="test-key", environment=LocalEnv(tmp_path))
+    assert agent.tool_result_cache is None
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from panda_agi.client.http_pool import (
+    HttpPoolConfig,
+    close_shared_http_clients,
+    shared_http_pool,
+)
+from panda_agi.client.panda_agi_client import PandaAgiClient
+
+IMAGE_RESPONSE = json.dumps(
+    {"success": True, "images": [{"url": "u", "filename": "f"}], "message": "ok"}
+).encode()
+
+
+async def _start_server(connections):
+    """HTTP/1.1 keep-alive server answering every request with IMAGE_RESPONSE"""
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                writer.close()
+                return
+            length = 0
+            for line in head.decode().split("\r\n"):
+                if line.lower().startswith("content-length:"):
+                    length = int(line.split(":")[1])
+            await reader.readexactly(length)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(IMAGE_RESPONSE)}\r\n\r\n".encode()
+                + IMAGE_RESPONSE
+            )
+            await writer.drain()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def _generate_with_new_clients(count):
+    connections = []
+    server, base_url = await _start_server(connections)
+    config = HttpPoolConfig(http2=False)
+    try:
+        for _ in range(count):
+            # A new client per turn, like a backend building an agent per request
+            async with PandaAgiClient(base_url=base_url, pool_config=config) as client:
+                response = await client.generate_image("a cat")
+                assert response.success
+        shared = shared_http_pool.get_client(base_url, config)
+        assert not shared.is_closed
+        await close_shared_http_clients()
+        assert shared.is_closed
+        return len(connections), shared_http_pool.metrics(base_url)
+    finally:
+        server.close()
+
+
+def test_clients_share_connections_and_record_reuse():
+    connections, metrics = asyncio.run(_generate_with_new_clients(3))
+
+    assert connections == 1
+    assert metrics.requests == 3
+    assert metrics.new_connections == 1
+    assert metrics.as_dict()["reuse_ratio"] == round(2 / 3, 4)
+    assert metrics.handshake_seconds_saved == 2 * metrics.average_handshake_seconds
+
+
+def test_shared_client_is_not_reused_across_event_loops():
+    async def get_client():
+        return shared_http_pool.get_client("http://example.invalid")
+
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_client())
+    assert first is not second
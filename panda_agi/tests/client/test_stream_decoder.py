@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from panda_agi.client.stream_decoder import StreamFrameDecoder, StreamFrameError
+
+BODY = (
+    "<conversation_id>abc</conversation_id>\n"
+    "<data>héllo 🐼</data><data>a < b</data><ping/>"
+    "<data></data>\r\n<data>last</data>"
+).encode()
+
+FRAMES = [
+    ("conversation_id", "abc"),
+    ("data", "héllo 🐼"),
+    ("data", "a < b"),
+    ("data", ""),
+    ("data", "last"),
+]
+
+
+def test_frames_split_at_every_position():
+    for split in range(len(BODY) + 1):
+        decoder = StreamFrameDecoder()
+        frames = decoder.feed(BODY[:split]) + decoder.feed(BODY[split:])
+        assert frames == FRAMES, split
+        assert decoder.pending_bytes == 0
+
+
+def test_frames_split_randomly():
+    rng = random.Random(0)
+    for _ in range(200):
+        decoder = StreamFrameDecoder()
+        frames = []
+        position = 0
+        while position < len(BODY):
+            size = rng.randint(1, 8)
+            frames.extend(decoder.feed(BODY[position : position + size]))
+            position += size
+        assert frames == FRAMES
+
+
+def test_oversized_frame_is_rejected():
+    decoder = StreamFrameDecoder(max_frame_bytes=16)
+    decoder.feed(b"<data>" + b"x" * 16)
+    assert decoder.in_frame
+    with pytest.raises(StreamFrameError):
+        decoder.feed(b"x")
@@ -0,0 +1,118 @@
+import asyncio
+
+from panda_agi.client.token_processor import TokenProcessor
+from panda_agi.tools import ToolRegistry
+
+
+async def _stream(tokens):
+    for token in tokens:
+        yield token
+
+
+async def _collect_events(tokens):
+    processor = TokenProcessor(tool_registry=ToolRegistry(), collect_mode=True)
+    return [event async for event in processor.process_token_stream(_stream(tokens))]
+
+
+def _split(text, size):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_detects_tool_split_across_tokens():
+    text = (
+        "Let me check. <file_read file=\"notes.txt\" start_line=\"1\"></file_read>"
+        " Now writing <file_write file=\"a.txt\">hello\nworld</file_write> done"
+    )
+
+    for size in (1, 3, 7, len(text)):
+        events = asyncio.run(_collect_events(_split(text, size)))
+        tools = [e for e in events if e["type"] == "tool_detected"]
+
+        assert [t["function_name"] for t in tools] == ["file_read", "file_write"]
+        assert tools[0]["arguments"] == {"file": "notes.txt", "start_line": "1"}
+        assert tools[1]["arguments"] == {"file": "a.txt", "content": "hello\nworld"}
+        assert tools[1]["raw_xml"] == (
+            '<file_write file="a.txt">hello\nworld</file_write>'
+        )
+        assert [t["tool_call_id"] for t in tools] == ["tool_call_1", "tool_call_2"]
+
+
+def test_tags_inside_tool_content_are_not_detected():
+    text = '<file_write file="x.md">Use <web_search>query</web_search></file_write>'
+    events = asyncio.run(_collect_events(_split(text, 4)))
+    tools = [e for e in events if e["type"] == "tool_detected"]
+
+    assert [t["function_name"] for t in tools] == ["file_write"]
+    assert tools[0]["arguments"]["content"] == "Use <web_search>query</web_search>"
+
+
+def test_angle_brackets_in_attribute_values_at_every_split():
+    calls = [
+        ('<file_write file="a<b.txt">hi</file_write>', {"file": "a<b.txt"}),
+        (
+            '<file_replace file="a.html" find_str="<div>x</div>"'
+            " replace_str='<web_search>y</web_search>'></file_replace>",
+            {
+                "file": "a.html",
+                "find_str": "<div>x</div>",
+                "replace_str": "<web_search>y</web_search>",
+            },
+        ),
+    ]
+    for text, expected in calls:
+        for offset in range(1, len(text)):
+            tokens = ["if a < b: ", text[:offset], text[offset:], " List<T>"]
+            events = asyncio.run(_collect_events(tokens))
+            tools = [e for e in events if e["type"] == "tool_detected"]
+
+            assert len(tools) == 1, (text, offset)
+            assert expected.items() <= tools[0]["arguments"].items()
+            assert tools[0]["raw_xml"] == text
+
+
+def test_prefetch_needs_every_required_parameter_in_attributes():
+    async def run(tokens):
+        processor = TokenProcessor(tool_registry=ToolRegistry(), collect_mode=True)
+        processor.set_prefetch_mode(True)
+        return [
+            event
+            async for event in processor.process_token_stream(_stream(tokens))
+            if event["type"] == "tool_opened"
+        ]
+
+    opened = asyncio.run(
+        run(['<web_visit_page url="https://a.com">', "</web_visit_page>"])
+    )
+    assert [(e["function_name"], e["arguments"]) for e in opened] == [
+        ("web_visit_page", {"url": "https://a.com"})
+    ]
+    # The url comes from the content, only known at the closing tag
+    assert asyncio.run(run(["<web_visit_page>https://a.com</web_visit_page>"])) == []
+
+
+def test_scanner_buffer_stays_bounded():
+    processor = TokenProcessor(tool_registry=ToolRegistry(), collect_mode=True)
+    tokens = ["plain text with a < sign and no tools "] * 1000
+
+    async def run():
+        async for _ in processor.process_token_stream(_stream(tokens)):
+            pass
+
+    asyncio.run(run())
+    assert len(processor.xml_scanner.buffer) < 100
+    assert not processor.has_completed_tools()
+
+
+def test_memory_lean_mode_yields_only_deltas():
+    processor = TokenProcessor(tool_registry=ToolRegistry(), memory_lean=True)
+    tokens = ["Hello", ", ", "world"]
+
+    async def run():
+        return [e async for e in processor.process_token_stream(_stream(tokens))]
+
+    events = asyncio.run(run())
+
+    assert [e["content"] for e in events] == tokens
+    assert all("accumulated_content" not in e for e in events)
+    assert processor.get_accumulated_content() == "Hello, world"
+    assert processor.get_token_count() == 3
@@ -0,0 +1,114 @@
+import asyncio
+import base64
+import json
+import subprocess
+import sys
+
+from panda_agi.envs import LocalEnv, content_search
+from panda_agi.envs.content_index import required_literals
+
+
+def _make_tree(root):
+    (root / "src").mkdir()
+    (root / "src" / "app.py").write_text("import os\n\ndef main():\n    run()\n")
+    (root / "src" / "util.py").write_text("def run():\n    return 1\n")
+    (root / "README.md").write_text("Call run() to start\n")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "lib.js").write_text("run()\n")
+    (root / "image.bin").write_bytes(b"\0run()")
+    for i in range(50):
+        (root / f"other{i}.txt").write_text(f"nothing to see {i}\n")
+
+
+def test_matches_with_context_and_globs(tmp_path):
+    _make_tree(tmp_path)
+    env = LocalEnv(tmp_path)
+
+    result = asyncio.run(env.search_content(r"run\(\)", context_lines=1))
+    assert result["status"] == "success"
+    assert [(m["file"], m["line_number"]) for m in result["matches"]] == [
+        ("README.md", 1),
+        ("src/app.py", 4),
+        ("src/util.py", 1),
+    ]
+    assert result["matches"][1]["before"] == ["def main():"]
+    assert result["matches"][1]["after"] == []
+
+    python = asyncio.run(env.search_content("RUN", glob="*.py", ignore_case=True))
+    assert [m["file"] for m in python["matches"]] == ["src/app.py", "src/util.py"]
+    nested = asyncio.run(env.search_content("run", path="src", glob="util.*"))
+    assert [m["file"] for m in nested["matches"]] == ["util.py"]
+
+    limited = asyncio.run(env.search_content(r"run\(\)", max_results=2))
+    assert limited["match_count"] == 2 and limited["truncated"]
+
+    invalid = asyncio.run(env.search_content("("))
+    assert invalid["status"] == "error"
+
+
+def test_index_skips_files_that_cannot_match(tmp_path):
+    _make_tree(tmp_path)
+    env = LocalEnv(tmp_path)
+
+    result = asyncio.run(env.search_content("def main"))
+    assert [m["file"] for m in result["matches"]] == ["src/app.py"]
+    assert result["files_searched"] < 5
+    indexed = env.content_index.indexed
+
+    asyncio.run(env.search_content("return"))
+    assert env.content_index.indexed == indexed
+
+    assert required_literals(r"foo\w+bar(baz)+") == ["foo", "bar", "baz"]
+    assert required_literals("foo|barbaz") == []
+
+
+def test_index_follows_writes_and_deletes(tmp_path):
+    _make_tree(tmp_path)
+    env = LocalEnv(tmp_path)
+    asyncio.run(env.search_content("anything"))
+
+    asyncio.run(env.write_file("src/new.py", "def fresh_function():\n    pass\n"))
+    asyncio.run(env.delete_file("src/util.py"))
+
+    fresh = asyncio.run(env.search_content("fresh_function"))
+    assert [m["file"] for m in fresh["matches"]] == ["src/new.py"]
+    gone = asyncio.run(env.search_content("return 1"))
+    assert gone["matches"] == []
+
+
+def test_script_mode(tmp_path):
+    _make_tree(tmp_path)
+    arguments = {
+        "root": str(tmp_path),
+        "regex": "run",
+        "glob": "*.py",
+        "exclude_dirs": ["node_modules"],
+    }
+    encoded = base64.b64encode(json.dumps(arguments).encode()).decode()
+    with open(content_search.__file__) as f:
+        script = f.read()
+    output = subprocess.run(
+        [sys.executable, "-c", script, encoded], capture_output=True, text=True
+    ).stdout
+
+    result = json.loads(output)
+    assert result["status"] == "success"
+    assert [m["file"] for m in result["matches"]] == ["src/app.py", "src/util.py"]
+
+
+def test_index_sees_changes_made_outside_the_env(tmp_path):
+    _make_tree(tmp_path)
+    env = LocalEnv(tmp_path)
+    assert asyncio.run(env.search_content("needle"))["matches"] == []
+
+    (tmp_path / "src" / "util.py").write_text("def run():\n    return needle\n")
+    (tmp_path / "src" / "extra").mkdir()
+    (tmp_path / "src" / "extra" / "more.py").write_text("needle = 1\n")
+    (tmp_path / "README.md").unlink()
+
+    found = asyncio.run(env.search_content("needle"))
+    assert [m["file"] for m in found["matches"]] == [
+        "src/extra/more.py",
+        "src/util.py",
+    ]
+    assert asyncio.run(env.search_content("start"))["matches"] == []
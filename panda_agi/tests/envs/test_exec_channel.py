@@ -0,0 +1,68 @@
+import asyncio
+import glob
+import os
+import time
+
+from panda_agi.envs.exec_channel import ExecChannel
+
+
+def test_commands_share_one_shell_process():
+    async def run():
+        channel = ExecChannel(["bash"])
+        first = await channel.run('echo "a b"; echo oops >&2; exit 3', timeout=5)
+        pid = channel.process.pid
+        second = await channel.run("cd / && printf no-newline", timeout=5)
+        third = await channel.run("pwd", timeout=5)
+        assert channel.process.pid == pid
+        await channel.close()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert (first.output, first.error, first.exit_code) == ("a b", "oops", 3)
+    assert not first.success
+    assert second.output == "no-newline" and second.success
+    # Each command runs in a subshell, the cd did not leak
+    assert third.output != "/"
+
+
+def test_timeout_closes_the_channel():
+    async def run():
+        channel = ExecChannel(["bash"])
+        result = await channel.run("sleep 5", timeout=0.2)
+        alive = channel.is_alive
+        after = await channel.run("echo back", timeout=5)
+        await channel.close()
+        return result, alive, after
+
+    result, alive, after = asyncio.run(run())
+
+    assert result.exit_code == -1 and not result.success
+    assert not alive
+    assert after.output == "back"
+
+
+def test_timeout_kills_the_command_and_its_children(tmp_path):
+    pid_file = tmp_path / "pid"
+    stderr_files = set(glob.glob("/tmp/__panda_agi_exec_*.err"))
+
+    async def run():
+        channel = ExecChannel(["bash"])
+        result = await channel.run(
+            f"sleep 30 & echo $! > {pid_file}; echo oops >&2; wait", timeout=0.5
+        )
+        await channel.close()
+        return result
+
+    result = asyncio.run(run())
+    pid = int(pid_file.read_text())
+    time.sleep(0.1)
+
+    assert result.exit_code == -1
+    try:
+        os.kill(pid, 0)
+        alive = True
+    except ProcessLookupError:
+        alive = False
+    assert not alive
+    assert set(glob.glob("/tmp/__panda_agi_exec_*.err")) == stderr_files
@@ -0,0 +1,126 @@
+import asyncio
+import subprocess
+from types import SimpleNamespace
+
+from panda_agi.envs import E2BEnv, LocalEnv, file_batch
+from panda_agi.tools.file_system_ops import file_ops
+
+
+def _operations():
+    return [
+        {"action": "write", "path": "src/app.py", "content": "DEBUG = True\n"},
+        {"action": "write", "path": "src/util.py", "content": "a\nb\nc\n"},
+        {"action": "replace", "path": "src/app.py", "old_str": "True", "new_str": "1"},
+        {"action": "read", "path": "src/app.py"},
+        {"action": "read", "path": "src/util.py", "start_line": 2, "end_line": 3},
+        {"action": "write", "path": "src/util.py", "content": "d\n", "append": True},
+        {"action": "replace", "path": "src/util.py", "old_str": "x", "new_str": "y"},
+        {"action": "delete", "path": "src/app.py"},
+        {"action": "write", "path": "README.md", "content": "# Demo\n"},
+        {"action": "read", "path": "missing.txt"},
+    ]
+
+
+def _check_results(result, root):
+    statuses = [item["status"] for item in result["results"]]
+    assert statuses == ["success"] * 6 + ["error"] * 2 + ["success", "error"]
+    assert [item["index"] for item in result["results"]] == list(range(10))
+    assert result["status"] == "error"
+    assert (result["succeeded"], result["failed"]) == (7, 3)
+
+    assert result["results"][2]["replacements"] == 1
+    assert result["results"][3]["content"] == "DEBUG = 1\n"
+    assert result["results"][4]["content"] == "b\nc\n"
+    assert "String not found" in result["results"][6]["message"]
+    assert "Unknown action: delete" in result["results"][7]["message"]
+    assert (root / "src" / "util.py").read_text() == "a\nb\nc\nd\n"
+    assert (root / "README.md").read_text() == "# Demo\n"
+
+
+def test_local_env_applies_operations_in_order(tmp_path):
+    env = LocalEnv(tmp_path)
+
+    result = asyncio.run(env.apply_file_operations(_operations()))
+
+    _check_results(result, tmp_path)
+
+
+class FakeFiles:
+    """Sandbox filesystem writing to a local directory"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def write_files(self, entries):
+        self.batches.append([entry["path"] for entry in entries])
+        infos = []
+        for entry in entries:
+            with open(entry["path"], "w") as f:
+                f.write(entry["data"])
+            infos.append(SimpleNamespace(path=entry["path"], name="file"))
+        return infos
+
+
+class FakeCommands:
+    """Sandbox commands running locally"""
+
+    def __init__(self):
+        self.count = 0
+
+    async def run(self, command, timeout=None):
+        self.count += 1
+        result = subprocess.run(command, shell=True, capture_output=True, text=True)
+        return SimpleNamespace(
+            stdout=result.stdout, stderr=result.stderr, exit_code=result.returncode
+        )
+
+
+def test_e2b_env_batches_round_trips(tmp_path):
+    (tmp_path / "src").mkdir()
+    sandbox = SimpleNamespace(files=FakeFiles(), commands=FakeCommands())
+    env = E2BEnv(tmp_path, sandbox=sandbox)
+
+    result = asyncio.run(env.apply_file_operations(_operations()))
+
+    _check_results(result, tmp_path)
+    # Two uploads of consecutive writes, and the reads, replaces and append
+    # in between run as one script, then the last read
+    assert sandbox.files.batches == [
+        [str(tmp_path / "src" / "app.py"), str(tmp_path / "src" / "util.py")],
+        [str(tmp_path / "README.md")],
+    ]
+    assert sandbox.commands.count == 2
+
+
+def test_batch_replacements_write_through_symlinks(tmp_path):
+    (tmp_path / "real.txt").write_bytes(b"a = 1\r\nb = 1\r\n")
+    (tmp_path / "link.txt").symlink_to("real.txt")
+
+    result = file_batch.apply_operations(
+        [
+            {
+                "action": "replace",
+                "path": str(tmp_path / "link.txt"),
+                "old": "1\nb",
+                "new": "2\nb",
+            }
+        ]
+    )
+
+    assert result["results"][0]["replacements"] == 1
+    assert (tmp_path / "link.txt").is_symlink()
+    assert (tmp_path / "real.txt").read_bytes() == b"a = 2\r\nb = 1\r\n"
+
+
+def test_invalid_operation_only_fails_its_own_result(tmp_path):
+    (tmp_path / "a.txt").write_text("a\nb\n")
+    operations = [
+        {"action": "read", "file": "a.txt", "start_line": "first"},
+        {"action": "read", "file": "a.txt", "start_line": "2"},
+    ]
+
+    result = asyncio.run(file_ops.file_batch(LocalEnv(tmp_path), operations))
+
+    assert [item["status"] for item in result["results"]] == ["error", "success"]
+    assert "start_line" in result["results"][0]["message"]
+    assert result["results"][1]["content"] == "b\n"
@@ -0,0 +1,63 @@
+import asyncio
+import random
+
+from panda_agi.envs import LocalEnv, line_index
+from panda_agi.envs.base_env import BaseEnv
+from panda_agi.envs.line_index import LineIndexCache
+
+
+def _write_lines(path, count, trailing_newline=True, seed=0):
+    rng = random.Random(seed)
+    lines = [f"{i}:" + "x" * rng.randint(0, 120) for i in range(count)]
+    text = "\n".join(lines) + ("\n" if trailing_newline else "")
+    path.write_text(text)
+    return text
+
+
+def test_ranges_match_splitlines_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(line_index, "BLOCK_SIZE", 1024)
+    cache = LineIndexCache()
+    rng = random.Random(1)
+    for trailing_newline in (True, False):
+        path = tmp_path / f"log-{trailing_newline}.txt"
+        lines = _write_lines(path, 2000, trailing_newline).splitlines(keepends=True)
+        for _ in range(200):
+            start = rng.randint(0, 2050)
+            end = rng.randint(start, 2100)
+            data, got_start, got_end = cache.read_lines(str(path), start, end)
+            assert data.decode() == "".join(lines[start:end])
+            assert (got_start, got_end) == (start, max(start, min(end, 2000)))
+        data, _, got_end = cache.read_lines(str(path), 1990, None)
+        assert data.decode() == "".join(lines[1990:]) and got_end == 2000
+
+
+def test_index_is_reused_until_the_file_changes(tmp_path):
+    cache = LineIndexCache()
+    path = tmp_path / "data.csv"
+    _write_lines(path, 100)
+
+    for start in range(0, 100, 10):
+        cache.read_lines(str(path), start, start + 10)
+    assert cache.builds == 1
+
+    path.write_text("a\nb\n")
+    assert cache.read_lines(str(path), 1, 5) == (b"b\n", 1, 2)
+    assert cache.builds == 2
+
+
+def test_local_env_reads_the_same_lines_as_a_full_read(tmp_path):
+    env = LocalEnv(tmp_path)
+    (tmp_path / "notes.txt").write_bytes(b"one\r\ntwo\r\nthree\r\nfour")
+
+    async def read(start_line, end_line):
+        ranged = await env.read_file_lines("notes.txt", start_line, end_line)
+        full = await BaseEnv.read_file_lines(env, "notes.txt", start_line, end_line)
+        return ranged, full
+
+    for start_line, end_line in ((2, 3), (None, 2), (3, None), (1, 100), (9, 10)):
+        ranged, full = asyncio.run(read(start_line, end_line))
+        assert ranged["content"] == full["content"]
+        assert ranged["line_range"] == full["line_range"]
+
+    missing = asyncio.run(env.read_file_lines("missing.txt", 1, 2))
+    assert missing["status"] == "error"
@@ -0,0 +1,58 @@
+import asyncio
+
+from panda_agi.envs import LocalEnv
+from panda_agi.envs.base_env import EXCLUDED_DIRS
+
+
+def _make_tree(root):
+    for relative in (
+        "README.md",
+        "src/a.py",
+        "src/pkg/b.py",
+        "src/pkg/deep/c.py",
+        "node_modules/lib/index.js",
+        "demo.egg-info/PKG-INFO",
+        ".hidden/secret",
+    ):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+
+
+def _list(root, **kwargs):
+    result = asyncio.run(LocalEnv(root).list_files(str(root), **kwargs))
+    assert result["status"] == "success"
+    return result, sorted(f["relative_path"] for f in result["files"])
+
+
+def test_max_depth_and_excluded_dirs_are_honored(tmp_path):
+    _make_tree(tmp_path)
+
+    _, paths = _list(tmp_path, recursive=True, max_depth=2, exclude_dirs=EXCLUDED_DIRS)
+    assert paths == [
+        "README.md",
+        "demo.egg-info",
+        "node_modules",
+        "src",
+        "src/a.py",
+        "src/pkg",
+    ]
+
+    _, paths = _list(tmp_path, recursive=False)
+    assert paths == ["README.md", "demo.egg-info", "node_modules", "src"]
+
+    _, paths = _list(tmp_path, recursive=True)
+    assert "node_modules/lib/index.js" in paths
+    assert "src/pkg/deep/c.py" in paths
+    assert not any(p.startswith(".hidden") for p in paths)
+
+
+def test_max_entries_keeps_shallow_entries(tmp_path):
+    _make_tree(tmp_path)
+
+    result, paths = _list(tmp_path, recursive=True, max_entries=4)
+    assert result["truncated"]
+    assert paths == ["README.md", "demo.egg-info", "node_modules", "src"]
+
+    file_info = next(f for f in result["files"] if f["name"] == "README.md")
+    assert file_info["type"] == "file" and file_info["size"] == 1
@@ -0,0 +1,141 @@
+import asyncio
+import base64
+import json
+import re
+import subprocess
+import sys
+
+from panda_agi.envs import LocalEnv, name_search
+from panda_agi.envs.name_search import glob_regex, is_ignored, parse_gitignore
+
+
+def _make_tree(root):
+    (root / ".gitignore").write_text("*.log\n/out/\nsrc/gen/\n!keep.log\n")
+    for path in (
+        "README.md",
+        "debug.log",
+        "keep.log",
+        "out/result.txt",
+        "lib/out/module.py",
+        "src/app.py",
+        "src/gen/parser.py",
+        "src/pkg/test_app.py",
+        "src/pkg/deep/test_util.py",
+        "node_modules/lib/index.js",
+        ".github/workflows/ci.yml",
+    ):
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(path)
+
+
+def _find(env, glob, path="."):
+    result = asyncio.run(env.find_files(glob, path=path))
+    assert result["status"] == "success", result
+    return [match["relative_path"] for match in result["matches"]]
+
+
+def test_globs_match_names_and_paths():
+    def matches(glob, path):
+        return re.fullmatch(glob_regex(glob), path) is not None
+
+    assert matches("*.py", "a/b/c.py") and not matches("*.py", "a/b/c.pyc")
+    assert matches("src/**/*.py", "src/a.py") and matches("src/**/*.py", "src/a/b.py")
+    assert not matches("src/*.py", "src/a/b.py")
+    assert matches("test_?.py,*.md", "x/test_1.py")
+    assert matches("test_?.py,*.md", "a.md")
+    assert matches("[!a]*.txt", "b.txt") and not matches("[!a]*.txt", "a.txt")
+
+    rules = parse_gitignore("build/\n/top.txt\ndocs/*.tmp\n", "sub/")
+    assert is_ignored(rules, "sub/x/build", True)
+    assert not is_ignored(rules, "sub/x/build", False)
+    assert is_ignored(rules, "sub/top.txt", False)
+    assert not is_ignored(rules, "sub/x/top.txt", False)
+    assert is_ignored(rules, "sub/docs/a.tmp", False)
+
+
+def test_gitignore_and_excluded_dirs_are_pruned(tmp_path):
+    _make_tree(tmp_path)
+    env = LocalEnv(tmp_path)
+
+    assert _find(env, "*.py") == [
+        "lib/out/module.py",
+        "src/app.py",
+        "src/pkg/deep/test_util.py",
+        "src/pkg/test_app.py",
+    ]
+    assert _find(env, "*.log") == ["keep.log"]
+    assert _find(env, "*.js") == []
+    assert _find(env, "node_modules") == ["node_modules"]
+    assert _find(env, "pkg/**/test_*.py", "src") == [
+        "pkg/deep/test_util.py",
+        "pkg/test_app.py",
+    ]
+    # Directories the index does not cover are walked
+    assert _find(env, "*.js", "node_modules") == ["lib/index.js"]
+
+
+def test_index_follows_changes_without_rescanning(tmp_path):
+    _make_tree(tmp_path)
+    env = LocalEnv(tmp_path)
+    _find(env, "*.py")
+
+    asyncio.run(env.write_file("src/new/nested/mod.py", "x = 1"))
+    asyncio.run(env.write_file("src/gen/ignored.py", "x = 1"))
+    asyncio.run(env.delete_file("src/pkg"))
+    assert _find(env, "*.py", "src") == ["app.py", "new/nested/mod.py"]
+
+    asyncio.run(env.write_file("src/.gitignore", "new/\n"))
+    assert _find(env, "*.py", "src") == ["app.py"]
+    assert env.name_index.scans == 1
+
+    result = asyncio.run(env.find_files("*", max_results=2))
+    assert result["match_count"] == 2 and result["truncated"]
+
+
+def test_script_mode(tmp_path):
+    _make_tree(tmp_path)
+    arguments = {
+        "root": str(tmp_path),
+        "glob": "*.py",
+        "path": str(tmp_path / "src"),
+        "exclude_dirs": ["node_modules"],
+    }
+    encoded = base64.b64encode(json.dumps(arguments).encode()).decode()
+    with open(name_search.__file__) as f:
+        script = f.read()
+    output = subprocess.run(
+        [sys.executable, "-c", script, encoded], capture_output=True, text=True
+    ).stdout
+
+    result = json.loads(output)
+    assert result["status"] == "success"
+    assert [match["relative_path"] for match in result["matches"]] == [
+        "app.py",
+        "pkg/deep/test_util.py",
+        "pkg/test_app.py",
+    ]
+
+
+def test_index_sees_changes_made_outside_the_env(tmp_path):
+    _make_tree(tmp_path)
+    env = LocalEnv(tmp_path)
+    assert _find(env, "*.py", "src") == [
+        "app.py",
+        "pkg/deep/test_util.py",
+        "pkg/test_app.py",
+    ]
+
+    (tmp_path / "src" / "b.py").write_text("")
+    (tmp_path / "src" / "pkg" / "deep" / "test_util.py").unlink()
+    (tmp_path / "src" / "new").mkdir()
+    (tmp_path / "src" / "new" / "c.py").write_text("")
+    assert _find(env, "*.py", "src") == [
+        "app.py",
+        "b.py",
+        "new/c.py",
+        "pkg/test_app.py",
+    ]
+
+    (tmp_path / "src" / ".gitignore").write_text("pkg/\n")
+    assert _find(env, "*.py", "src") == ["app.py", "b.py", "new/c.py"]
+    assert env.name_index.scans == 1
@@ -0,0 +1,28 @@
+from panda_agi.envs.output_log import OutputRingLog
+
+
+def test_reads_by_line_number_and_tail(tmp_path):
+    log = OutputRingLog(tmp_path / "s.log")
+    log.append(["a", "b"])
+    log.append(["c"])
+
+    assert log.read() == (["a", "b", "c"], 0)
+    assert log.read(since=1) == (["b", "c"], 1)
+    assert log.read(tail=1) == (["c"], 2)
+    assert log.read(since=3) == ([], 3)
+
+
+def test_oldest_lines_are_dropped_when_full(tmp_path):
+    log = OutputRingLog(tmp_path / "s.log", max_bytes=100)
+    for i in range(100):
+        log.append([f"line{i:03d}"])
+
+    lines, start = log.read()
+    assert log.total_lines == 100
+    assert start == log.first_line > 0
+    assert lines[-1] == "line099"
+    assert lines[0] == f"line{start:03d}"
+    assert sum(len(line) + 1 for line in lines) <= 100
+
+    log.delete()
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,88 @@
+import asyncio
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from panda_agi.envs import LocalEnv, stream_replace
+from panda_agi.envs.stream_replace import ReplaceError
+
+
+def test_matches_across_chunk_boundaries_like_str_replace(tmp_path):
+    rng = random.Random(0)
+    path = tmp_path / "data.txt"
+    pieces = ["a", "needle", "é€", "x", "\n"]
+    for old, new in (("needle", "N"), ("aa", "b"), ("é€", "€é€"), ("x", "")):
+        text = "".join(rng.choice(pieces) for _ in range(5000))
+        path.write_text(text, encoding="utf-8")
+
+        result = stream_replace.stream_replace(str(path), old, new, chunk_size=7)
+
+        expected = text.replace(old, new)
+        assert path.read_text(encoding="utf-8") == expected
+        assert result == {
+            "replacements": text.count(old),
+            "size": len(expected.encode("utf-8")),
+        }
+
+
+def test_guards_leave_the_file_unchanged(tmp_path):
+    path = tmp_path / "config.py"
+    path.write_text("DEBUG = True\nDEBUG = True\n")
+    os.chmod(path, 0o755)
+
+    with pytest.raises(ReplaceError, match="Expected 1 occurrences but found 2"):
+        stream_replace.stream_replace(str(path), "True", "False", expected_count=1)
+    with pytest.raises(ReplaceError, match="String not found"):
+        stream_replace.stream_replace(str(path), "missing", "x")
+    assert path.read_text() == "DEBUG = True\nDEBUG = True\n"
+
+    stream_replace.stream_replace(str(path), "True", "False", expected_count=2)
+    assert path.read_text() == "DEBUG = False\nDEBUG = False\n"
+    assert os.stat(path).st_mode & 0o777 == 0o755
+    assert os.listdir(tmp_path) == ["config.py"]
+
+
+def test_crlf_files_keep_their_line_endings(tmp_path):
+    path = tmp_path / "win.txt"
+    path.write_bytes(b"one\r\ntwo\r\nthree\r\n")
+
+    stream_replace.stream_replace(str(path), "one\ntwo", "1\n2")
+
+    assert path.read_bytes() == b"1\r\n2\r\nthree\r\n"
+
+
+def test_symlinks_are_written_through(tmp_path):
+    (tmp_path / "real.txt").write_text("hello world")
+    (tmp_path / "link.txt").symlink_to("real.txt")
+
+    stream_replace.stream_replace(str(tmp_path / "link.txt"), "world", "there")
+
+    assert (tmp_path / "link.txt").is_symlink()
+    assert (tmp_path / "real.txt").read_text() == "hello there"
+
+
+def test_local_env_and_script_mode(tmp_path):
+    env = LocalEnv(tmp_path)
+    (tmp_path / "a.txt").write_text("hello world")
+
+    result = asyncio.run(env.replace_in_file("a.txt", "world", "there"))
+    assert result["status"] == "success" and result["replacements"] == 1
+    assert (tmp_path / "a.txt").read_text() == "hello there"
+    missing = asyncio.run(env.replace_in_file("a.txt", "world", "x"))
+    assert missing["status"] == "error"
+
+    # Remote environments run the module as a script
+    arguments = {"path": str(tmp_path / "a.txt"), "old": "hello", "new": "hi"}
+    encoded = base64.b64encode(json.dumps(arguments).encode()).decode()
+    with open(stream_replace.__file__) as f:
+        script = f.read()
+    output = subprocess.run(
+        [sys.executable, "-c", script, encoded], capture_output=True, text=True
+    ).stdout
+    assert json.loads(output) == {"status": "success", "replacements": 1, "size": 8}
+    assert (tmp_path / "a.txt").read_text() == "hi there"
@@ -0,0 +1,70 @@
+from panda_agi.envs.tmux_executor import TmuxExecutor
+
+
+def _structured(executor, **kwargs):
+    executor.register_session("s1")
+    return executor.generate_command("s1", "ls", command_id="abc", **kwargs)
+
+
+def test_echoed_command_line_is_not_taken_as_completion():
+    executor = TmuxExecutor()
+    command = _structured(executor)
+    echoed = command.structured_command.replace("'", "")
+
+    result = executor.parse_command_output("s1", "abc", echoed)
+    assert not result.completed
+    assert result.output == ""
+
+    pane = "\n".join(
+        [echoed, command.prefix_marker, "a.txt", command.suffix_marker]
+        + ["FINAL_EXIT_CODE:0", "$ "]
+    )
+    result = executor.parse_command_output("s1", "abc", pane)
+    assert result.completed
+    assert result.output == "a.txt"
+    assert result.exit_code == "0"
+
+
+def test_completion_channel_is_signalled_after_exit_code():
+    executor = TmuxExecutor()
+
+    assert _structured(executor).completion_channel is None
+
+    command = _structured(executor, signal_completion=True)
+    assert command.completion_channel == "s1_done_abc"
+    assert command.structured_command.endswith(
+        '"FINAL_EXIT_CODE:$exit_code" ; tmux wait-for -S s1_done_abc'
+    )
+    assert executor.generate_wait_for_command(command.completion_channel) == (
+        "tmux wait-for s1_done_abc"
+    )
+
+
+def test_incremental_capture_returns_only_new_lines():
+    executor = TmuxExecutor()
+    command = _structured(executor)
+    prompt = "$ " + command.structured_command.replace("'", "")
+
+    # 2 lines scrolled into history, cursor on the 3rd screen row
+    first = executor.parse_incremental_capture(
+        "s1",
+        "\n".join(
+            ["2 2 2000", prompt, command.prefix_marker, "one", "two", "thr", ""]
+        ),
+    )
+    assert first.lines == ["one", "two"]
+    assert first.partial_line == "thr"
+    assert not first.completed
+
+    # History was cleared, the 2 screen rows above the cursor were already read
+    second = executor.parse_incremental_capture(
+        "s1",
+        "\n".join(
+            ["0 5 2000", "one", "two", "three", command.suffix_marker]
+            + ["FINAL_EXIT_CODE:0", "$ "]
+        ),
+    )
+    assert second.lines == ["three"]
+    assert second.partial_line == ""
+    assert second.completed
+    assert second.exit_code == "0"
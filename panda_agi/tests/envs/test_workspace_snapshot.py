@@ -0,0 +1,59 @@
+import asyncio
+import os
+
+from panda_agi.envs import LocalEnv
+from panda_agi.envs.workspace_snapshot import diff_snapshots
+
+
+def _paths(result):
+    return sorted(f["relative_path"] for f in result["files"])
+
+
+def test_snapshot_is_cached_until_the_tree_changes(tmp_path):
+    (tmp_path / "a.txt").write_text("a")
+    env = LocalEnv(tmp_path)
+
+    async def run():
+        first = await env.get_workspace_snapshot("/")
+        second = await env.get_workspace_snapshot("/")
+        assert env.snapshot_cache.hits == 1
+
+        # File tools invalidate the listings containing the path
+        await env.write_file("b.txt", "b")
+        third = await env.get_workspace_snapshot("/")
+
+        # Changes made behind the environment's back show in directory mtimes
+        (tmp_path / "c.txt").write_text("c")
+        os.utime(tmp_path, ns=(0, 0))
+        fourth = await env.get_workspace_snapshot("/")
+
+        # And in-place edits in file mtimes
+        (tmp_path / "a.txt").write_text("longer")
+        os.utime(tmp_path / "a.txt", ns=(0, 0))
+        fifth = await env.get_workspace_snapshot("/")
+        return first, second, third, fourth, fifth
+
+    first, second, third, fourth, fifth = asyncio.run(run())
+
+    assert _paths(first) == _paths(second) == ["a.txt"]
+    assert _paths(third) == ["a.txt", "b.txt"]
+    assert _paths(fourth) == ["a.txt", "b.txt", "c.txt"]
+    assert {f["relative_path"]: f["size"] for f in fifth["files"]}["a.txt"] == 6
+    assert env.snapshot_cache.misses == 4
+
+
+def test_diff_against_previous_snapshot():
+    def info(path, size):
+        return {"relative_path": path, "type": "file", "size": size, "modified": "t"}
+
+    previous = {"path": "/w", "files": [info("a", 1), info("b", 1)]}
+    current = {"path": "/w", "files": [info("a", 2), info("c", 1)]}
+
+    diff = diff_snapshots(previous, current)
+
+    assert "files" not in diff
+    assert diff["path"] == "/w" and diff["diff_from_previous"]
+    assert [f["relative_path"] for f in diff["added"]] == ["c"]
+    assert [f["relative_path"] for f in diff["modified"]] == ["a"]
+    assert diff["removed"] == ["b"]
+    assert diff_snapshots(current, current)["unchanged"]
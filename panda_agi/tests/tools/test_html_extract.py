@@ -0,0 +1,74 @@
+from panda_agi.tools.web_ops.html_extract import html_to_markdown, truncate_markdown
+
+ARTICLE_TEXT = "The panda eats bamboo for most of the day. " * 10
+
+PAGE = f"""
+<html>
+  <head><title>Pandas</title><style>body {{ color: red }}</style></head>
+  <body>
+    <header class="site-header"><a href="/">Home</a><a href="/zoo">Zoo</a></header>
+    <nav><ul><li><a href="/a">Link A</a></li><li><a href="/b">Link B</a></li></ul></nav>
+    <div class="layout">
+      <div class="sidebar"><a href="/x">Sidebar link</a></div>
+      <div class="story">
+        <h2>Diet</h2>
+        <p>{ARTICLE_TEXT}</p>
+        <script>trackVisit();</script>
+      </div>
+    </div>
+    <footer>Copyright</footer>
+  </body>
+</html>
+"""
+
+
+def test_main_content_is_extracted_without_boilerplate():
+    markdown = html_to_markdown(PAGE)
+
+    assert markdown.startswith("# Pandas")
+    assert "## Diet" in markdown
+    assert "The panda eats bamboo" in markdown
+    for boilerplate in ("Home", "Link A", "Sidebar link", "Copyright", "trackVisit"):
+        assert boilerplate not in markdown
+    assert "color: red" not in markdown
+
+
+def test_article_header_is_kept():
+    html = (
+        "<body><nav>Menu</nav><article><header><h1>Title</h1></header>"
+        f"<p>{ARTICLE_TEXT}</p></article></body>"
+    )
+    markdown = html_to_markdown(html)
+
+    assert markdown.startswith("# Title")
+    assert "Menu" not in markdown
+
+
+def test_form_wrapped_page_keeps_its_content():
+    # ASP.NET WebForms pages wrap the whole body in a form
+    html = (
+        "<html><head><title>T</title></head><body><form id='form1'>"
+        "<input type='hidden' name='__VIEWSTATE' value='abc'>"
+        f"<div class='story'><h2>Diet</h2><p>{ARTICLE_TEXT}</p></div>"
+        "<button>Submit</button></form></body></html>"
+    )
+    markdown = html_to_markdown(html)
+
+    assert "## Diet" in markdown
+    assert "The panda eats bamboo" in markdown
+    assert "Submit" not in markdown
+
+
+def test_truncation_cuts_at_a_block_boundary():
+    sections = [f"## Section {i}\n\n" + "word " * 40 for i in range(50)]
+    markdown = "\n\n".join(sections)
+
+    truncated = truncate_markdown(markdown, 2000)
+
+    content, _, note = truncated.partition("\n\n[... content truncated, ")
+    assert len(content) <= 2000
+    assert not content.endswith("##")
+    assert content.rstrip().endswith("word")
+    assert markdown.startswith(content)
+    assert int(note.split()[0]) > len(markdown) - 2000
+    assert truncate_markdown("short", 2000) == "short"
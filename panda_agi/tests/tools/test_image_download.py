@@ -0,0 +1,68 @@
+import asyncio
+import os
+import time
+
+from panda_agi.envs import LocalEnv
+from panda_agi.tests.fixtures.http_server import FixtureServer
+from panda_agi.tools.image import download_to_environment
+
+DELAY = 0.3
+IMAGE = os.urandom(300 * 1024)
+
+
+def _image(request):
+    time.sleep(DELAY)
+    return 200, {"Content-Type": "image/png"}, IMAGE
+
+
+def test_images_are_streamed_to_the_environment_concurrently(tmp_path):
+    env = LocalEnv(tmp_path)
+
+    async def download_all(server):
+        return await asyncio.gather(
+            *(
+                download_to_environment(env, f"{server.url}/{i}.png", f"images/{i}.png")
+                for i in range(3)
+            )
+        )
+
+    routes = {f"/{i}.png": _image for i in range(3)}
+    with FixtureServer(routes) as server:
+        start = time.perf_counter()
+        results = asyncio.run(download_all(server))
+        elapsed = time.perf_counter() - start
+
+    assert [success for success, _, _ in results] == [True, True, True]
+    for i in range(3):
+        assert (tmp_path / "images" / f"{i}.png").read_bytes() == IMAGE
+    assert elapsed < DELAY * 2.5
+    # Only the images, no temporary files left behind
+    assert len(os.listdir(tmp_path / "images")) == 3
+
+
+def test_failed_downloads_leave_no_file(tmp_path):
+    env = LocalEnv(tmp_path)
+
+    with FixtureServer({}) as server:
+        success, path, error = asyncio.run(
+            download_to_environment(env, f"{server.url}/missing.png", "missing.png")
+        )
+
+    assert not success and path is None
+    assert error.startswith("HTTP 404")
+    assert not (tmp_path / "missing.png").exists()
+
+
+def test_interrupted_stream_keeps_the_previous_file(tmp_path):
+    env = LocalEnv(tmp_path)
+    (tmp_path / "image.png").write_bytes(b"previous")
+
+    async def broken_chunks():
+        yield b"partial"
+        raise ConnectionError("connection lost")
+
+    result = asyncio.run(env.write_file_stream("image.png", broken_chunks()))
+
+    assert result["status"] == "error"
+    assert (tmp_path / "image.png").read_bytes() == b"previous"
+    assert os.listdir(tmp_path) == ["image.png"]
@@ -0,0 +1,55 @@
+import time
+
+from panda_agi.tools.base import ToolResult
+from panda_agi.tools.result_cache import ToolResultCache
+
+
+def _result(text):
+    return ToolResult(success=True, data={"content": text})
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = ToolResultCache(max_entries=2)
+    keys = [ToolResultCache.make_key("web_search", {"query": q}) for q in "abc"]
+
+    cache.put(keys[0], _result("a"), ttl=60)
+    cache.put(keys[1], _result("b"), ttl=60)
+    assert cache.get(keys[0]).data == {"content": "a"}
+    cache.put(keys[2], _result("c"), ttl=60)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.evictions == 1
+
+
+def test_size_bound_expiry_and_failed_results():
+    cache = ToolResultCache(max_bytes=100)
+    key = ToolResultCache.make_key("file_read", {"file": "/w/a.txt"}, scope="env")
+
+    cache.put(key, _result("x" * 200), ttl=60)
+    cache.put(key, ToolResult(success=False, error="missing"), ttl=60)
+    assert len(cache) == 0
+
+    cache.put(key, _result("small"), ttl=0.01, path="/w/a.txt")
+    assert cache.contains(key)
+    time.sleep(0.02)
+    assert cache.get(key) is None
+
+
+def test_writes_invalidate_overlapping_paths_of_their_scope():
+    cache = ToolResultCache()
+    read = ToolResultCache.make_key("file_read", {"file": "/w/src/a.py"}, "env")
+    other_env = ToolResultCache.make_key("file_read", {"file": "/w/src/a.py"}, "env2")
+    web = ToolResultCache.make_key("web_search", {"query": "q"})
+    cache.put(read, _result("a"), ttl=60, path="/w/src/a.py")
+    cache.put(other_env, _result("a"), ttl=60, path="/w/src/a.py")
+    cache.put(web, _result("q"), ttl=60)
+
+    cache.invalidate("env", "/w/src/b.py")
+    assert cache.contains(read)
+    cache.invalidate("env", "/w/src")
+    assert not cache.contains(read)
+    assert cache.contains(other_env)
+    cache.invalidate("env2")
+    assert not cache.contains(other_env)
+    assert cache.contains(web)
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+from panda_agi.tests.fixtures.http_server import FixtureServer
+from panda_agi.tools.web_ops import beautifulsoup
+from panda_agi.tools.web_ops.http_cache import HttpDiskCache, freshness_lifetime
+
+PAGE = "<html><body><h1>Docs</h1><p>Hello</p></body></html>"
+
+
+def _revalidated(request):
+    if request.headers.get("if-none-match") == '"v1"':
+        return 304, {"ETag": '"v1"', "Cache-Control": "no-cache"}, b""
+    return 200, {"ETag": '"v1"', "Cache-Control": "no-cache"}, PAGE
+
+
+def _visit(url):
+    return asyncio.run(beautifulsoup.beautiful_soup_navigation(url))
+
+
+def test_pages_are_cached_and_revalidated(tmp_path, monkeypatch):
+    conversions = []
+    convert = beautifulsoup.html_to_markdown
+    monkeypatch.setattr(
+        beautifulsoup,
+        "html_to_markdown",
+        lambda html: conversions.append(html) or convert(html),
+    )
+    cache = HttpDiskCache(tmp_path)
+    beautifulsoup.set_http_cache(cache)
+    routes = {
+        "/fresh": lambda request: (200, {"Cache-Control": "max-age=60"}, PAGE),
+        "/revalidated": _revalidated,
+        "/no-store": lambda request: (200, {"Cache-Control": "no-store"}, PAGE),
+    }
+    try:
+        with FixtureServer(routes) as server:
+            results = [
+                _visit(server.url + path)
+                for path in ("/fresh", "/fresh", "/revalidated", "/revalidated")
+                + ("/no-store", "/no-store")
+            ]
+    finally:
+        beautifulsoup.set_http_cache(None)
+
+    assert all(r["success"] and "Docs" in r["content"] for r in results)
+    # Fresh: one request. Revalidated: a 304 for the second visit
+    assert len(server.requests_to("/fresh")) == 1
+    revalidations = server.requests_to("/revalidated")
+    assert [r.headers.get("if-none-match") for r in revalidations] == [None, '"v1"']
+    assert len(server.requests_to("/no-store")) == 2
+    # Every response has the same body, it is converted once
+    assert len(conversions) == 1
+    assert (cache.hits, cache.revalidations, cache.misses) == (1, 1, 4)
+
+
+def test_freshness_lifetime():
+    now = 1_700_000_000.0
+    assert freshness_lifetime({"cache-control": "public, max-age=300"}, now) == 300
+    assert freshness_lifetime({"cache-control": "no-store"}, now) is None
+    assert freshness_lifetime({"expires": "0"}, now) == 0
+    assert freshness_lifetime({}, now) == 0
+    last_modified = {
+        "date": "Tue, 11 Jan 2022 10:00:00 GMT",
+        "last-modified": "Tue, 11 Jan 2022 00:00:00 GMT",
+    }
+    assert freshness_lifetime(last_modified, now) == 0
+
+
+def test_pages_without_explicit_freshness_are_revalidated(tmp_path):
+    # Like python -m http.server: Last-Modified only, honors If-Modified-Since
+    page = {"body": "<html><body><p>VERSION ONE</p></body></html>"}
+    page["last_modified"] = formatdate(time.time() - 2 * 3600, usegmt=True)
+
+    def serve(request):
+        headers = {"Last-Modified": page["last_modified"]}
+        if request.headers.get("if-modified-since") == page["last_modified"]:
+            return 304, headers, b""
+        return 200, headers, page["body"]
+
+    beautifulsoup.set_http_cache(HttpDiskCache(tmp_path))
+    try:
+        with FixtureServer({"/index.html": serve}) as server:
+            first = _visit(server.url + "/index.html")
+            page["body"] = "<html><body><p>VERSION TWO</p></body></html>"
+            page["last_modified"] = formatdate(time.time(), usegmt=True)
+            second = _visit(server.url + "/index.html")
+    finally:
+        beautifulsoup.set_http_cache(None)
+
+    assert "VERSION ONE" in first["content"]
+    assert "VERSION TWO" in second["content"]
+    assert len(server.requests_to("/index.html")) == 2
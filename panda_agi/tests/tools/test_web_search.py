@@ -0,0 +1,83 @@
+import asyncio
+import json
+import time
+
+from panda_agi.tests.fixtures.http_server import FixtureServer
+from panda_agi.tools.web import WebSearchHandler
+from panda_agi.tools.web_ops.tavily import (
+    search_coalescer,
+    tavily_search_many,
+    tavily_search_web_async,
+)
+
+DELAY = 0.3
+
+
+def _search(request):
+    time.sleep(DELAY)
+    query = json.loads(request.body)["query"]
+    results = [
+        {"url": f"https://example.com/{query}/{i}", "title": query, "content": "..."}
+        for i in range(2)
+    ]
+    return 200, {"Content-Type": "application/json"}, json.dumps({"results": results})
+
+
+def _unauthorized(request):
+    body = json.dumps({"detail": {"error": "Invalid API key"}})
+    return 401, {"Content-Type": "application/json"}, body
+
+
+def test_identical_in_flight_searches_share_one_request():
+    with FixtureServer({"/search": _search}) as server:
+
+        async def search_three_times():
+            return await asyncio.gather(
+                *(tavily_search_web_async(q, 2, server.url) for q in ("a", "a ", "A"))
+            )
+
+        results = asyncio.run(search_three_times())
+
+    assert len(server.requests_to("/search")) == 1
+    assert results[0] == results[1] == results[2]
+    assert results[0]["results"][0] == {"url": "https://example.com/a/0", "title": "a"}
+    # The callers got separate copies
+    results[0]["results"].clear()
+    assert results[1]["results"]
+    assert len(search_coalescer) == 0
+
+
+def test_different_queries_run_concurrently():
+    with FixtureServer({"/search": _search}) as server:
+        start = time.perf_counter()
+        results = asyncio.run(tavily_search_many(["x", "y", "z"], 2, server.url))
+        elapsed = time.perf_counter() - start
+
+    assert [r["results"][0]["title"] for r in results] == ["x", "y", "z"]
+    assert len(server.requests_to("/search")) == 3
+    assert elapsed < DELAY * 2.5
+
+
+def test_api_errors_are_returned_as_error():
+    with FixtureServer({"/search": _unauthorized}) as server:
+        result = asyncio.run(tavily_search_web_async("q", 2, server.url))
+
+    assert result == {"error": "Tavily API returned 401: Invalid API key"}
+
+
+def test_multi_line_queries_are_split_only_when_asked(monkeypatch):
+    handler = WebSearchHandler()
+    query = "first query\nsecond query"
+
+    with FixtureServer({"/search": _search}) as server:
+        monkeypatch.setenv("TAVILY_API_URL", server.url)
+        whole = asyncio.run(handler.execute({"query": query, "max_results": 2}))
+        split = asyncio.run(
+            handler.execute({"query": query, "max_results": 2, "split_lines": "true"})
+        )
+        queries = [json.loads(r.body)["query"] for r in server.requests_to("/search")]
+
+    assert queries[0] == "first query second query"
+    assert sorted(queries[1:]) == ["first query", "second query"]
+    assert len(whole.data["results"]) == 2
+    assert len(split.data["results"]) == 4
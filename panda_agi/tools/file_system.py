@@ -1,12 +1,15 @@
+import json
 from typing import Any, Dict, Optional
 
-from ..client.models import EventType
+from ..client.models import EventType, ToolInfo, ToolParameterInfo
 from .base import ToolHandler, ToolResult
 from .file_system_ops.file_ops import (
+    file_batch,
     file_explore_directory,
     file_find_by_name,
     file_find_in_content,
     file_read,
+    file_search_in_content,
     file_str_replace,
     file_write,
 )
@@ -23,6 +26,9 @@ from .registry import ToolRegistry
         "start_line": "start_line",
         "end_line": "end_line",
     },
+    read_only=True,
+    path_param="file",
+    cache_ttl=60,
 )
 class FileReadHandler(ToolHandler):
     """Handler for file read operations"""
@@ -51,6 +57,7 @@ class FileReadHandler(ToolHandler):
     optional_params=["append"],
     content_param="content",
     attribute_mappings={"file": "file", "append": "append"},
+    path_param="file",
 )
 class FileWriteHandler(ToolHandler):
     """Handler for file write operations"""
@@ -78,11 +85,14 @@ class FileWriteHandler(ToolHandler):
     "file_replace",
     xml_tag="file_replace",
     required_params=["file", "find_str", "replace_str"],
+    optional_params=["expected_count"],
     attribute_mappings={
         "file": "file",
         "find_str": "find_str",
         "replace_str": "replace_str",
+        "expected_count": "expected_count",
     },
+    path_param="file",
 )
 class FileReplaceHandler(ToolHandler):
     """Handler for file string replacement operations"""
@@ -102,6 +112,8 @@ class FileReplaceHandler(ToolHandler):
             "old_str": params["find_str"],
             "new_str": params["replace_str"],
         }
+        if params.get("expected_count") is not None:
+            mapped_params["expected_count"] = int(params["expected_count"])
         result = await file_str_replace(self.environment, **mapped_params)
         await self.add_event(EventType.FILE_REPLACE, params)
 
@@ -112,6 +124,79 @@ class FileReplaceHandler(ToolHandler):
         )
 
 
+@ToolRegistry.register(
+    "file_batch",
+    xml_tag="file_batch",
+    required_params=["operations"],
+    content_param="operations",
+    attribute_mappings={"operations": "operations"},
+    tool_info=ToolInfo(
+        name="file_batch",
+        description=(
+            "Apply many file reads, writes and replacements in one call, e.g. to "
+            "read several files at once. Operations run in order and "
+            "independently: a failed operation does not stop the next ones."
+        ),
+        parameters=[
+            ToolParameterInfo(
+                name="operations",
+                type="str",
+                description=(
+                    "JSON array of operations, given as the tag content. Each is "
+                    'an object with an "action" and a "file": "read" takes '
+                    'optional "start_line"/"end_line" (1-based, inclusive), '
+                    '"write" takes "content" and optional "append", "replace" '
+                    'takes "find_str", "replace_str" and optional '
+                    '"expected_count"'
+                ),
+            ),
+        ],
+        returns="One result per operation, with its status",
+        examples=[
+            '<file_batch>[{"action": "read", "file": "a.py"}, {"action": '
+            '"replace", "file": "b.py", "find_str": "x = 1", "replace_str": '
+            '"x = 2"}]</file_batch>'
+        ],
+    ),
+)
+class FileBatchHandler(ToolHandler):
+    """Handler for applying many file operations in one call"""
+
+    # Events emitted for the successful operations that change files
+    OPERATION_EVENTS = {
+        "write": EventType.FILE_WRITE,
+        "replace": EventType.FILE_REPLACE,
+    }
+
+    def validate_input(self, params: Dict[str, Any]) -> Optional[str]:
+        if "operations" not in params:
+            return "Missing required parameter: operations"
+        return None
+
+    async def execute(self, params: Dict[str, Any]) -> ToolResult:
+        operations = params["operations"]
+        if isinstance(operations, str):
+            try:
+                operations = json.loads(operations)
+            except ValueError as e:
+                return ToolResult(
+                    success=False, error=f"operations is not a valid JSON array: {e}"
+                )
+        result = await file_batch(self.environment, operations)
+
+        for operation, item in zip(operations, result.get("results", [])):
+            event_type = self.OPERATION_EVENTS.get(operation.get("action"))
+            if event_type and item.get("status") == "success":
+                event_params = {k: v for k, v in operation.items() if k != "action"}
+                await self.add_event(event_type, event_params)
+
+        return ToolResult(
+            success=result.get("status") == "success",
+            data=result,
+            error=result.get("message") if result.get("status") != "success" else None,
+        )
+
+
 @ToolRegistry.register(
     "file_find_in_content",
     xml_tag="file_find_in_content",
@@ -120,6 +205,9 @@ class FileReplaceHandler(ToolHandler):
         "file": "file",
         "regex": "regex",
     },
+    read_only=True,
+    path_param="file",
+    cache_ttl=60,
 )
 class FileFindInContentHandler(ToolHandler):
     """Handler for finding content in files"""
@@ -141,6 +229,112 @@ class FileFindInContentHandler(ToolHandler):
         )
 
 
+@ToolRegistry.register(
+    "file_search_in_content",
+    xml_tag="file_search_in_content",
+    required_params=["regex"],
+    optional_params=["path", "glob", "ignore_case", "context_lines", "max_results"],
+    attribute_mappings={
+        "regex": "regex",
+        "path": "path",
+        "glob": "glob",
+        "ignore_case": "ignore_case",
+        "context_lines": "context_lines",
+        "max_results": "max_results",
+    },
+    read_only=True,
+    path_param="path",
+    cache_ttl=30,
+    tool_info=ToolInfo(
+        name="file_search_in_content",
+        description=(
+            "Search for a regular expression in the content of every file below "
+            "a directory (hidden files and paths ignored by .gitignore are "
+            "skipped). Faster than shell grep, use it to find where something "
+            "is defined or used."
+        ),
+        parameters=[
+            ToolParameterInfo(
+                name="regex", type="str", description="Regular expression to find"
+            ),
+            ToolParameterInfo(
+                name="path",
+                type="str",
+                description="Directory to search",
+                required=False,
+                default=".",
+            ),
+            ToolParameterInfo(
+                name="glob",
+                type="str",
+                description="Comma-separated globs of the files to search, "
+                "e.g. *.py,*.ts",
+                required=False,
+            ),
+            ToolParameterInfo(
+                name="ignore_case",
+                type="bool",
+                description="Whether the search is case-insensitive",
+                required=False,
+                default=False,
+            ),
+            ToolParameterInfo(
+                name="context_lines",
+                type="int",
+                description="Lines of context before and after each match",
+                required=False,
+                default=0,
+            ),
+            ToolParameterInfo(
+                name="max_results",
+                type="int",
+                description="Maximum number of matching lines",
+                required=False,
+                default=100,
+            ),
+        ],
+        returns="Matching lines with their file and line number",
+        examples=[
+            '<file_search_in_content regex="def main" glob="*.py">'
+            "</file_search_in_content>"
+        ],
+    ),
+)
+class FileSearchInContentHandler(ToolHandler):
+    """Handler for searching content across the files of a directory"""
+
+    def validate_input(self, params: Dict[str, Any]) -> Optional[str]:
+        if "regex" not in params:
+            return "Missing required parameter: regex"
+        return None
+
+    async def execute(self, params: Dict[str, Any]) -> ToolResult:
+        await self.add_event(EventType.FILE_FIND, params)
+        try:
+            context_lines = int(params.get("context_lines") or 0)
+            max_results = int(params.get("max_results") or 100)
+        except (ValueError, TypeError):
+            return ToolResult(
+                success=False, error="context_lines and max_results must be numbers"
+            )
+        ignore_case = str(params.get("ignore_case", "")).lower() in ("true", "1", "yes")
+
+        result = await file_search_in_content(
+            self.environment,
+            params["regex"],
+            path=params.get("path") or ".",
+            glob=params.get("glob"),
+            ignore_case=ignore_case,
+            context_lines=context_lines,
+            max_results=max_results,
+        )
+        return ToolResult(
+            success=result.get("status") == "success",
+            data=result,
+            error=result.get("message") if result.get("status") != "success" else None,
+        )
+
+
 @ToolRegistry.register(
     "file_search_by_name",
     xml_tag="file_search_by_name",
@@ -149,6 +343,9 @@ class FileFindInContentHandler(ToolHandler):
         "path": "path",
         "glob_pattern": "glob_pattern",
     },
+    read_only=True,
+    path_param="path",
+    cache_ttl=30,
 )
 class FileSearchByNameHandler(ToolHandler):
     """Handler for searching files by name"""
@@ -176,6 +373,9 @@ class FileSearchByNameHandler(ToolHandler):
     required_params=["path"],
     optional_params=["max_depth"],
     attribute_mappings={"path": "path", "max_depth": "max_depth"},
+    read_only=True,
+    path_param="path",
+    cache_ttl=30,
 )
 class ExploreDirectoryHandler(ToolHandler):
     """Handler for exploring directory structure"""
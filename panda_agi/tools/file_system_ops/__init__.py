@@ -3,10 +3,12 @@ File system operations package.
 """
 
 from .file_ops import (
+    file_batch,
     file_explore_directory,
     file_find_by_name,
     file_find_in_content,
     file_read,
+    file_search_in_content,
     file_str_replace,
     file_write,
 )
@@ -17,10 +19,12 @@ from .shell_ops import (
 )
 
 __all__ = [
+    "file_batch",
     "file_explore_directory",
     "file_find_by_name",
     "file_find_in_content",
     "file_read",
+    "file_search_in_content",
     "file_str_replace",
     "file_write",
     "shell_exec_command",
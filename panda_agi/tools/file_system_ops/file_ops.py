@@ -1,7 +1,6 @@
-import fnmatch
 import logging
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 # Import the BaseEnv base class
 from panda_agi.envs import BaseEnv
@@ -22,40 +21,19 @@ async def file_read(
     Args:
         environment: BaseEnv instance to use for operations
         file: Relative or absolute path of the file to read
-        start_line: Optional starting line to read from (0-based)
-        end_line: Optional ending line number (exclusive)
+        start_line: Optional starting line to read from (1-based)
+        end_line: Optional ending line number (inclusive)
         sudo: Whether to use sudo privileges (not implemented)
 
     Returns:
         Dict containing the file content and metadata
     """
-    # For line-specific reads, we need to handle it manually
     if start_line is not None or end_line is not None:
         try:
-            # First read the entire file
-            result = await environment.read_file(file)
-            if result["status"] != "success":
-                return result
-
-            # Split into lines and get the requested range
-            lines = result["content"].splitlines(keepends=True)
-            start = start_line if start_line is not None else 1
-            end = end_line if end_line is not None else len(lines)
-
-            # Convert from 1-based to 0-based indexing for start
-            # end is used as-is since Python slicing is exclusive
-            start_idx = max(0, start - 1)
-            end_idx = min(len(lines), end)
-
-            content = "".join(lines[start_idx:end_idx])
-
-            # Update the result with the filtered content
-            result["content"] = content
-            result["line_range"] = {
-                "start": start_idx,
-                "end": end_idx,
-            }
-            return result
+            # Only the requested lines are read, see BaseEnv.read_file_lines
+            return await environment.read_file_lines(
+                file, start_line=start_line, end_line=end_line
+            )
         except Exception as e:
             return {"status": "error", "message": str(e)}
     else:
@@ -108,6 +86,7 @@ async def file_str_replace(
     file: str,
     old_str: str,
     new_str: str,
+    expected_count: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     Replace specified string in a file using the provided environment.
@@ -117,45 +96,78 @@ async def file_str_replace(
         file: Relative or absolute path of the file to perform replacement on
         old_str: Original string to be replaced
         new_str: New string to replace with
+        expected_count: If set, the file is only changed if it contains exactly
+            this many occurrences
         sudo: Whether to use sudo privileges (not implemented)
 
     Returns:
         Dict containing the operation status
     """
     try:
-        # Read the file content
-        result = await environment.read_file(file)
-        if result["status"] != "success":
-            return result
+        # The environment streams the file and replaces it atomically
+        return await environment.replace_in_file(
+            file, old_str, new_str, expected_count=expected_count
+        )
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
 
-        content = result["content"]
 
-        # Check if the string exists
-        if old_str not in content:
-            return {
-                "status": "error",
-                "message": f"String not found in file: {old_str}",
-                "file": result["path"],
-            }
+# Tool parameter names of batch operations and their BaseEnv names
+BATCH_PARAM_NAMES = {
+    "file": "path",
+    "find_str": "old_str",
+    "replace_str": "new_str",
+}
 
-        # Perform the replacement
-        new_content = content.replace(old_str, new_str)
-        count = content.count(old_str)
 
-        # Write the updated content
-        write_result = await environment.write_file(file, new_content)
+def _as_int(value: Any) -> Any:
+    """Convert a number given as a string, invalid values are left as is"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
 
-        # Add replacement information to the result
-        if write_result["status"] == "success":
-            write_result["replacements"] = count
-            # write_result["old_str"] = (
-            #     old_str[:50] + "..." if len(old_str) > 50 else old_str
-            # )
-            # write_result["new_str"] = (
-            #     new_str[:50] + "..." if len(new_str) > 50 else new_str
-            # )
 
-        return write_result
+async def file_batch(
+    environment: BaseEnv, operations: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Apply many file reads, writes and replacements in one call.
+
+    Args:
+        environment: BaseEnv instance to use for operations
+        operations: Operations, each with an action ("read", "write" or
+            "replace"), a file and the parameters of the matching tool
+            (start_line/end_line, content/append or
+            find_str/replace_str/expected_count)
+
+    Returns:
+        Dict containing one result per operation, an invalid operation only
+        fails its own result
+    """
+    try:
+        if not isinstance(operations, list) or not all(
+            isinstance(operation, dict) for operation in operations
+        ):
+            return {
+                "status": "error",
+                "message": "operations must be a JSON array of objects",
+            }
+
+        env_operations = []
+        for operation in operations:
+            env_operation = {
+                BATCH_PARAM_NAMES.get(key, key): value
+                for key, value in operation.items()
+            }
+            for key in ("start_line", "end_line", "expected_count"):
+                if env_operation.get(key) is not None:
+                    env_operation[key] = _as_int(env_operation[key])
+            if isinstance(env_operation.get("append"), str):
+                env_operation["append"] = env_operation["append"].lower() == "true"
+            env_operations.append(env_operation)
+
+        return await environment.apply_file_operations(env_operations)
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -214,95 +226,101 @@ async def file_find_in_content(
         return {"status": "error", "message": str(e)}
 
 
+async def file_search_in_content(
+    environment: BaseEnv,
+    regex: str,
+    path: str = ".",
+    glob: Optional[str] = None,
+    ignore_case: bool = False,
+    context_lines: int = 0,
+    max_results: int = 100,
+) -> Dict[str, Any]:
+    """
+    Search for matching lines in all files of a directory tree.
+
+    Args:
+        environment: BaseEnv instance to use for operations
+        regex: Regular expression pattern to match
+        path: Relative or absolute path of the directory to search
+        glob: Comma-separated filename globs of the files to search
+        ignore_case: Whether the search is case-insensitive
+        context_lines: Lines of context before and after each match
+        max_results: Maximum number of matching lines
+
+    Returns:
+        Dict containing the search results
+    """
+    try:
+        result = await environment.search_content(
+            regex,
+            path=path,
+            glob=glob,
+            ignore_case=ignore_case,
+            context_lines=context_lines,
+            max_results=max_results,
+        )
+        if result["status"] == "success":
+            result["pattern"] = regex
+        return result
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
 async def file_find_by_name(
     environment: BaseEnv, path: str, glob_pattern: str
 ) -> Dict[str, Any]:
     """
     Find files by name pattern in specified directory using the provided environment.
 
+    Hidden files, paths ignored by .gitignore and the contents of excluded
+    directories are skipped.
+
     Args:
         environment: BaseEnv instance to use for operations
         path: Relative or absolute path of directory to search
-        glob_pattern: Filename pattern using glob syntax wildcards
+        glob_pattern: Glob matching file names (e.g. "*.py") or, if it contains
+            a slash, paths relative to the directory (e.g. "src/**/*.ts")
 
     Returns:
         Dict containing the search results
     """
     try:
-        # List files in the directory based on the pattern
-        result = await environment.list_files(path, recursive=True)
+        result = await environment.find_files(glob_pattern, path=path)
 
         if result["status"] != "success":
             return result
 
-        # Filter files based on the glob pattern
-        matching_files = []
-
-        for file_info in result["files"]:
-            # Check if the file name matches the pattern
-            if fnmatch.fnmatch(file_info["name"], glob_pattern):
-                matching_files.append(file_info)
-
         return {
             "status": "success",
             "directory": result["path"],
             "pattern": glob_pattern,
-            "matches": matching_files,
-            "match_count": len(matching_files),
+            "matches": result["matches"],
+            "match_count": result["match_count"],
+            "truncated": result["truncated"],
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 async def file_explore_directory(
-    environment: BaseEnv, path: str, max_depth: int = 2
+    environment: BaseEnv, path: str, max_depth: int = 2, max_entries: int = 1000
 ) -> Dict[str, Any]:
     """
     Explore a directory structure with limited depth to help the agent understand the filesystem.
 
+    Common dependency, cache and build directories (EXCLUDED_DIRS) are listed
+    but not descended into. The listing is cached by the environment until the
+    explored tree changes.
+
     Args:
         environment: BaseEnv instance to use for operations
         path: Path of directory to explore (can be relative to environment's base path)
         max_depth: Maximum depth of directory traversal (default: 2)
+        max_entries: Maximum number of entries returned (default: 1000)
 
     Returns:
         Dict containing the directory structure
     """
-    # Common directories to exclude from exploration
-    EXCLUDED_DIRS = {
-        "__pycache__",
-        "node_modules",
-        ".git",
-        ".svn",
-        ".hg",
-        ".bzr",
-        "venv",
-        "env",
-        ".venv",
-        ".env",
-        "virtualenv",
-        ".tox",
-        ".pytest_cache",
-        ".mypy_cache",
-        ".coverage",
-        "htmlcov",
-        "dist",
-        "build",
-        "egg-info",
-        ".egg-info",
-        "target",
-        "bin",
-        "obj",
-        ".vs",
-        ".vscode",
-        ".idea",
-        "*.egg-info",
-        ".DS_Store",
-        "Thumbs.db",
-        ".sass-cache",
-        ".cache",
-    }
-
     try:
         # Resolve path using environment
         target_path = environment._resolve_path(path)
@@ -313,8 +331,8 @@ async def file_explore_directory(
                 "message": f"Directory not found: {target_path}",
             }
 
-        result = await environment.list_files(
-            str(target_path), recursive=True, max_depth=max_depth
+        result = await environment.get_workspace_snapshot(
+            str(target_path), max_depth=max_depth, max_entries=max_entries
         )
 
         if result["status"] == "success":
@@ -1,10 +1,28 @@
-from typing import Any, Dict, Tuple
+import asyncio
+from typing import Any, Dict, Optional, Tuple
 
-import requests
+import httpx
 
+from ..client.http_pool import HttpPoolConfig, shared_http_pool
 from .base import ToolHandler, ToolResult
 from .registry import ToolRegistry
 
+# Connections to image hosts are shared by every download
+DOWNLOAD_POOL_CONFIG = HttpPoolConfig(max_keepalive_connections=10)
+
+# Size of the chunks streamed from the response to the environment
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _download_error(error: Exception) -> str:
+    if isinstance(error, httpx.TimeoutException):
+        return "Request timeout"
+    if isinstance(error, httpx.ConnectError):
+        return "Connection error"
+    if isinstance(error, httpx.HTTPError):
+        return f"Request failed: {str(error)}"
+    return f"Unexpected error: {str(error)}"
+
 
 async def download_file(url: str, timeout: int = 30) -> Tuple[bool, bytes, str]:
     """
@@ -17,21 +35,50 @@ async def download_file(url: str, timeout: int = 30) -> Tuple[bool, bytes, str]:
     Returns:
         Tuple of (success: bool, content: bytes, error_message: str)
     """
+    client = shared_http_pool.get_client("", DOWNLOAD_POOL_CONFIG)
     try:
-        response = requests.get(url, timeout=timeout)
+        response = await client.get(url, timeout=timeout, follow_redirects=True)
         if response.status_code == 200:
             return True, response.content, ""
         else:
-            error_msg = f"HTTP {response.status_code}: {response.reason}"
+            error_msg = f"HTTP {response.status_code}: {response.reason_phrase}"
             return False, b"", error_msg
-    except requests.exceptions.Timeout:
-        return False, b"", "Request timeout"
-    except requests.exceptions.ConnectionError:
-        return False, b"", "Connection error"
-    except requests.exceptions.RequestException as e:
-        return False, b"", f"Request failed: {str(e)}"
     except Exception as e:
-        return False, b"", f"Unexpected error: {str(e)}"
+        return False, b"", _download_error(e)
+
+
+async def download_to_environment(
+    environment, url: str, path: str, timeout: int = 30
+) -> Tuple[bool, Optional[str], str]:
+    """
+    Download a file into an environment, streaming it chunk by chunk.
+
+    Args:
+        environment: Environment the file is written to
+        url: The URL to download from
+        path: File path in the environment
+        timeout: Timeout in seconds for connecting and for each read
+
+    Returns:
+        Tuple of (success: bool, written path: str, error_message: str)
+    """
+    client = shared_http_pool.get_client("", DOWNLOAD_POOL_CONFIG)
+    try:
+        async with client.stream(
+            "GET", url, timeout=timeout, follow_redirects=True
+        ) as response:
+            if response.status_code != 200:
+                error_msg = f"HTTP {response.status_code}: {response.reason_phrase}"
+                return False, None, error_msg
+            result = await environment.write_file_stream(
+                path, response.aiter_bytes(DOWNLOAD_CHUNK_SIZE)
+            )
+    except Exception as e:
+        return False, None, _download_error(e)
+
+    if result.get("status") != "success":
+        return False, None, result.get("message", "Failed to write file")
+    return True, result.get("path"), ""
 
 
 @ToolRegistry.register(
@@ -97,8 +144,7 @@ class ImageGenerationHandler(ToolHandler):
             if not output_path.exists():
                 await self.environment.mkdir(output_path, parents=True, exist_ok=True)
 
-            saved_files = []
-            images = []
+            downloads = []
             for image_data in api_response.images:
                 # Extract data from ImageResult object
                 image_url = image_data.url
@@ -110,31 +156,19 @@ class ImageGenerationHandler(ToolHandler):
 
                 # Construct file path in the environment
                 filepath = f"{self.OUTPUT_DIR}/{filename}"
+                self.logger.info(f"Downloading image from {image_url}")
+                downloads.append(
+                    download_to_environment(self.environment, image_url, filepath)
+                )
 
-                # Download and save the image
-                try:
-                    self.logger.info(f"Downloading image from {image_url}")
-                    image_response = requests.get(image_url)
-                    if image_response.status_code == 200:
-                        # Use environment to write the binary file
-                        result = await self.environment.write_file(
-                            filepath, image_response.content, mode="wb", encoding=None
-                        )
-
-                        if result.get("status") == "success":
-                            self.logger.info(f"Saved image to {result.get('path')}")
-                            saved_files.append(result.get("path"))
-                            images.append(filepath)
-                        else:
-                            self.logger.error(
-                                f"Failed to save image: {result.get('message')}"
-                            )
-                    else:
-                        self.logger.error(
-                            f"Failed to download image: HTTP {image_response.status_code}"
-                        )
-                except Exception as e:
-                    self.logger.error(f"Failed to save image {filename}: {str(e)}")
+            # Download all images concurrently, streaming them to the environment
+            saved_files = []
+            for success, saved_path, error in await asyncio.gather(*downloads):
+                if success:
+                    self.logger.info(f"Saved image to {saved_path}")
+                    saved_files.append(saved_path)
+                else:
+                    self.logger.error(f"Failed to save image: {error}")
 
             result = {
                 "saved_files": saved_files,
@@ -1,11 +1,16 @@
 import logging
+import re
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Type
+from typing import Dict, List, Optional, Pattern, Type
 
+from ..client.models import ToolInfo
 from .base import ToolHandler
 
 logger = logging.getLogger("AgentClient")
 
+# Attributes of an opening tag, quoted values may contain "<" and ">"
+XML_ATTRIBUTES = r"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+
 
 @dataclass
 class XMLToolDefinition:
@@ -18,6 +23,11 @@ class XMLToolDefinition:
     content_param: Optional[str] = None  # Which parameter gets the XML content
     attribute_mappings: Dict[str, str] = None  # XML attr -> param name mapping
     is_breaking: bool = False  # Whether this tool breaks the execution loop
+    # Conflict rules for concurrent execution. A read-only tool never modifies
+    # anything; path_param names the parameter holding the path the tool reads
+    # or writes. Tools that are neither read-only nor path-scoped run alone.
+    read_only: bool = False
+    path_param: Optional[str] = None
 
     def __post_init__(self):
         if self.attribute_mappings is None:
@@ -30,6 +40,9 @@ class ToolRegistry:
     _handlers: Dict[str, Type[ToolHandler]] = {}
     _aliases: Dict[str, str] = {}
     _xml_tools: Dict[str, XMLToolDefinition] = {}  # xml_tag -> definition
+    _xml_tag_pattern: Optional[Pattern] = None  # compiled lazily, reset on register
+    _cache_ttls: Dict[str, float] = {}  # message_type -> seconds results are cached
+    _tool_infos: Dict[str, ToolInfo] = {}  # message_type -> schema sent to the model
 
     @classmethod
     def register(
@@ -42,11 +55,30 @@ class ToolRegistry:
         content_param: Optional[str] = None,
         attribute_mappings: Optional[Dict[str, str]] = None,
         is_breaking: bool = False,
+        read_only: bool = False,
+        path_param: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        tool_info: Optional[ToolInfo] = None,
     ):
-        """Decorator to register a handler for a message type with optional XML tool definition"""
+        """Decorator to register a handler for a message type with optional XML tool definition
+
+        Read-only tools may set cache_ttl, the number of seconds their successful
+        results are reused for identical calls.
+
+        Tools only known to the client (the server has no prompt for them) set
+        tool_info, which is sent with every request like custom tools are.
+        """
 
         def decorator(handler_class: Type[ToolHandler]):
             cls._handlers[message_type] = handler_class
+            if tool_info:
+                cls._tool_infos[message_type] = tool_info
+            else:
+                cls._tool_infos.pop(message_type, None)
+            if cache_ttl:
+                cls._cache_ttls[message_type] = cache_ttl
+            else:
+                cls._cache_ttls.pop(message_type, None)
 
             # Register aliases
             if aliases:
@@ -63,6 +95,8 @@ class ToolRegistry:
                     content_param=content_param,
                     attribute_mappings=attribute_mappings,
                     is_breaking=is_breaking,
+                    read_only=read_only,
+                    path_param=path_param,
                 )
 
             logger.debug(
@@ -85,6 +119,8 @@ class ToolRegistry:
         content_param: str = None,
         attribute_mappings: Dict[str, str] = None,
         is_breaking: bool = False,
+        read_only: bool = False,
+        path_param: str = None,
     ):
         """Register an XML tool definition"""
         definition = XMLToolDefinition(
@@ -95,10 +131,23 @@ class ToolRegistry:
             content_param=content_param,
             attribute_mappings=attribute_mappings or {},
             is_breaking=is_breaking,
+            read_only=read_only,
+            path_param=path_param,
         )
         cls._xml_tools[xml_tag] = definition
+        cls._xml_tag_pattern = None
         logger.debug(f"Registered XML tool: {xml_tag} -> {function_name}")
 
+    @classmethod
+    def get_cache_ttl(cls, message_type: str) -> Optional[float]:
+        """Get the number of seconds results of a tool are cached, if they are"""
+        return cls._cache_ttls.get(cls._aliases.get(message_type, message_type))
+
+    @classmethod
+    def get_client_tool_infos(cls) -> List[ToolInfo]:
+        """Get the schemas of the tools the server has no prompt for"""
+        return list(cls._tool_infos.values())
+
     @classmethod
     def get_xml_tool_definition(cls, xml_tag: str) -> Optional[XMLToolDefinition]:
         """Get XML tool definition by tag name"""
@@ -114,6 +163,26 @@ class ToolRegistry:
             patterns.append(pattern)
         return patterns
 
+    @classmethod
+    def get_xml_tag_pattern(cls) -> Optional[Pattern]:
+        """
+        Get a single compiled pattern matching the opening tag of any registered XML tool.
+
+        The pattern is built once and cached until a new XML tool is registered.
+        Group 1 holds the tag name as written in the stream.
+
+        Returns:
+            Compiled regex, or None if no XML tools are registered
+        """
+        if cls._xml_tag_pattern is None and cls._xml_tools:
+            # Longest tags first so that a tag is never shadowed by one of its prefixes
+            tags = sorted(cls._xml_tools.keys(), key=len, reverse=True)
+            alternation = "|".join(re.escape(tag) for tag in tags)
+            cls._xml_tag_pattern = re.compile(
+                f"<({alternation})(?=[\\s>]){XML_ATTRIBUTES}(?<!/)>", re.IGNORECASE
+            )
+        return cls._xml_tag_pattern
+
     @classmethod
     def get_xml_function_mapping(cls) -> Dict[str, str]:
         """Get mapping from XML tag to function name"""
@@ -0,0 +1,202 @@
+"""
+Cache of tool results shared by the agents of a process.
+
+Tools opt in with the `cache_ttl` declared at `ToolRegistry.register`. Results
+of tools reading the environment are scoped to it and dropped when a tool
+writes to an overlapping path; web search results are shared by every agent.
+"""
+
+import copy
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from ..envs.paths import paths_overlap
+from .models import ToolResult
+
+logger = logging.getLogger("ToolResultCache")
+
+CacheKey = Tuple[Optional[str], str, str]  # (scope, function name, arguments)
+
+
+@dataclass
+class CachedToolResult:
+    """A cached result with its expiry and the path it depends on"""
+
+    result: ToolResult
+    expires_at: float
+    size: int
+    path: Optional[str] = None
+
+
+def normalize_arguments(arguments: Dict[str, Any]) -> str:
+    """
+    Serialize tool arguments so that equivalent calls get the same key.
+
+    XML attributes arrive as strings, so values are compared as stripped
+    strings and missing (None) arguments are ignored.
+    """
+    normalized = {
+        name: value.strip() if isinstance(value, str) else str(value)
+        for name, value in arguments.items()
+        if value is not None
+    }
+    return json.dumps(normalized, sort_keys=True)
+
+
+def _result_size(result: ToolResult) -> int:
+    """Approximate size of a result in bytes"""
+    return len(json.dumps(result.data, default=str)) + len(result.error or "")
+
+
+class ToolResultCache:
+    """LRU cache of successful tool results, bounded in entries and bytes"""
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Maximum number of cached results
+            max_bytes: Maximum approximate size of all cached results
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, CachedToolResult]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(
+        function_name: str, arguments: Dict[str, Any], scope: Optional[str] = None
+    ) -> CacheKey:
+        """
+        Build the key of a tool call.
+
+        Args:
+            function_name: Name of the tool
+            arguments: Arguments of the call, paths already resolved
+            scope: Environment the result depends on, None if it does not
+        """
+        return scope, function_name, normalize_arguments(arguments)
+
+    def _get_entry(self, key: CacheKey) -> Optional[CachedToolResult]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            entry = None
+        return entry
+
+    def contains(self, key: CacheKey) -> bool:
+        """Check whether an unexpired result is cached, without counting a hit"""
+        return self._get_entry(key) is not None
+
+    def get(self, key: CacheKey) -> Optional[ToolResult]:
+        """
+        Get a cached result.
+
+        Returns:
+            A copy of the result, or None if it is not cached or expired
+        """
+        entry = self._get_entry(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return ToolResult(
+            success=entry.result.success,
+            data=copy.deepcopy(entry.result.data),
+            error=entry.result.error,
+        )
+
+    def put(
+        self,
+        key: CacheKey,
+        result: ToolResult,
+        ttl: float,
+        path: Optional[str] = None,
+    ):
+        """
+        Cache a successful result.
+
+        Args:
+            key: Key built with make_key
+            result: Result of the call, failed results are not cached
+            ttl: Seconds the result stays valid
+            path: Resolved path the result depends on, for invalidation
+        """
+        if not result.success or ttl <= 0:
+            return
+
+        size = _result_size(result)
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = CachedToolResult(
+            result=ToolResult(
+                success=result.success,
+                data=copy.deepcopy(result.data),
+                error=result.error,
+            ),
+            expires_at=time.monotonic() + ttl,
+            size=size,
+            path=os.path.normpath(path) if path else None,
+        )
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, scope: Optional[str], path: Optional[str] = None):
+        """
+        Drop the results of a scope that may depend on a path.
+
+        Args:
+            scope: Environment that changed
+            path: Resolved path that was written, None for any path
+        """
+        path = os.path.normpath(path) if path else None
+        for key in list(self._entries):
+            if key[0] != scope or key[0] is None:
+                continue
+            entry_path = self._entries[key].path
+            if path is None or entry_path is None or paths_overlap(path, entry_path):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every cached result"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get the cache counters"""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+shared_tool_result_cache = ToolResultCache()
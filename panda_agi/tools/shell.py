@@ -55,11 +55,13 @@ class ShellExecCommandHandler(ToolHandler):
     "shell_view_output",
     xml_tag="shell_view_output",
     required_params=["id"],
-    optional_params=["kill_process", "wait_seconds"],
+    optional_params=["kill_process", "wait_seconds", "since", "tail"],
     attribute_mappings={
         "id": "id",
         "kill_process": "kill_process",
         "wait_seconds": "wait_seconds",
+        "since": "since",
+        "tail": "tail",
     },
 )
 class ShellViewOutputHandler(ToolHandler):
@@ -80,10 +82,20 @@ class ShellViewOutputHandler(ToolHandler):
         if wait_seconds is not None and isinstance(wait_seconds, str):
             wait_seconds = float(wait_seconds)
 
+        # Line number to read from (next_line of a previous view) and line limit
+        since = params.get("since")
+        if since is not None:
+            since = int(since)
+        tail = params.get("tail")
+        if tail is not None:
+            tail = int(tail)
+
         result: ShellOutput = await self.environment.get_process_output(
             session_id=params["id"],
             wait_seconds=wait_seconds,
             kill_process=kill_process,
+            since=since,
+            tail=tail,
         )
 
         return result.to_tool_result()
@@ -1,22 +1,49 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from ..client.models import EventType
 from ..tools.web_ops.beautifulsoup import beautiful_soup_navigation
-from ..tools.web_ops.tavily import tavily_search_web
+from ..tools.web_ops.tavily import tavily_search_many, tavily_search_web_async
 from .base import ToolHandler, ToolResult
 from .registry import ToolRegistry
 
 
+def _merge_search_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge the results of several searches, failing only if all of them did"""
+    merged, seen_urls, errors = [], set(), []
+    for result in results:
+        if "error" in result:
+            errors.append(result["error"])
+            continue
+        for item in result.get("results", []):
+            if item.get("url") not in seen_urls:
+                seen_urls.add(item.get("url"))
+                merged.append(item)
+    if errors and len(errors) == len(results):
+        return {"error": "; ".join(errors)}
+    return {"results": merged}
+
+
 @ToolRegistry.register(
     "web_search",
     xml_tag="web_search",
     required_params=["query"],
-    optional_params=["max_results"],
+    optional_params=["max_results", "split_lines"],
     content_param="query",
-    attribute_mappings={"query": "query", "max_results": "max_results"},
+    attribute_mappings={
+        "query": "query",
+        "max_results": "max_results",
+        "split_lines": "split_lines",
+    },
+    read_only=True,
+    cache_ttl=600,
 )
 class WebSearchHandler(ToolHandler):
-    """Handler for web search messages"""
+    """Handler for web search messages
+
+    With split_lines="true", a query with several lines runs one search per
+    line concurrently, and the results are merged without duplicate URLs.
+    Otherwise the whole query is one search.
+    """
 
     def validate_input(self, params: Dict[str, Any]) -> Optional[str]:
         if "query" not in params:
@@ -26,7 +53,16 @@ class WebSearchHandler(ToolHandler):
     async def execute(self, params: Dict[str, Any]) -> ToolResult:
         await self.add_event(EventType.WEB_SEARCH, params)
         try:
-            results = tavily_search_web(**params)
+            max_results = params.get("max_results", 5)
+            queries = [params["query"]]
+            if str(params.get("split_lines", "")).lower() == "true":
+                queries = [line for line in queries[0].splitlines() if line.strip()]
+            if len(queries) > 1:
+                results = _merge_search_results(
+                    await tavily_search_many(queries, max_results)
+                )
+            else:
+                results = await tavily_search_web_async(params["query"], max_results)
         except Exception as e:
             await self.add_event(
                 EventType.ERROR,
@@ -66,6 +102,7 @@ class WebSearchHandler(ToolHandler):
     required_params=["url"],
     content_param="url",
     attribute_mappings={"url": "url"},
+    read_only=True,
 )
 class WebNavigationHandler(ToolHandler):
     """Handler for web navigation messages"""
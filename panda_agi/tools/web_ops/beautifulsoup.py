@@ -1,31 +1,96 @@
-from typing import Any, Dict
+import hashlib
+import os
+from typing import Any, Dict, Optional
 
 import httpx
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+
+from ...client.http_pool import HttpPoolConfig, shared_http_pool
+from ...envs.threads import to_thread
+from .html_extract import MAX_CONTENT_CHARS, html_to_markdown, truncate_markdown
+from .http_cache import CachedResponse, HttpDiskCache
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Connections to visited sites are shared by every call
+WEB_POOL_CONFIG = HttpPoolConfig(max_keepalive_connections=50, keepalive_expiry=30.0)
+
+# Part of the markdown cache key, change it when the conversion changes
+MARKDOWN_VERSION = "3"
+
+_http_cache: Optional[HttpDiskCache] = None
+
+
+def get_http_cache() -> Optional[HttpDiskCache]:
+    """Get the page cache, None if disabled with PANDA_AGI_HTTP_CACHE=0"""
+    global _http_cache
+    if os.getenv("PANDA_AGI_HTTP_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    if _http_cache is None:
+        _http_cache = HttpDiskCache()
+    return _http_cache
+
+
+def set_http_cache(cache: Optional[HttpDiskCache]):
+    """Replace the page cache, e.g. with one in a temporary directory"""
+    global _http_cache
+    _http_cache = cache
+
+
+async def _fetch(url: str, cache: Optional[HttpDiskCache]) -> CachedResponse:
+    """Get a page from the cache, revalidating or downloading it when needed"""
+    cached = await to_thread(cache.load, url) if cache else None
+    if cached and cached.is_fresh():
+        cache.hits += 1
+        return cached
+
+    headers = dict(HEADERS)
+    if cached:
+        headers.update(cached.conditional_headers())
+
+    client = shared_http_pool.get_client("", WEB_POOL_CONFIG)
+    response = await client.get(
+        url, headers=headers, timeout=30.0, follow_redirects=True
+    )
+
+    if cached and response.status_code == 304:
+        cache.revalidations += 1
+        return await to_thread(cache.revalidated, cached, response)
+
+    response.raise_for_status()
+    if not cache:
+        return CachedResponse.from_response(url, response)
+    cache.misses += 1
+    return await to_thread(cache.store, url, response)
 
 
 async def beautiful_soup_navigation(url: str) -> Dict[str, Any]:
     """
     Visit a webpage and extract its content using httpx for better error handling.
+
+    Pages are cached on disk following their caching headers, and the markdown
+    of a page body is converted only once. Only the main content of the page is
+    kept, truncated to MAX_CONTENT_CHARS.
     """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
+        cache = get_http_cache()
+        page = await _fetch(url, cache)
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        content = md(str(soup))
+        content = None
+        if cache:
+            key = hashlib.sha256(page.body + MARKDOWN_VERSION.encode()).hexdigest()
+            content = await to_thread(cache.load_markdown, key)
+        if content is None:
+            content = await to_thread(html_to_markdown, page.text)
+            if cache:
+                await to_thread(cache.store_markdown, key, content)
 
         return {
             "success": True,
             "url": url,
-            "content": content,
-            "status_code": response.status_code,
+            "content": truncate_markdown(content, MAX_CONTENT_CHARS),
+            "status_code": page.status_code,
         }
 
     except httpx.TimeoutException:
@@ -0,0 +1,203 @@
+"""
+Extraction of the main content of a web page as markdown.
+
+The page is parsed once (with lxml when installed), boilerplate such as
+scripts, styles, navigation and footers is removed, and the element holding
+the main content is converted directly from the parsed tree. Large results
+are truncated at a block boundary so the model gets a readable prefix.
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+from bs4 import BeautifulSoup, Comment, Tag
+from markdownify import MarkdownConverter
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:  # pragma: no cover - depends on the environment
+    HTML_PARSER = "html.parser"
+
+# Elements that never hold readable content
+NON_CONTENT_TAGS = (
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "iframe",
+    "svg",
+    "canvas",
+    "object",
+    "embed",
+    "button",
+    "input",
+    "select",
+    "textarea",
+    "link",
+    "meta",
+)
+
+# Page chrome. Headers of an <article> or <main> are kept, they hold its title
+BOILERPLATE_TAGS = ("nav", "header", "footer", "aside")
+BOILERPLATE_ROLES = ("navigation", "banner", "contentinfo", "complementary", "search")
+BOILERPLATE_PATTERN = re.compile(
+    r"(^|[-_ ])(nav|navbar|menu|sidebar|footer|breadcrumbs?|cookie|banner|"
+    r"share|social|advert|ads|related|comments?|popup|modal|newsletter)($|[-_ ])",
+    re.IGNORECASE,
+)
+# Class or id names that outweigh a boilerplate name (e.g. "main-sidebar-layout")
+CONTENT_PATTERN = re.compile(r"article|body|column|main|content|post|entry", re.I)
+
+# Candidates for the main content, most explicit first
+MAIN_CONTENT_SELECTORS = ("main", "[role=main]", "article", "#content", ".content")
+
+# Minimum text of an explicit main element, smaller ones are ignored
+MIN_MAIN_TEXT = 200
+
+# Default size limit of the content returned to the model
+MAX_CONTENT_CHARS = 40000
+
+_BLANK_LINES = re.compile(r"\n[ \t]*(\n[ \t]*)+")
+
+
+def _text_length(element: Tag) -> int:
+    return len(element.get_text(" ", strip=True))
+
+
+def _block_text_lengths(root: Tag) -> Dict[int, Tuple[int, int]]:
+    """
+    Measure the text of every element in one pass over the text nodes.
+
+    Returns:
+        (text length, link text length) by element id()
+    """
+    lengths: Dict[int, Tuple[int, int]] = {}
+    for text in root.find_all(string=True):
+        size = len(text.strip())
+        if not size:
+            continue
+        parents = []
+        for parent in text.parents:
+            parents.append(parent)
+            if parent is root:
+                break
+        in_link = any(parent.name == "a" for parent in parents)
+        for parent in parents:
+            total, link = lengths.get(id(parent), (0, 0))
+            lengths[id(parent)] = (total + size, link + size * in_link)
+    return lengths
+
+
+def _is_boilerplate(element: Tag) -> bool:
+    if element.name in ("html", "body", "main", "article"):
+        return False
+    if element.name == "header":
+        return element.find_parent(("article", "main")) is None
+    if element.name in BOILERPLATE_TAGS:
+        return True
+    if element.get("role") in BOILERPLATE_ROLES:
+        return True
+    if element.get("aria-hidden") == "true" or element.has_attr("hidden"):
+        return True
+    names = " ".join(element.get("class") or []) + " " + (element.get("id") or "")
+    return bool(BOILERPLATE_PATTERN.search(names)) and not CONTENT_PATTERN.search(
+        names
+    )
+
+
+def strip_boilerplate(root: Tag):
+    """Remove comments, non-content elements and page chrome in place"""
+    for node in list(root.descendants):
+        if isinstance(node, Comment):
+            node.extract()
+        elif isinstance(node, Tag) and not node.decomposed:
+            # Descendants of removed elements are skipped, they are decomposed too
+            if node.name in NON_CONTENT_TAGS or _is_boilerplate(node):
+                node.decompose()
+
+
+def find_main_content(soup: BeautifulSoup) -> Tag:
+    """
+    Find the element holding the main content of a page.
+
+    Explicit markers (<main>, role="main", <article>) are used when they hold
+    enough text. Otherwise the block with the most text, discounted by the
+    share of link text, wins; the whole body is the fallback.
+    """
+    body = soup.body or soup
+    for selector in MAIN_CONTENT_SELECTORS:
+        candidates = soup.select(selector)
+        if candidates:
+            best = max(candidates, key=_text_length)
+            if _text_length(best) >= MIN_MAIN_TEXT:
+                return best
+
+    lengths = _block_text_lengths(body)
+    body_length = lengths.get(id(body), (0, 0))[0]
+    best, best_score = body, 0.0
+    for block in body.find_all(("div", "section", "td")):
+        length, link_length = lengths.get(id(block), (0, 0))
+        if length < MIN_MAIN_TEXT:
+            continue
+        score = length - link_length
+        # Prefer the innermost block as long as it keeps most of the text
+        if score > best_score * 1.1 or (
+            score >= best_score * 0.9 and length >= body_length * 0.5
+        ):
+            best, best_score = block, score
+    return best
+
+
+def truncate_markdown(markdown: str, max_chars: int) -> str:
+    """
+    Shorten markdown to at most max_chars, cutting at a block boundary.
+
+    The cut is made at the last heading or blank line in the final fifth of
+    the allowed size (or the last line break if there is none), and a note
+    with the number of omitted characters is appended.
+    """
+    if len(markdown) <= max_chars:
+        return markdown
+
+    window_start = int(max_chars * 0.8)
+    cut = -1
+    for boundary in ("\n#", "\n\n", "\n"):
+        position = markdown.rfind(boundary, window_start, max_chars)
+        if position != -1:
+            cut = position
+            break
+    if cut == -1:
+        cut = max_chars
+    omitted = len(markdown) - cut
+    return (
+        markdown[:cut].rstrip()
+        + f"\n\n[... content truncated, {omitted} more characters ...]"
+    )
+
+
+def html_to_markdown(html: str, max_chars: Optional[int] = None) -> str:
+    """
+    Convert the main content of a page to markdown.
+
+    Args:
+        html: Page source
+        max_chars: Size limit of the result, None for no limit
+
+    Returns:
+        The markdown of the main content
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    strip_boilerplate(soup)
+    main = find_main_content(soup)
+
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    markdown = MarkdownConverter(heading_style="ATX").convert_soup(main)
+    markdown = _BLANK_LINES.sub("\n\n", markdown).strip()
+    if title and title not in markdown[: len(title) + 200]:
+        markdown = f"# {title}\n\n{markdown}"
+
+    if max_chars is not None:
+        markdown = truncate_markdown(markdown, max_chars)
+    return markdown
@@ -0,0 +1,286 @@
+"""
+Persistent HTTP cache for the pages visited by the agent.
+
+Responses are stored on disk with their validators (ETag, Last-Modified) and
+a freshness lifetime computed from Cache-Control/Expires. Fresh responses are
+served without a request, stale ones and those without explicit freshness are
+revalidated with a conditional request. Converted markdown is stored separately, keyed by the hash of the
+page body, so a page that did not change is never converted twice.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import httpx
+
+logger = logging.getLogger("HttpCache")
+
+DEFAULT_CACHE_DIR = Path(
+    os.getenv(
+        "PANDA_AGI_HTTP_CACHE_DIR",
+        Path.home() / ".cache" / "panda_agi" / "http",
+    )
+)
+
+# Response headers kept with a cached response
+STORED_HEADERS = (
+    "cache-control",
+    "content-type",
+    "date",
+    "etag",
+    "expires",
+    "last-modified",
+)
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _cache_directives(headers: Dict[str, str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float) -> Optional[float]:
+    """
+    Compute how long a response may be used without revalidation.
+
+    Args:
+        headers: Lowercase response headers
+        now: Time the response was received
+
+    Returns:
+        Lifetime in seconds (0 to always revalidate), or None if the response
+        must not be stored
+    """
+    directives = _cache_directives(headers)
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+
+    max_age = directives.get("max-age")
+    if max_age is not None:
+        try:
+            return max(0.0, float(max_age))
+        except ValueError:
+            return 0.0
+
+    date = _parse_http_date(headers.get("date")) or now
+    expires = _parse_http_date(headers.get("expires"))
+    if "expires" in headers:
+        # Invalid dates (e.g. "0") mean already expired
+        return max(0.0, expires - date) if expires else 0.0
+
+    # No heuristic freshness: pages without explicit freshness (e.g. from local
+    # dev servers) change while the agent works on them, they are revalidated
+    return 0.0
+
+
+@dataclass
+class CachedResponse:
+    """A stored response"""
+
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    encoding: Optional[str]
+    stored_at: float
+    expires_at: float
+    body: bytes = field(default=b"", repr=False)
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.body).hexdigest()
+
+    @classmethod
+    def from_response(cls, url: str, response: httpx.Response) -> "CachedResponse":
+        """Build a CachedResponse from a downloaded response"""
+        now = time.time()
+        headers = {
+            name: response.headers[name]
+            for name in STORED_HEADERS
+            if name in response.headers
+        }
+        lifetime = freshness_lifetime(headers, now)
+        return cls(
+            url=url,
+            status_code=response.status_code,
+            headers=headers,
+            encoding=response.encoding,
+            stored_at=now,
+            expires_at=now + (lifetime or 0.0),
+            body=response.content,
+        )
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Get the headers revalidating this response"""
+        headers = {}
+        if self.headers.get("etag"):
+            headers["If-None-Match"] = self.headers["etag"]
+        if self.headers.get("last-modified"):
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+
+class HttpDiskCache:
+    """
+    Response and markdown cache in a directory.
+
+    Each response is a JSON metadata file next to its body, named after the
+    hash of the URL. Files are written atomically, and the least recently
+    written ones are removed once the directory exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path, None] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.directory = Path(directory or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._responses = self.directory / "responses"
+        self._markdown = self.directory / "markdown"
+        # Size of the cached files, scanned on first write
+        self._total_bytes: Optional[int] = None
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    def _response_paths(self, url: str):
+        name = hashlib.sha256(url.encode()).hexdigest()
+        return self._responses / f"{name}.json", self._responses / f"{name}.body"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def load(self, url: str) -> Optional[CachedResponse]:
+        """Get the stored response of a URL"""
+        meta_path, body_path = self._response_paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            return None
+        return CachedResponse(body=body, **meta)
+
+    def _save(self, cached: CachedResponse) -> CachedResponse:
+        meta_path, body_path = self._response_paths(cached.url)
+        meta = asdict(cached)
+        del meta["body"]
+        # Body first, metadata pointing to a missing body is never written
+        meta_data = json.dumps(meta).encode()
+        self._write_atomic(body_path, cached.body)
+        self._write_atomic(meta_path, meta_data)
+        self._account(len(cached.body) + len(meta_data))
+        return cached
+
+    def store(self, url: str, response: httpx.Response) -> CachedResponse:
+        """
+        Store a successful response, if its headers allow it.
+
+        Returns:
+            The response as a CachedResponse, stored or not
+        """
+        cached = CachedResponse.from_response(url, response)
+        lifetime = freshness_lifetime(cached.headers, cached.stored_at)
+        if lifetime is None or response.status_code != 200:
+            return cached
+        return self._save(cached)
+
+    def revalidated(
+        self, cached: CachedResponse, response: httpx.Response
+    ) -> CachedResponse:
+        """Update a stored response after a 304 Not Modified"""
+        now = time.time()
+        headers = dict(cached.headers)
+        for name in STORED_HEADERS:
+            if name in response.headers and name != "content-type":
+                headers[name] = response.headers[name]
+        lifetime = freshness_lifetime(headers, now)
+        cached.headers = headers
+        cached.stored_at = now
+        cached.expires_at = now + (lifetime or 0.0)
+        if lifetime is None:
+            return cached
+        return self._save(cached)
+
+    def load_markdown(self, key: str) -> Optional[str]:
+        """Get the markdown stored for a content key"""
+        try:
+            return (self._markdown / f"{key}.md").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def store_markdown(self, key: str, markdown: str):
+        """Store the markdown converted from a page body"""
+        data = markdown.encode("utf-8")
+        self._write_atomic(self._markdown / f"{key}.md", data)
+        self._account(len(data))
+
+    def _cached_files(self):
+        """List (mtime, size, path) of every cached file"""
+        files = []
+        for folder in (self._responses, self._markdown):
+            if folder.is_dir():
+                for entry in os.scandir(folder):
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _account(self, written: int):
+        """Count written bytes and prune the cache when it is over max_bytes"""
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._cached_files())
+        else:
+            # Overwritten files are counted twice until the next prune
+            self._total_bytes += written
+        if self._total_bytes > self.max_bytes:
+            self._prune()
+
+    def _prune(self):
+        """Remove the oldest files until the cache is 10% under max_bytes"""
+        files = self._cached_files()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes * 0.9:
+                break
+            Path(path).unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
@@ -2,22 +2,60 @@
 Search Tool
 
 This module provides web search functionality using the Tavily API.
+
+The async functions share one pooled HTTP client, run several queries
+concurrently and send identical in-flight queries only once. The API URL can
+be pointed to a local server with TAVILY_API_URL.
 """
 
+import asyncio
+import hashlib
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Union
 
+import httpx
 from dotenv import load_dotenv
 from tavily import TavilyClient
 
+from ...client.coalesce import RequestCoalescer
+from ...client.http_pool import HttpPoolConfig, shared_http_pool
+
 # Load environment variables
 load_dotenv()
 
+DEFAULT_TAVILY_API_URL = "https://api.tavily.com"
+
+SEARCH_POOL_CONFIG = HttpPoolConfig(max_keepalive_connections=10)
+
+# Searches of one tavily_search_many call running at the same time
+MAX_CONCURRENT_SEARCHES = 5
+
+SEARCH_TIMEOUT = 60.0
+
+search_coalescer = RequestCoalescer()
+
+
+def _format_results(search_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the URL and title of each result"""
+    formatted_results = []
+    for result in search_result.get("results", []):
+        formatted_results.append(
+            {
+                "url": result.get("url", ""),
+                "title": result.get("title", ""),
+                # "content": result.get("content", ""),
+            }
+        )
+    return {"results": formatted_results}
+
 
 def tavily_search_web(query: str, max_results: int = 5) -> Dict[str, Any]:
     """
     Search the web using Tavily API.
 
+    Blocks until the search is done, prefer tavily_search_web_async in
+    async code.
+
     Args:
         query: The search query
         max_results: Maximum number of results to return
@@ -34,18 +72,91 @@ def tavily_search_web(query: str, max_results: int = 5) -> Dict[str, Any]:
             query=query,
             max_results=max_results,
         )
-
-        # Format results to include only URL and title
-        formatted_results = []
-        for result in search_result.get("results", []):
-            formatted_results.append(
-                {
-                    "url": result.get("url", ""),
-                    "title": result.get("title", ""),
-                    # "content": result.get("content", ""),
-                }
-            )
-
-        return {"results": formatted_results}
+        return _format_results(search_result)
     except Exception as e:
         return {"error": str(e)}
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        detail = response.json().get("detail", response.text)
+    except ValueError:
+        detail = response.text
+    if isinstance(detail, dict):
+        detail = detail.get("error", detail)
+    return f"Tavily API returned {response.status_code}: {detail}"
+
+
+async def _post_search(
+    api_url: str, api_key: Optional[str], query: str, max_results: int
+) -> Dict[str, Any]:
+    client = shared_http_pool.get_client(api_url, SEARCH_POOL_CONFIG)
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    response = await client.post(
+        "/search",
+        json={"query": query, "max_results": max_results},
+        headers=headers,
+        timeout=SEARCH_TIMEOUT,
+    )
+    if response.status_code != 200:
+        raise RuntimeError(_error_message(response))
+    return _format_results(response.json())
+
+
+async def tavily_search_web_async(
+    query: str, max_results: Union[int, str] = 5, api_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Search the web using Tavily API without blocking the event loop.
+
+    Identical searches running at the same time share one request.
+
+    Args:
+        query: The search query
+        max_results: Maximum number of results to return
+        api_url: Base URL of the API, defaults to TAVILY_API_URL
+
+    Returns:
+        Dict containing search results, or an "error" on failure
+    """
+    api_url = api_url or os.getenv("TAVILY_API_URL", DEFAULT_TAVILY_API_URL)
+    api_key = os.getenv("TAVILY_API_KEY")
+    query = " ".join(query.split())
+
+    try:
+        max_results = int(max_results)
+        # Requests with different API keys are not shared, the key is not kept
+        api_key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()
+        key = (api_url, api_key_hash, query.lower(), max_results)
+        results = await search_coalescer.run(
+            key, lambda: _post_search(api_url, api_key, query, max_results)
+        )
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__}
+    # Callers sharing a request must not share the result lists
+    return {"results": [dict(result) for result in results["results"]]}
+
+
+async def tavily_search_many(
+    queries: List[str],
+    max_results: Union[int, str] = 5,
+    api_url: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run several searches concurrently.
+
+    Args:
+        queries: The search queries
+        max_results: Maximum number of results per query
+        api_url: Base URL of the API, defaults to TAVILY_API_URL
+
+    Returns:
+        The result of each query, in the order of the queries
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+    async def search(query: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await tavily_search_web_async(query, max_results, api_url)
+
+    return await asyncio.gather(*(search(query) for query in queries))